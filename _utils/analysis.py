@@ -0,0 +1,206 @@
+import numpy as np
+import pandas as pd
+from typing import Dict, List
+
+from _utils.bootstrap import BOOTSTRAP_CONFIDENCE, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED, bootstrap_intervals
+from _utils.filter_index import FilterIndex
+from _utils.instrumentation import instrumented
+from _utils.stats_engine import RESULTS_STAT_COLUMNS, batched_column_statistics
+
+
+# ============================================================================
+# FILTERING AND SUMMARIES (no Streamlit or Plotly: shared by the app and the CLIs)
+# ============================================================================
+
+@instrumented
+def filter_data_by_parameters(df: pd.DataFrame, selected_filters: Dict,
+                              index: FilterIndex = None) -> pd.DataFrame:
+    """
+    Filter the DataFrame based on selected simulation parameters.
+    
+    All predicates are combined into a single row mask and the rows are
+    extracted with one final take, so no intermediate frames are allocated.
+    When a FilterIndex built on `df` is given, the mask is computed from its
+    packed bitmaps and sorted arrays instead of scanning the columns (an
+    IncrementalFilter can be passed instead to reuse unchanged predicates).
+    
+    :param df: Input DataFrame
+    :param selected_filters: Dictionary of selected filter values
+    :param index: Optional FilterIndex (or IncrementalFilter) built on the rows of `df`
+    :return: Filtered DataFrame
+    """
+    if index is not None:
+        return df.take(index.positions(selected_filters))
+    
+    mask = np.ones(len(df), dtype=bool)
+    
+    for key, value in selected_filters.items():
+        if key.endswith('_range'):
+            # Range filter
+            param = key.replace('_range', '')
+            min_val, max_val = value
+            mask &= ((df[param] >= min_val) & (df[param] <= max_val)).to_numpy()
+        else:
+            # Multiselect filter
+            if isinstance(value, list) and len(value) > 0:
+                mask &= df[key].isin(value).to_numpy()
+    
+    return df.take(np.flatnonzero(mask))
+
+
+def normalize_filters(filters: Dict, header_sim_params: List[str]) -> Dict:
+    """
+    Convert spec filters into the selected_filters format of the UI.
+
+    Keys are parameter names (value or list of values to keep) or
+    '{param}_range' ([min, max], inclusive). Parameters not mentioned are
+    not constrained.
+
+    :param filters: Filters of a run in the spec
+    :param header_sim_params: List of simulation parameter names
+    :return: Dictionary usable with filter_data_by_parameters
+    """
+    selected_filters = {}
+    for key, value in (filters or {}).items():
+        param = key[:-len('_range')] if key.endswith('_range') else key
+        if param not in header_sim_params:
+            raise ValueError(f"Unknown simulation parameter in filters: {param}")
+        if key.endswith('_range'):
+            if not (isinstance(value, (list, tuple)) and len(value) == 2):
+                raise ValueError(f"Filter {key} must be a [min, max] pair")
+            selected_filters[key] = (value[0], value[1])
+        else:
+            selected_filters[key] = list(value) if isinstance(value, (list, tuple)) else [value]
+    return selected_filters
+
+
+def varying_parameters(header_sim_params: List[str], filtered_data: pd.DataFrame,
+                       subset_profile: Dict[str, Dict] = None) -> List[str]:
+    """
+    List the parameters with more than one distinct value in the filtered data.
+    
+    :param header_sim_params: List of simulation parameter names
+    :param filtered_data: Filtered DataFrame
+    :param subset_profile: Optional profile of the filtered rows (FilterIndex.subset_profile)
+    :return: Parameter names, in header order
+    """
+    if subset_profile is not None:
+        return [param for param in header_sim_params if subset_profile[param]['n_distinct'] > 1]
+    return [param for param in header_sim_params if filtered_data[param].nunique() > 1]
+
+
+@instrumented
+def compute_simulation_summary(filtered_data: pd.DataFrame, header_sim_params: List[str]) -> pd.DataFrame:
+    """
+    Compute the (formatted) summary table of the filtered simulations.
+    
+    :param filtered_data: Filtered DataFrame
+    :param header_sim_params: List of simulation parameter names
+    :return: DataFrame with Parameter, Min, Mean, Max and Unique Values columns
+    """
+    summary_data = {
+        'Parameter': [],
+        'Min': [],
+        'Mean': [],
+        'Max': [],
+        'Unique Values': []
+    }
+    
+    for param in header_sim_params:
+        if param in filtered_data.columns:
+            summary_data['Parameter'].append(param)
+            
+            # Check if column is numeric or categorical
+            if pd.api.types.is_numeric_dtype(filtered_data[param]):
+                summary_data['Min'].append(f"{filtered_data[param].min():.4g}")
+                summary_data['Mean'].append(f"{filtered_data[param].mean():.4g}")
+                summary_data['Max'].append(f"{filtered_data[param].max():.4g}")
+            else:
+                # For categorical/string columns, show unique values
+                summary_data['Min'].append(str(filtered_data[param].min()))
+                summary_data['Mean'].append("—")
+                summary_data['Max'].append(str(filtered_data[param].max()))
+            
+            summary_data['Unique Values'].append(filtered_data[param].nunique())
+    
+    return pd.DataFrame(summary_data)
+
+
+@instrumented
+def compute_simulation_statistics(filtered_data: pd.DataFrame, header_sim_params: List[str]) -> pd.DataFrame:
+    """
+    Compute the numeric summary table of the filtered simulations (for API clients).
+    
+    :param filtered_data: Filtered DataFrame
+    :param header_sim_params: List of simulation parameter names
+    :return: DataFrame with Parameter, Min, Mean and Max (floats, NaN for
+             non-numeric parameters) and Unique Values columns
+    """
+    params = [param for param in header_sim_params if param in filtered_data.columns]
+    numeric = [param for param in params if pd.api.types.is_numeric_dtype(filtered_data[param])]
+    stats = filtered_data[numeric].astype(np.float64).agg(['min', 'mean', 'max']).T
+    stats = stats.reindex(params)
+    return pd.DataFrame({
+        'Parameter': params,
+        'Min': stats['min'].to_numpy(),
+        'Mean': stats['mean'].to_numpy(),
+        'Max': stats['max'].to_numpy(),
+        'Unique Values': [int(filtered_data[param].nunique()) for param in params],
+    })
+
+
+@instrumented
+def compute_results_summary(filtered_data: pd.DataFrame, method: str,
+                            header_metrics: List[str]) -> pd.DataFrame:
+    """
+    Compute summary statistics for all metrics of a method across filtered simulations.
+    
+    All metric columns are processed in one batched (NaN-aware) NumPy pass.
+    
+    :param filtered_data: Filtered DataFrame
+    :param method: Selected method name
+    :param header_metrics: List of metric names
+    :return: DataFrame with one row per metric (raw metric name in 'Metric') and
+             the numeric columns of RESULTS_STAT_COLUMNS
+    """
+    # Only metrics whose column exists for this method
+    metrics = [metric for metric in header_metrics if f"{method}_{metric}" in filtered_data.columns]
+    columns = [f"{method}_{metric}" for metric in metrics]
+    
+    stats = batched_column_statistics(filtered_data[columns].to_numpy(dtype=np.float64))
+    stats_df = pd.DataFrame(stats[:, 1:], columns=RESULTS_STAT_COLUMNS)
+    stats_df.insert(0, 'Metric', metrics)
+    
+    # Skip metrics without valid data
+    return stats_df[stats[:, 0] > 0].reset_index(drop=True)
+
+
+@instrumented
+def compute_bootstrap_intervals(filtered_data: pd.DataFrame, method: str, header_metrics: List[str],
+                                n_resamples: int = BOOTSTRAP_RESAMPLES,
+                                confidence: float = BOOTSTRAP_CONFIDENCE,
+                                seed: int = BOOTSTRAP_SEED) -> pd.DataFrame:
+    """
+    Compute bootstrap confidence intervals of the results summary statistics.
+    
+    All metric columns are resampled together in batched NumPy passes (see
+    bootstrap.py), split across worker threads for large subsets.
+    
+    :param filtered_data: Filtered DataFrame
+    :param method: Selected method name
+    :param header_metrics: List of metric names
+    :param n_resamples: Number of bootstrap resamples
+    :param confidence: Confidence level of the intervals
+    :param seed: Random seed
+    :return: DataFrame with one row per metric (raw metric name in 'Metric') and,
+             for every RESULTS_STAT_COLUMNS statistic, '{stat} low' and '{stat} high' columns
+    """
+    metrics = [metric for metric in header_metrics if f"{method}_{metric}" in filtered_data.columns]
+    values = filtered_data[[f"{method}_{metric}" for metric in metrics]].to_numpy(dtype=np.float64)
+    
+    lower, upper = bootstrap_intervals(values, n_resamples, confidence, seed)
+    ci_df = pd.DataFrame({'Metric': metrics})
+    for stat_idx, column in enumerate(RESULTS_STAT_COLUMNS):
+        ci_df[f"{column} low"] = lower[:, stat_idx]
+        ci_df[f"{column} high"] = upper[:, stat_idx]
+    return ci_df
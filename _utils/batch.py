@@ -0,0 +1,272 @@
+import argparse
+import importlib.util
+import json
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from _utils.analysis import (
+    compute_results_summary,
+    compute_simulation_summary,
+    filter_data_by_parameters,
+    normalize_filters,
+)
+from _utils.figures import build_metrics_figure
+from _utils.lazy_table import DEFAULT_DATA_PATH, LazyDataTable, open_table
+from _utils.plot_aggregation import COLOR_MODES
+from _utils.stats_engine import build_method_metric_frame, compute_method_statistics
+
+
+# ============================================================================
+# HEADLESS BATCH REPORTS (no Streamlit calls)
+# ============================================================================
+
+DEFAULT_OUTPUT_DIR = Path("reports")
+FIGURE_FORMATS = ['png', 'svg', 'pdf', 'html']
+
+# Workers are spawned, not forked: the parent has already started Arrow's
+# thread pools (reading the table), whose locks a forked child could inherit held
+WORKER_CONTEXT = multiprocessing.get_context("spawn")
+
+# Table of a worker process, opened by its initializer
+_TABLE: Optional[LazyDataTable] = None
+
+
+def _init_worker(data_path: str) -> None:
+    """Worker initializer: open the table (its columnar cache was built by the parent)."""
+    global _TABLE
+    if _TABLE is None:
+        _TABLE = open_table(Path(data_path))
+
+
+def safe_name(name: str) -> str:
+    """
+    Make a string usable as a file or directory name.
+
+    :param name: Run, method or variable name
+    :return: Name with unsafe characters replaced by '_'
+    """
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', str(name))
+
+
+def expand_spec(spec: Dict, header_sim_params: List[str], header_methods: List[str]) -> List[Dict]:
+    """
+    Validate a batch spec and resolve the defaults of every run.
+
+    Spec format:
+        {
+          "defaults": {...},           # optional, any run key
+          "runs": [
+            {"name": "T500_M50",
+             "filters": {"time_series_length": [500], "tau_range": [0, 10]},
+             "methods": ["..."],        # default: all methods
+             "x_variables": ["tau"],    # or "x_variable"
+             "color_variable": null,
+             "color_mode": "auto",      # or "facet" / "continuous"
+             "compare_methods": false}  # also write the all-methods comparison
+          ]
+        }
+
+    :param spec: Parsed spec file
+    :param header_sim_params: List of simulation parameter names
+    :param header_methods: List of method names
+    :return: List of runs with keys 'name', 'filters', 'methods', 'x_variables',
+             'color_variable', 'color_mode' and 'compare_methods'
+    """
+    defaults = spec.get('defaults', {})
+    runs = []
+    for i, run_spec in enumerate(spec.get('runs', [])):
+        run_spec = {**defaults, **run_spec}
+        methods = run_spec.get('methods') or ([run_spec['method']] if 'method' in run_spec else header_methods)
+        x_variables = run_spec.get('x_variables') or (
+            [run_spec['x_variable']] if 'x_variable' in run_spec else [])
+        color_variable = run_spec.get('color_variable')
+        color_mode = run_spec.get('color_mode', 'auto')
+
+        unknown_methods = [str(method) for method in methods if str(method) not in header_methods]
+        if unknown_methods:
+            raise ValueError(f"Run {i}: unknown methods {unknown_methods}")
+        for variable in x_variables + ([color_variable] if color_variable else []):
+            if variable not in header_sim_params:
+                raise ValueError(f"Run {i}: unknown simulation parameter {variable}")
+        if color_mode not in COLOR_MODES:
+            raise ValueError(f"Run {i}: color_mode must be one of {COLOR_MODES}")
+
+        runs.append({
+            'name': safe_name(run_spec.get('name', f"run_{i:03d}")),
+            'filters': normalize_filters(run_spec.get('filters'), header_sim_params),
+            'methods': [str(method) for method in methods],
+            'x_variables': x_variables,
+            'color_variable': color_variable,
+            'color_mode': color_mode,
+            'compare_methods': bool(run_spec.get('compare_methods', False)),
+        })
+
+    names = [run['name'] for run in runs]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate run names: {duplicates}")
+    return runs
+
+
+def resolve_figure_format(figure_format: str) -> str:
+    """
+    Return the figure format to write, falling back to HTML when static
+    image export (kaleido) is not installed.
+
+    :param figure_format: Requested format (see FIGURE_FORMATS)
+    :return: Format actually used
+    """
+    if figure_format not in FIGURE_FORMATS:
+        raise ValueError(f"Unknown figure format {figure_format}, expected one of {FIGURE_FORMATS}")
+    if figure_format != 'html' and importlib.util.find_spec('kaleido') is None:
+        return 'html'
+    return figure_format
+
+
+def run_config(table: LazyDataTable, run: Dict, output_dir: Path, figure_format: str) -> Dict:
+    """
+    Produce the tables and figures of one run.
+
+    Written files (below output_dir/<run name>/):
+        simulation_summary.csv
+        method_comparison.csv                (if compare_methods)
+        <method>/results_summary.csv
+        <method>/metrics_<x variable>.<format>
+
+    :param table: Loaded table
+    :param run: Run as returned by expand_spec
+    :param output_dir: Root output directory
+    :param figure_format: Figure format (see resolve_figure_format)
+    :return: Dictionary with 'name', 'n_rows', 'files' and 'seconds'
+    """
+    start = time.perf_counter()
+    run_dir = Path(output_dir) / run['name']
+    run_dir.mkdir(parents=True, exist_ok=True)
+    files = []
+
+    filtered_sims = filter_data_by_parameters(table.sim_data, run['filters'], index=table.filter_index)
+    compute_simulation_summary(filtered_sims, table.header_sim_params).to_csv(
+        run_dir / "simulation_summary.csv", index=False)
+    files.append(run_dir / "simulation_summary.csv")
+
+    if run['compare_methods'] and len(filtered_sims) > 0:
+        method_frame = build_method_metric_frame(table.with_methods(filtered_sims, table.header_methods),
+                                                 table.header_methods, table.header_metrics)
+        compute_method_statistics(method_frame).to_csv(run_dir / "method_comparison.csv")
+        files.append(run_dir / "method_comparison.csv")
+
+    for method in run['methods']:
+        if len(filtered_sims) == 0:
+            break
+        method_dir = run_dir / safe_name(method)
+        method_dir.mkdir(exist_ok=True)
+        filtered_data = table.with_method(filtered_sims, method)
+
+        compute_results_summary(filtered_data, method, table.header_metrics).to_csv(
+            method_dir / "results_summary.csv", index=False)
+        files.append(method_dir / "results_summary.csv")
+
+        for x_variable in run['x_variables']:
+            fig = build_metrics_figure(filtered_data, method, x_variable, table.header_metrics,
+                                       color_variable=run['color_variable'], color_mode=run['color_mode'])
+            if fig is None:
+                continue
+            figure_path = method_dir / f"metrics_{safe_name(x_variable)}.{figure_format}"
+            if figure_format == 'html':
+                fig.write_html(figure_path, include_plotlyjs='cdn')
+            else:
+                fig.write_image(figure_path)
+            files.append(figure_path)
+
+    return {
+        'name': run['name'],
+        'n_rows': len(filtered_sims),
+        'files': [str(path.relative_to(output_dir)) for path in files],
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def _run_guarded(table: LazyDataTable, run: Dict, output_dir: Path, figure_format: str) -> Dict:
+    """Run one configuration, reporting a failure instead of aborting the batch."""
+    try:
+        return run_config(table, run, output_dir, figure_format)
+    except Exception as error:
+        return {'name': run['name'], 'error': f"{type(error).__name__}: {error}"}
+
+
+def _run_in_worker(run: Dict, output_dir: str, figure_format: str) -> Dict:
+    """Run one configuration on the table shared with the worker process."""
+    return _run_guarded(_TABLE, run, Path(output_dir), figure_format)
+
+
+def run_batch(spec: Dict, data_path: Path = DEFAULT_DATA_PATH, output_dir: Path = DEFAULT_OUTPUT_DIR,
+              max_workers: int = None, figure_format: str = 'png') -> Dict:
+    """
+    Run every configuration of a spec in parallel and write the results to disk.
+
+    The table is opened (and ingested if needed) once in this process before
+    the worker pool starts; each spawned worker then opens it from the
+    columnar cache and reads the metric columns of the methods it needs.
+    An index of the written files is saved as output_dir/index.json.
+
+    :param spec: Parsed spec (see expand_spec)
+    :param data_path: Source CSV file or directory of shards
+    :param output_dir: Root output directory
+    :param max_workers: Number of worker processes (default: one per CPU, 1 runs inline)
+    :param figure_format: Figure format (see FIGURE_FORMATS; falls back to html without kaleido)
+    :return: Batch index: 'runs' (see run_config; failed runs have 'name' and 'error'),
+             'figure_format' and 'seconds'
+    """
+    start = time.perf_counter()
+    table = open_table(Path(data_path))
+    runs = expand_spec(spec, table.header_sim_params, table.header_methods)
+    figure_format = resolve_figure_format(figure_format)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    max_workers = min(max_workers or os.cpu_count() or 1, max(len(runs), 1))
+    if max_workers == 1:
+        results = [_run_guarded(table, run, output_dir, figure_format) for run in runs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=WORKER_CONTEXT,
+                                 initializer=_init_worker, initargs=(str(data_path),)) as pool:
+            results = list(pool.map(_run_in_worker, runs, [str(output_dir)] * len(runs),
+                                    [figure_format] * len(runs)))
+
+    index = {'runs': results, 'figure_format': figure_format, 'seconds': time.perf_counter() - start}
+    with open(output_dir / "index.json", "w") as handle:
+        json.dump(index, handle, indent=2)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Write statistics tables and figures for many filter/method/x-variable configurations."
+    )
+    parser.add_argument("spec", type=Path, help="JSON spec file with the runs")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_PATH,
+                        help="Source CSV file or directory of CSV shards")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    parser.add_argument("--format", choices=FIGURE_FORMATS, default='png',
+                        help="Figure format (falls back to html if kaleido is not installed)")
+    args = parser.parse_args()
+
+    with open(args.spec, "r") as handle:
+        spec = json.load(handle)
+    index = run_batch(spec, args.data, args.output_dir, args.workers, args.format)
+    n_files = sum(len(run.get('files', [])) for run in index['runs'])
+    print(f"{len(index['runs'])} runs, {n_files} files ({index['figure_format']} figures) "
+          f"written to {args.output_dir} in {index['seconds']:.1f}s")
+    for run in index['runs']:
+        if 'error' in run:
+            print(f"Run {run['name']} failed: {run['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+import argparse
+import json
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import pandas as pd
+
+from _utils.analysis import compute_results_summary, filter_data_by_parameters
+from _utils.helpers import create_metrics_plots
+from _utils.lazy_table import LazyDataTable
+from _utils.schema import clear_schema_cache, extract_metadata_from_data
+from _utils.synthetic import write_data_table
+
+
+# ============================================================================
+# BENCHMARKS OF THE APP'S HOT PATHS
+# ============================================================================
+
+DEFAULT_SCALES = [1_000, 10_000, 100_000]
+DEFAULT_BASELINE_PATH = Path("benchmarks/baseline.json")
+DEFAULT_REPEAT = 3
+
+# A case regresses when it is slower (or uses more memory) than the baseline
+# by more than this fraction and by more than the absolute slack
+DEFAULT_TOLERANCE = 0.5
+TIME_SLACK_SECONDS = 0.005
+MEMORY_SLACK_MB = 1.0
+
+BENCHMARK_METHOD = 'PA'
+BENCHMARK_X_VARIABLE = 'tau'
+BENCHMARK_FILTERS = {
+    'time_series_length': [1000, 2000, 5000],
+    'noiseDistr': ['poisson'],
+    'tau_range': (5.0, 40.0),
+}
+
+
+def measure(func: Callable[[], object], repeat: int = DEFAULT_REPEAT) -> Dict:
+    """
+    Time a function and record its peak Python/NumPy memory allocation.
+
+    :param func: Zero-argument function to measure
+    :param repeat: Number of timed runs (the best one is reported)
+    :return: Dictionary with 'seconds' (best run) and 'peak_mb' (tracemalloc peak of one run)
+    """
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {'seconds': min(timings), 'peak_mb': peak / 1e6}
+
+
+def run_benchmarks(scales: List[int], work_dir: Path, repeat: int = DEFAULT_REPEAT,
+                   nan_rate: float = 0.05) -> Dict[str, Dict]:
+    """
+    Generate a synthetic table per scale and measure the hot paths on it.
+
+    Cases: cold load (CSV parse and cache build), warm load (from the
+    columnar cache), extract_metadata_from_data (a cold parse: parsed headers
+    are memoized, so the schema cache is cleared first), filter_data_by_parameters
+    (column scan and FilterIndex), the results summary computation and the
+    construction of the metrics plots.
+
+    :param scales: Row counts of the synthetic tables
+    :param work_dir: Directory for the generated tables and their caches
+    :param repeat: Number of timed runs per case
+    :param nan_rate: Fraction of missing metric values
+    :return: Dictionary "case@rows" -> measurement (see measure)
+    """
+    results = {}
+    for n_rows in scales:
+        csv_path = write_data_table(Path(work_dir) / f"bench_{n_rows}" / "Data_table.csv", n_rows, nan_rate)
+
+        def cold_load():
+            for path in csv_path.parent.glob("Data_table.*"):
+                if path != csv_path:
+                    path.unlink()
+            return LazyDataTable(csv_path)
+
+        cases = {'load_cold': cold_load, 'load_warm': lambda: LazyDataTable(csv_path)}
+        results.update({f"{case}@{n_rows}": measure(func, repeat) for case, func in cases.items()})
+
+        table = LazyDataTable(csv_path)
+        full = table.with_method(table.sim_data, BENCHMARK_METHOD)
+        header = pd.DataFrame(columns=table.columns)
+        filtered = filter_data_by_parameters(table.sim_data, BENCHMARK_FILTERS, index=table.filter_index)
+        filtered_data = table.with_method(filtered, BENCHMARK_METHOD)
+
+        cases = {
+            'extract_metadata': lambda: (clear_schema_cache(), extract_metadata_from_data(header)),
+            'filter_scan': lambda: filter_data_by_parameters(full, BENCHMARK_FILTERS),
+            'filter_index': lambda: filter_data_by_parameters(table.sim_data, BENCHMARK_FILTERS,
+                                                              index=table.filter_index),
+            'results_summary': lambda: compute_results_summary(filtered_data, BENCHMARK_METHOD,
+                                                               table.header_metrics),
+            'metrics_plots': lambda: create_metrics_plots(filtered_data, BENCHMARK_METHOD,
+                                                          BENCHMARK_X_VARIABLE, table.header_metrics),
+        }
+        results.update({f"{case}@{n_rows}": measure(func, repeat) for case, func in cases.items()})
+    return results
+
+
+def compare_to_baseline(results: Dict[str, Dict], baseline: Dict[str, Dict],
+                        tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    List the cases that regressed against the baseline.
+
+    :param results: Output of run_benchmarks
+    :param baseline: Stored results of a previous run
+    :param tolerance: Allowed relative increase of time and memory
+    :return: Human-readable description of each regression
+    """
+    regressions = []
+    for case, result in results.items():
+        reference = baseline.get(case)
+        if reference is None:
+            continue
+        for key, slack, unit in [('seconds', TIME_SLACK_SECONDS, 's'), ('peak_mb', MEMORY_SLACK_MB, 'MB')]:
+            limit = max(reference[key] * (1 + tolerance), reference[key] + slack)
+            if result[key] > limit:
+                regressions.append(f"{case}: {key} {result[key]:.4g}{unit} > {limit:.4g}{unit} "
+                                   f"(baseline {reference[key]:.4g}{unit})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the app's hot paths on synthetic tables and check for regressions."
+    )
+    parser.add_argument("--rows", type=float, nargs="+", default=DEFAULT_SCALES,
+                        help="Table sizes to benchmark (e.g. 1e3 1e5 1e6)")
+    parser.add_argument("--nan-rate", type=float, default=0.05, help="Fraction of missing metric values")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Timed runs per case")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed relative slowdown / memory increase")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--work-dir", type=Path, default=None,
+                        help="Directory for generated tables (default: temporary, deleted afterwards)")
+    args = parser.parse_args()
+
+    work_dir = args.work_dir or Path(tempfile.mkdtemp(prefix="dim-bench-"))
+    try:
+        results = run_benchmarks([int(rows) for rows in args.rows], work_dir, args.repeat, args.nan_rate)
+    finally:
+        if args.work_dir is None:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    for case, result in results.items():
+        print(f"{case:<28} {result['seconds'] * 1000:>10.2f} ms {result['peak_mb']:>10.1f} MB")
+
+    if args.update_baseline or not args.baseline.exists():
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        with open(args.baseline, "w") as handle:
+            json.dump({'machine': platform.platform(), 'python': platform.python_version(),
+                       'results': results}, handle, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return
+
+    with open(args.baseline, "r") as handle:
+        baseline = json.load(handle)['results']
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print("Regressions against the baseline:")
+        for regression in regressions:
+            print(f"  {regression}")
+        sys.exit(1)
+    print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+import os
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import numpy as np
+
+from _utils.stats_engine import RESULTS_QUANTILES, RESULTS_STAT_COLUMNS
+
+
+# ============================================================================
+# VECTORIZED BOOTSTRAP CONFIDENCE INTERVALS OF THE SUMMARY STATISTICS
+# ============================================================================
+
+BOOTSTRAP_RESAMPLES = 1000
+BOOTSTRAP_CONFIDENCE = 0.95
+BOOTSTRAP_SEED = 0
+
+# Resamples are drawn in chunks of about this many (resample, row) weights, so
+# memory stays bounded. Chunk sizes depend on the number of rows only, and
+# every chunk has its own seed: results do not depend on the number of workers.
+CHUNK_WEIGHTS = 1 << 22
+
+# Rows per block when locating quantile positions in the resampled weights
+QUANTILE_BLOCK = 64
+
+# Below this many (row, resample) draws the bootstrap runs on the calling thread
+PARALLEL_MIN_DRAWS = 20_000_000
+
+
+def bootstrap_replicates(values: np.ndarray, seed: np.random.SeedSequence, n_resamples: int) -> np.ndarray:
+    """
+    Compute the RESULTS_STAT_COLUMNS statistics of every column on bootstrap resamples.
+
+    The row indices of each resample are drawn once and shared by all
+    columns (paired resampling), as per-row weights: means and standard
+    deviations are one matrix product with the weights, and quantiles are
+    located from the weights along each column's sorted values (block totals
+    first, then a short scan within one block).
+    NaNs are ignored per column, as in batched_column_statistics.
+
+    :param values: 2D float array (rows x columns)
+    :param seed: Seed of this chunk of resamples
+    :param n_resamples: Number of resamples
+    :return: Array of shape (n_resamples, columns, len(RESULTS_STAT_COLUMNS))
+    """
+    n_rows, n_cols = values.shape
+    rng = np.random.default_rng(seed)
+    indices = rng.integers(0, n_rows, size=(n_resamples, n_rows))
+    offsets = np.arange(n_resamples)[:, None] * n_rows
+    weights = np.bincount((indices + offsets).ravel(),
+                          minlength=n_resamples * n_rows).reshape(n_resamples, n_rows)
+
+    valid = ~np.isnan(values)
+    filled = np.where(valid, values, 0.0)
+    float_weights = weights.astype(np.float64)
+    count = float_weights @ valid
+    total = float_weights @ filled
+    total_sq = float_weights @ (filled * filled)
+
+    replicates = np.full((n_resamples, n_cols, len(RESULTS_STAT_COLUMNS)), np.nan)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean = total / count
+        replicates[:, :, 0] = mean
+        replicates[:, :, 1] = np.sqrt(np.maximum(total_sq - total * mean, 0) / (count - 1))
+
+    # An extra all-zero weight column pads every column's sorted rows to whole blocks
+    padded_weights = np.zeros((n_resamples, n_rows + 1), dtype=np.int32)
+    padded_weights[:, :n_rows] = weights
+    resample_ids = np.arange(n_resamples)
+
+    for col in range(n_cols):
+        rows = np.flatnonzero(valid[:, col])
+        if len(rows) == 0:
+            continue
+        order = rows[np.argsort(values[rows, col], kind='stable')]
+        sorted_values = values[order, col]
+
+        # Weights along the sorted values, in blocks of QUANTILE_BLOCK rows;
+        # only the (small) block totals are accumulated over the whole column
+        n_blocks = -(-len(order) // QUANTILE_BLOCK)
+        padded_order = np.concatenate([order, np.full(n_blocks * QUANTILE_BLOCK - len(order), n_rows)])
+        blocks = padded_weights[:, padded_order].reshape(n_resamples, n_blocks, QUANTILE_BLOCK)
+        block_totals = blocks.sum(axis=2, dtype=np.int32)
+        block_ends = np.cumsum(block_totals, axis=1)
+        block_starts = block_ends - block_totals
+        n_valid = block_ends[:, -1]
+
+        # Block ends of all resamples as one increasing array (resample r
+        # shifted by r * (n_rows + 1)), searched with a single call
+        shift = resample_ids * (n_rows + 1)
+        flat_ends = (block_ends + shift[:, None]).ravel()
+
+        def value_at(position: np.ndarray) -> np.ndarray:
+            """Value at a 0-based position of each resample's sorted valid values."""
+            block = np.searchsorted(flat_ends, position + shift, side='right') - resample_ids * n_blocks
+            block = np.minimum(block, n_blocks - 1)
+            within = np.cumsum(blocks[resample_ids, block], axis=1)
+            offset = (within <= (position - block_starts[resample_ids, block])[:, None]).sum(axis=1)
+            return sorted_values[np.minimum(block * QUANTILE_BLOCK + offset, len(order) - 1)]
+
+        has_values = n_valid > 0
+        for q_idx, quantile in enumerate(RESULTS_QUANTILES):
+            # Same linear interpolation as np.quantile
+            virtual = quantile * np.maximum(n_valid - 1, 0)
+            lower = np.floor(virtual)
+            upper = np.minimum(lower + 1, np.maximum(n_valid - 1, 0))
+            low_values = value_at(lower)
+            estimate = low_values + (virtual - lower) * (value_at(upper) - low_values)
+            replicates[:, col, 2 + q_idx] = np.where(has_values, estimate, np.nan)
+    return replicates
+
+
+def _bootstrap_chunks(values: np.ndarray, seeds: List[np.random.SeedSequence],
+                      sizes: List[int]) -> np.ndarray:
+    """Replicates of consecutive chunks (one worker's share), concatenated in order."""
+    return np.concatenate([bootstrap_replicates(values, seed, size) for seed, size in zip(seeds, sizes)])
+
+
+def bootstrap_intervals(values: np.ndarray, n_resamples: int = BOOTSTRAP_RESAMPLES,
+                        confidence: float = BOOTSTRAP_CONFIDENCE, seed: int = BOOTSTRAP_SEED,
+                        max_workers: int = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Percentile bootstrap confidence intervals of the summary statistics of every column.
+
+    Large problems (at least PARALLEL_MIN_DRAWS row draws) are split across
+    worker threads, one contiguous run of chunks per worker; the result is
+    identical to the single-threaded computation. Threads rather than
+    processes: this runs inside the app, where a forked child could inherit
+    held locks and a spawned one would re-run the app script (Streamlit
+    installs it as __main__), and the heavy NumPy steps release the GIL.
+
+    :param values: 2D float array (rows x columns)
+    :param n_resamples: Number of bootstrap resamples
+    :param confidence: Confidence level of the intervals
+    :param seed: Random seed
+    :param max_workers: Number of worker threads (default: one per CPU, 1 runs inline)
+    :return: Tuple of (lower, upper) bounds, each of shape (columns, len(RESULTS_STAT_COLUMNS))
+    """
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    n_rows, n_cols = values.shape
+    if n_rows == 0 or n_resamples < 1:
+        empty = np.full((n_cols, len(RESULTS_STAT_COLUMNS)), np.nan)
+        return empty, empty.copy()
+
+    chunk_resamples = max(1, min(n_resamples, CHUNK_WEIGHTS // n_rows))
+    sizes = [min(chunk_resamples, n_resamples - start) for start in range(0, n_resamples, chunk_resamples)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+
+    max_workers = min(max_workers or os.cpu_count() or 1, len(sizes))
+    if max_workers == 1 or n_rows * n_resamples < PARALLEL_MIN_DRAWS:
+        replicates = _bootstrap_chunks(values, seeds, sizes)
+    else:
+        bounds = np.linspace(0, len(sizes), max_workers + 1).astype(int)
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(_bootstrap_chunks, values, seeds[start:stop], sizes[start:stop])
+                       for start, stop in zip(bounds[:-1], bounds[1:])]
+            replicates = np.concatenate([future.result() for future in futures])
+
+    alpha = (1 - confidence) / 2
+    with warnings.catch_warnings():
+        # Columns without valid values have all-NaN replicates
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        lower, upper = np.nanquantile(replicates, [alpha, 1 - alpha], axis=0)
+    return lower, upper
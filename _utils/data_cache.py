@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import pandas as pd
+
+
+# ============================================================================
+# COLUMNAR ON-DISK CACHE FOR THE SIMULATION TABLE
+# ============================================================================
+
+CACHE_SUFFIX = ".parquet"
+MANIFEST_SUFFIX = ".cache.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def get_cache_paths(csv_path: Path) -> Tuple[Path, Path]:
+    """
+    Return the paths of the columnar cache and of its manifest for a CSV file.
+
+    Both files live next to the source CSV (e.g. data/Data_table.parquet and
+    data/Data_table.cache.json).
+
+    :param csv_path: Path to the source CSV file
+    :return: Tuple of (cache_path, manifest_path)
+    """
+    csv_path = Path(csv_path)
+    return (csv_path.with_suffix(CACHE_SUFFIX),
+            csv_path.with_suffix(MANIFEST_SUFFIX))
+
+
+def hash_file(path: Path) -> str:
+    """
+    Compute the SHA-256 digest of a file, reading it in fixed-size chunks.
+
+    :param path: Path to the file
+    :return: Hex digest string
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_file_key(path: Path, with_hash: bool = True) -> Dict:
+    """
+    Build the cache key of a file from its modification time, size and content hash.
+
+    :param path: Path to the file
+    :param with_hash: Whether to include the (expensive) content hash
+    :return: Dictionary with 'mtime_ns', 'size' and optionally 'sha256'
+    """
+    stat = os.stat(path)
+    key = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if with_hash:
+        key['sha256'] = hash_file(path)
+    return key
+
+
+def read_manifest(manifest_path: Path) -> Optional[Dict]:
+    """
+    Read a cache manifest, returning None if it is missing or unreadable.
+
+    :param manifest_path: Path to the manifest JSON file
+    :return: Manifest dictionary or None
+    """
+    try:
+        with open(manifest_path, "r") as handle:
+            return json.load(handle)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(manifest_path: Path, manifest: Dict) -> None:
+    """
+    Atomically write a cache manifest.
+
+    :param manifest_path: Path to the manifest JSON file
+    :param manifest: Manifest dictionary
+    """
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w") as handle:
+        json.dump(manifest, handle, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+
+def validate_manifest(csv_path: Path, manifest_path: Path, artifact_path: Path) -> Optional[Dict]:
+    """
+    Check whether an artifact derived from a CSV file (cache, store) is up to date.
+
+    The cheap (mtime, size) pair is compared first. If only the mtime differs
+    (e.g. the file was touched or copied), the content hash decides, and the
+    manifest is refreshed so that later checks are cheap again.
+
+    :param csv_path: Path to the source CSV file
+    :param manifest_path: Path to the artifact's manifest (holding 'source_key')
+    :param artifact_path: Path to the artifact itself
+    :return: The valid manifest, or None if the artifact must be (re)built
+    """
+    manifest = read_manifest(manifest_path)
+    if manifest is None or not artifact_path.exists():
+        return None
+
+    key = compute_file_key(csv_path, with_hash=False)
+    cached_key = manifest.get('source_key', {})
+    if key['size'] != cached_key.get('size'):
+        return None
+    if key['mtime_ns'] == cached_key.get('mtime_ns'):
+        return manifest
+
+    # Same size, different mtime: fall back to the content hash
+    if hash_file(csv_path) != cached_key.get('sha256'):
+        return None
+    manifest['source_key']['mtime_ns'] = key['mtime_ns']
+    write_manifest(manifest_path, manifest)
+    return manifest
+
+
+def validate_cache(csv_path: Path) -> Optional[Dict]:
+    """
+    Check whether the columnar cache of a CSV file is up to date.
+
+    :param csv_path: Path to the source CSV file
+    :return: The valid manifest, or None if the cache must be (re)built
+    """
+    cache_path, manifest_path = get_cache_paths(csv_path)
+    return validate_manifest(csv_path, manifest_path, cache_path)
+
+
+def build_columnar_cache(csv_path: Path) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Parse the CSV file and write its columnar (Parquet) cache next to it.
+
+    :param csv_path: Path to the source CSV file
+    :return: Tuple of (DataFrame, manifest)
+    """
+    cache_path, manifest_path = get_cache_paths(csv_path)
+
+    start = time.perf_counter()
+    source_key = compute_file_key(csv_path)
+    df = pd.read_csv(csv_path)
+    parse_seconds = time.perf_counter() - start
+
+    tmp_path = cache_path.with_name(cache_path.name + ".tmp")
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cache_path)
+
+    manifest = {
+        'source': str(csv_path),
+        'source_key': source_key,
+        'cache_file': cache_path.name,
+        'cold_load_seconds': parse_seconds,
+        'build_seconds': time.perf_counter() - start,
+        'shape': list(df.shape),
+    }
+    write_manifest(manifest_path, manifest)
+    return df, manifest
+
+
+def make_load_report(manifest: Dict, cache_path: Path, cache_hit: bool,
+                     load_seconds: float) -> Dict:
+    """
+    Summarize a load for display (cold vs warm timing).
+
+    :param manifest: Cache manifest
+    :param cache_path: Path to the columnar cache
+    :param cache_hit: Whether the cache was used
+    :param load_seconds: Wall time of this load
+    :return: Dictionary with 'cache_hit', 'cache_path', 'load_seconds',
+             'cold_load_seconds', 'speedup' and 'version'
+    """
+    cold_seconds = manifest['cold_load_seconds']
+    return {
+        'cache_hit': cache_hit,
+        'cache_path': str(cache_path),
+        'load_seconds': load_seconds,
+        'cold_load_seconds': cold_seconds,
+        'speedup': cold_seconds / load_seconds if cache_hit and load_seconds > 0 else 1.0,
+        'version': manifest['source_key']['sha256'],
+    }
+
+
+def load_data_table(csv_path: Path) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Load the simulation table, using the columnar cache when it is up to date.
+
+    The first load (or any load after the CSV changed) parses the CSV and
+    rebuilds the cache; later loads read the Parquet file directly.
+
+    :param csv_path: Path to the source CSV file
+    :return: Tuple of (DataFrame, load report from make_load_report)
+    """
+    csv_path = Path(csv_path)
+    cache_path, _ = get_cache_paths(csv_path)
+
+    start = time.perf_counter()
+    manifest = validate_cache(csv_path)
+    cache_hit = manifest is not None
+    if cache_hit:
+        df = pd.read_parquet(cache_path)
+    else:
+        df, manifest = build_columnar_cache(csv_path)
+    load_seconds = time.perf_counter() - start
+
+    return df, make_load_report(manifest, cache_path, cache_hit, load_seconds)
@@ -0,0 +1,103 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# COMPACT DTYPE REPRESENTATION OF THE SIMULATION TABLE
+# ============================================================================
+
+def is_float32_lossless(values: np.ndarray) -> bool:
+    """
+    Check whether a float64 array survives a float32 round trip unchanged.
+
+    :param values: Float array
+    :return: True if casting to float32 loses no precision
+    """
+    with np.errstate(over='ignore'):
+        return bool(np.array_equal(values.astype(np.float32).astype(np.float64),
+                                   values, equal_nan=True))
+
+
+def compact_column(series: pd.Series, enumerated: bool = False) -> pd.Series:
+    """
+    Return a column with the smallest dtype that represents it exactly.
+
+    - String columns become ordered categoricals when `enumerated` is True
+      (ordered, so that min/max still work in the summaries).
+    - Integer columns, and float columns holding only integers without NaNs,
+      are downcast to the smallest signed integer type.
+    - Other float columns become float32 when that loses no precision.
+
+    :param series: Input column
+    :param enumerated: Whether the column is an enumerated simulation parameter
+    :return: Compacted column (the input itself if nothing can be saved)
+    """
+    if pd.api.types.is_bool_dtype(series) or isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+
+    if pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+        if not enumerated:
+            return series
+        categories = sorted(series.dropna().unique())
+        return series.astype(pd.CategoricalDtype(categories, ordered=True))
+
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast='integer')
+
+    if pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=np.float64)
+        if len(values) and not np.isnan(values).any() and np.array_equal(values, np.round(values)):
+            downcast = pd.to_numeric(series, downcast='integer')
+            if pd.api.types.is_integer_dtype(downcast):
+                return downcast
+        if series.dtype != np.float32 and is_float32_lossless(values):
+            return series.astype(np.float32)
+
+    return series
+
+
+def compact_dtypes(df: pd.DataFrame, header_sim_params: List[str],
+                   header_metrics: List[str]) -> Tuple[pd.DataFrame, Dict]:
+    """
+    Compact the dtypes of the simulation table, driven by its extracted metadata.
+
+    Simulation parameters (from extract_metadata_from_data) are compacted with
+    enumerated string parameters turned into categoricals; {method}_{metric}
+    columns (any column ending in one of `header_metrics`) are compacted as
+    numbers. Other columns are left untouched.
+
+    :param df: Input DataFrame (not modified)
+    :param header_sim_params: List of simulation parameter column names
+    :param header_metrics: List of metric names
+    :return: Tuple of (compacted DataFrame, report). The report contains
+             'bytes_before', 'bytes_after', 'bytes_saved' and 'converted'
+             (column -> (old dtype, new dtype))
+    """
+    bytes_before = int(df.memory_usage(deep=True).sum())
+    metric_suffixes = tuple(f"_{metric}" for metric in header_metrics)
+
+    compacted = {}
+    converted = {}
+    for col in df.columns:
+        if col in header_sim_params:
+            new_col = compact_column(df[col], enumerated=True)
+        elif metric_suffixes and col.endswith(metric_suffixes):
+            new_col = compact_column(df[col])
+        else:
+            new_col = df[col]
+        if new_col.dtype != df[col].dtype:
+            converted[col] = (str(df[col].dtype), str(new_col.dtype))
+        compacted[col] = new_col
+
+    compacted_df = pd.DataFrame(compacted, index=df.index)
+    bytes_after = int(compacted_df.memory_usage(deep=True).sum())
+
+    report = {
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+        'converted': converted,
+    }
+    return compacted_df, report
@@ -0,0 +1,192 @@
+import argparse
+import gzip
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from _utils.analysis import filter_data_by_parameters, normalize_filters
+from _utils.lazy_table import DEFAULT_DATA_PATH, EXPORT_BATCH_ROWS, LazyDataTable, open_table
+
+
+# ============================================================================
+# STREAMING EXPORT OF FILTERED SUBSETS
+# ============================================================================
+
+# Export format -> file suffix
+EXPORT_FORMATS = {
+    'parquet': ".parquet",
+    'feather': ".feather",
+    'csv.gz': ".csv.gz",
+}
+EXPORT_MIME_TYPES = {
+    'parquet': "application/vnd.apache.parquet",
+    'feather': "application/vnd.apache.arrow.file",
+    'csv.gz': "application/gzip",
+}
+DEFAULT_EXPORT_DIR = "exports"
+
+# Exports older than this are deleted whatever session wrote them
+EXPORT_MAX_AGE_SECONDS = 24 * 3600
+
+
+def export_columns(table: LazyDataTable, method: str = None) -> List[str]:
+    """
+    Columns of an export: all columns, or the simulation parameters and one method's metrics.
+
+    :param table: Loaded table
+    :param method: Optional method to project the export onto
+    :return: List of column names, in table order
+    """
+    if method is None:
+        return list(table.columns)
+    if method not in table.header_methods:
+        raise ValueError(f"Unknown method: {method}")
+    return table.header_sim_params + table.method_columns(method)
+
+
+def write_batches(batches: Iterator[pd.DataFrame], path: Path, export_format: str) -> int:
+    """
+    Write DataFrame batches to one file, one batch at a time.
+
+    The Arrow schema of the first batch is kept for all of them, so a later
+    batch with e.g. an all-missing column is still written with its type.
+
+    :param batches: Iterator of DataFrames with the same columns
+    :param path: Output file
+    :param export_format: One of EXPORT_FORMATS
+    :return: Number of rows written
+    """
+    n_rows = 0
+    schema = None
+    writer = None
+    try:
+        for batch in batches:
+            if export_format == 'csv.gz':
+                if writer is None:
+                    writer = gzip.open(path, "wt", newline="")
+                batch.to_csv(writer, header=n_rows == 0, index=False)
+            else:
+                arrow_batch = pa.Table.from_pandas(batch, schema=schema, preserve_index=False)
+                if writer is None:
+                    schema = arrow_batch.schema
+                    if export_format == 'parquet':
+                        writer = pq.ParquetWriter(path, schema, compression='zstd')
+                    else:
+                        writer = pa.ipc.new_file(str(path), schema,
+                                                 options=pa.ipc.IpcWriteOptions(compression='lz4'))
+                writer.write_table(arrow_batch)
+            n_rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    return n_rows
+
+
+def export_rows(table: LazyDataTable, frame: pd.DataFrame, path: Path, export_format: str = 'parquet',
+                method: str = None, batch_rows: int = EXPORT_BATCH_ROWS) -> Dict:
+    """
+    Stream the rows of a (filtered) sim-parameter frame to a Parquet, Feather or gzip CSV file.
+
+    Rows are read from the columnar cache or store and written in batches of
+    `batch_rows`, so memory use does not grow with the size of the selection.
+    The file is written under a temporary name and renamed once complete.
+
+    :param table: Loaded table
+    :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+    :param path: Output file
+    :param export_format: One of EXPORT_FORMATS
+    :param method: Optional method to project the export onto (its metric columns only)
+    :param batch_rows: Maximum number of rows per batch
+    :return: Dictionary with 'path', 'format', 'rows', 'columns', 'bytes' and 'seconds'
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"export_format must be one of {list(EXPORT_FORMATS)}")
+    columns = export_columns(table, method)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    start = time.perf_counter()
+    tmp_path = path.with_name(path.name + ".tmp")
+    batches = table.iter_rows(frame, columns, batch_rows)
+    if len(frame) == 0:
+        # Still write a (header-only) file with the right columns
+        batches = iter([pd.DataFrame(columns=columns)])
+    n_rows = write_batches(batches, tmp_path, export_format)
+    os.replace(tmp_path, path)
+
+    return {
+        'path': str(path),
+        'format': export_format,
+        'rows': n_rows,
+        'columns': len(columns),
+        'bytes': path.stat().st_size,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def prune_exports(export_dir: Path, prefix: str, keep: Path = None,
+                  max_age_seconds: float = EXPORT_MAX_AGE_SECONDS) -> List[Path]:
+    """
+    Delete the previous exports of a session, and exports abandoned by any session.
+
+    :param export_dir: Directory of the exports
+    :param prefix: File name prefix of the session's exports
+    :param keep: Export to keep (e.g. the one just written)
+    :param max_age_seconds: Age beyond which any export is deleted
+    :return: Deleted files
+    """
+    export_dir = Path(export_dir)
+    if not export_dir.is_dir():
+        return []
+    keep = Path(keep).resolve() if keep is not None else None
+    now = time.time()
+    deleted = []
+    for path in export_dir.iterdir():
+        if not path.is_file() or path.resolve() == keep:
+            continue
+        try:
+            if path.name.startswith(prefix) or now - path.stat().st_mtime > max_age_seconds:
+                path.unlink()
+                deleted.append(path)
+        except OSError:
+            # Deleted concurrently by another session
+            continue
+    return deleted
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export the simulations matching a set of filters as Parquet, Feather or gzip CSV."
+    )
+    parser.add_argument("output", type=Path, help="Output file")
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_PATH,
+                        help="Source CSV file or directory of CSV shards")
+    parser.add_argument("--filters", type=str, default=None,
+                        help="Filters as JSON (e.g. '{\"noiseDistr\": \"poisson\", \"tau_range\": [5, 40]}')")
+    parser.add_argument("--method", default=None, help="Only export this method's metric columns")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default=None,
+                        help="Export format (default: from the output file suffix)")
+    args = parser.parse_args()
+
+    export_format = args.format
+    if export_format is None:
+        export_format = next((fmt for fmt, suffix in EXPORT_FORMATS.items()
+                              if args.output.name.endswith(suffix)), 'parquet')
+
+    table = open_table(args.data)
+    selected_filters = normalize_filters(json.loads(args.filters) if args.filters else None,
+                                         table.header_sim_params)
+    filtered_sims = filter_data_by_parameters(table.sim_data, selected_filters, index=table.filter_index)
+    report = export_rows(table, filtered_sims, args.output, export_format, args.method)
+    print(f"Exported {report['rows']} rows x {report['columns']} columns to {report['path']} "
+          f"({report['bytes'] / 1e6:.1f} MB) in {report['seconds']:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative, sample_colorscale
+from plotly.subplots import make_subplots
+from typing import List
+import math
+
+from _utils.instrumentation import instrumented
+from _utils.plot_aggregation import (
+    COLOR_MODES,
+    aggregate_by_x,
+    choose_color_mode,
+    choose_render_mode,
+    group_rows_by_level,
+    to_plot_array,
+)
+
+
+# ============================================================================
+# METRICS FIGURE (Plotly only: shared by the app, the prefetcher and batch reports)
+# ============================================================================
+
+def create_scatter_trace(scatter_class, x_data: np.ndarray, y_data: np.ndarray, metric: str,
+                         color_data: np.ndarray = None, color_variable: str = None,
+                         show_colorbar: bool = False):
+    """
+    Create the marker trace of one metric subplot.
+    
+    :param scatter_class: go.Scatter (SVG) or go.Scattergl (WebGL)
+    :param x_data: Independent variable values
+    :param y_data: Metric values
+    :param metric: Metric name
+    :param color_data: Optional values used for color coding
+    :param color_variable: Name of the color variable
+    :param show_colorbar: Whether this trace shows the colorbar
+    :return: Plotly trace
+    """
+    return scatter_class(
+        x=x_data,
+        y=y_data,
+        mode='markers',
+        name=metric,
+        showlegend=False,
+        marker=dict(
+            size=7,
+            color=color_data if color_data is not None else 'rgba(99, 99, 99, 0.8)',
+            colorscale='Greys' if color_data is not None else None,
+            showscale=show_colorbar,
+            reversescale=True if color_data is not None else False,
+            line=dict(
+                color='royalblue',
+                width=0.5
+            ),
+            colorbar=dict(
+                title=color_variable if color_variable else None,
+                thickness=15,
+                len=0.7,
+                x=1.02
+            ) if show_colorbar else None,
+            opacity=0.75
+        )
+    )
+
+
+def create_aggregate_traces(x_data: pd.Series, y_data: pd.Series,
+                            show_legend: bool = False) -> List[go.Scatter]:
+    """
+    Create the traces summarizing y per x value: 5-95% band, IQR band and median.
+    
+    :param x_data: Independent variable values (no NaNs)
+    :param y_data: Metric values aligned with x_data (no NaNs)
+    :param show_legend: Whether the traces appear in the legend
+    :return: List of Plotly traces
+    """
+    agg = aggregate_by_x(x_data, y_data)
+    band_line = dict(width=0)
+    
+    return [
+        go.Scatter(x=agg['x'], y=agg['q95'], mode='lines', line=band_line,
+                   legendgroup='outer', showlegend=False, hoverinfo='skip'),
+        go.Scatter(x=agg['x'], y=agg['q5'], mode='lines', line=band_line,
+                   fill='tonexty', fillcolor='rgba(65, 105, 225, 0.15)',
+                   name='5–95%', legendgroup='outer', showlegend=show_legend, hoverinfo='skip'),
+        go.Scatter(x=agg['x'], y=agg['q75'], mode='lines', line=band_line,
+                   legendgroup='iqr', showlegend=False, hoverinfo='skip'),
+        go.Scatter(x=agg['x'], y=agg['q25'], mode='lines', line=band_line,
+                   fill='tonexty', fillcolor='rgba(65, 105, 225, 0.35)',
+                   name='IQR', legendgroup='iqr', showlegend=show_legend, hoverinfo='skip'),
+        go.Scatter(x=agg['x'], y=agg['q50'], mode='lines+markers',
+                   line=dict(color='royalblue', width=2), marker=dict(size=5),
+                   customdata=agg['count'],
+                   hovertemplate="x: %{x}<br>median: %{y:.4g}<br>n: %{customdata}<extra></extra>",
+                   name='Median', legendgroup='median', showlegend=show_legend),
+    ]
+
+
+def facet_colors(levels: np.ndarray) -> List[str]:
+    """
+    Pick one color per level of a faceted color variable.
+
+    Numeric levels are sampled along a sequential scale (so their order stays
+    visible), other levels cycle through a qualitative palette.
+
+    :param levels: Sorted levels
+    :return: List of colors, one per level
+    """
+    if len(levels) and all(isinstance(level, (int, float, np.number)) for level in levels):
+        if len(levels) == 1:
+            return sample_colorscale('Viridis', [0.0])
+        return sample_colorscale('Viridis', list(np.linspace(0, 0.9, len(levels))))
+    palette = qualitative.Plotly
+    return [palette[idx % len(palette)] for idx in range(len(levels))]
+
+
+def create_facet_traces(scatter_class, x_values: np.ndarray, y_values: np.ndarray,
+                        levels: np.ndarray, level_rows: List[np.ndarray], colors: List[str],
+                        aggregate: bool = False, show_legend: bool = False) -> list:
+    """
+    Create one trace per level of the color variable in one metric subplot.
+
+    Traces of the same level share a legend group across subplots, so a
+    legend click toggles that level everywhere.
+
+    :param scatter_class: go.Scatter (SVG) or go.Scattergl (WebGL)
+    :param x_values: Independent variable values of all rows
+    :param y_values: Metric values of all rows
+    :param levels: Levels of the color variable (see group_rows_by_level)
+    :param level_rows: Valid row positions of each level
+    :param colors: Color of each level
+    :param aggregate: Whether to draw the per-x median of each level instead of its points
+    :param show_legend: Whether the traces appear in the legend
+    :return: List of Plotly traces
+    """
+    traces = []
+    for level, rows, color in zip(levels, level_rows, colors):
+        if len(rows) == 0:
+            continue
+        name = f"{level:g}" if isinstance(level, (float, np.floating)) else str(level)
+        if aggregate:
+            agg = aggregate_by_x(pd.Series(x_values[rows]), pd.Series(y_values[rows]))
+            traces.append(go.Scatter(
+                x=agg['x'], y=agg['q50'], mode='lines+markers',
+                line=dict(color=color, width=2), marker=dict(size=5),
+                customdata=agg['count'],
+                hovertemplate=f"{name}<br>x: %{{x}}<br>median: %{{y:.4g}}<br>n: %{{customdata}}<extra></extra>",
+                name=name, legendgroup=name, showlegend=show_legend
+            ))
+        else:
+            traces.append(scatter_class(
+                x=x_values[rows], y=y_values[rows], mode='markers',
+                name=name, legendgroup=name, showlegend=show_legend,
+                marker=dict(size=7, color=color, opacity=0.75, line=dict(color='white', width=0.5))
+            ))
+    return traces
+
+
+@instrumented
+def build_metrics_figure(filtered_data: pd.DataFrame, method: str, x_variable: str,
+                         header_metrics: List[str], 
+                         color_variable: str = None,
+                         render_mode: str = 'auto',
+                         color_mode: str = 'auto') -> go.Figure:
+    """
+    Build subplots for all metrics as a function of the selected independent variable.
+    Displays plots in a 3-column grid layout. Does not call any Streamlit function.
+    
+    Small selections are drawn as SVG markers, medium ones with WebGL markers,
+    and large ones as per-x aggregates (median, IQR and 5–95% band) computed
+    server-side, so the browser payload stays bounded.
+    
+    A faceted color variable is drawn as one trace group per level (one
+    median line per level when aggregated); rows are grouped by level once
+    for all subplots. Numeric columns are sent as float32 typed arrays.
+    
+    :param filtered_data: Filtered DataFrame
+    :param method: Selected method name
+    :param x_variable: Independent variable name
+    :param header_metrics: List of metric names
+    :param color_variable: Optional variable to use for color coding
+    :param render_mode: 'auto' (choose from the number of rows), 'svg', 'webgl' or 'aggregate'
+    :param color_mode: 'auto' (choose from the color variable), 'facet' (one trace group
+                       per level) or 'continuous' (color scale; ignored when aggregated)
+    :return: Plotly Figure object, or None if no metric has data
+    """
+    if color_mode not in COLOR_MODES:
+        raise ValueError(f"color_mode must be one of {COLOR_MODES}")
+    if render_mode == 'auto':
+        render_mode = choose_render_mode(len(filtered_data))
+    
+    # Remove metrics that don't have data for this method or have too many NaNs
+    available_metrics = []
+    for metric in header_metrics:
+        col_name = f"{method}_{metric}"
+        if col_name in filtered_data.columns:
+            # Check if most values are not NaN
+            if filtered_data[col_name].notna().sum() > len(filtered_data) * 0.1:
+                available_metrics.append(metric)
+    
+    if not available_metrics:
+        return None
+    
+    # Calculate grid dimensions (3 columns)
+    cols_per_row = 3
+    num_rows = math.ceil(len(available_metrics) / cols_per_row)
+    
+    # Create subplots with 3 columns
+    fig = make_subplots(
+        rows=num_rows, 
+        cols=cols_per_row,
+        subplot_titles=[metric.replace('_', ' ').title() for metric in available_metrics],
+        vertical_spacing=0.12,
+        horizontal_spacing=0.10
+    )
+    
+    # Columns shared by all subplots are converted (and grouped) once
+    x_values = to_plot_array(filtered_data[x_variable])
+    x_valid = filtered_data[x_variable].notna().to_numpy()
+    
+    color_data = None
+    if color_variable and color_variable in filtered_data.columns:
+        color_data = filtered_data[color_variable]
+        if color_mode == 'auto':
+            color_mode = choose_color_mode(color_data)
+    else:
+        color_mode = None
+    
+    if color_mode == 'facet':
+        levels, level_rows = group_rows_by_level(color_data)
+        colors = facet_colors(levels)
+    elif color_mode == 'continuous':
+        if pd.api.types.is_numeric_dtype(color_data) and not pd.api.types.is_bool_dtype(color_data):
+            color_values = to_plot_array(color_data)
+        else:
+            # Non-numeric levels are colored by their rank
+            codes = pd.factorize(color_data, sort=True)[0]
+            color_values = np.where(codes >= 0, codes, np.nan).astype(np.float32)
+    
+    scatter_class = go.Scattergl if render_mode == 'webgl' else go.Scatter
+    
+    # Add traces for each metric
+    for idx, metric in enumerate(available_metrics):
+        col_name = f"{method}_{metric}"
+        
+        # Get valid data (non-NaN)
+        y_values = to_plot_array(filtered_data[col_name])
+        valid_mask = x_valid & ~np.isnan(y_values)
+        
+        # Calculate position in grid
+        row_pos = (idx // cols_per_row) + 1
+        col_pos = (idx % cols_per_row) + 1
+        
+        if color_mode == 'facet':
+            valid_rows = [rows[valid_mask[rows]] for rows in level_rows]
+            traces = create_facet_traces(scatter_class, x_values, y_values, levels, valid_rows, colors,
+                                         aggregate=(render_mode == 'aggregate'), show_legend=(idx == 0))
+        elif render_mode == 'aggregate':
+            traces = create_aggregate_traces(pd.Series(x_values[valid_mask]), pd.Series(y_values[valid_mask]),
+                                             show_legend=(idx == 0))
+        else:
+            # Show colorbar only on the last trace if we have color data
+            show_colorbar = (idx == len(available_metrics) - 1) and (color_mode == 'continuous')
+            traces = [create_scatter_trace(
+                scatter_class, x_values[valid_mask], y_values[valid_mask], metric,
+                color_values[valid_mask] if color_mode == 'continuous' else None,
+                color_variable, show_colorbar
+            )]
+        for trace in traces:
+            fig.add_trace(trace, row=row_pos, col=col_pos)
+        
+        # Update axes labels
+        fig.update_xaxes(
+            title_text=x_variable.replace('_', ' ').title(), 
+            row=row_pos, col=col_pos,
+            showgrid=True,
+            gridwidth=0.5,
+            griddash='dash',
+            gridcolor='rgba(200, 200, 200, 0.4)'
+        )
+        fig.update_yaxes(
+            title_text=metric.replace('_', ' ').title(), 
+            row=row_pos, col=col_pos,
+            showgrid=True,
+            gridwidth=0.5,
+            griddash='dash',
+            gridcolor='rgba(200, 200, 200, 0.4)'
+        )
+    
+    # Update layout
+    plot_height = 350 * num_rows  # Approx 3x the original (250 -> ~350 per plot)
+    color_info = f" | Color: {color_variable}" if color_mode else ""
+    
+    if render_mode == 'aggregate':
+        color_info = f" | {len(filtered_data)} simulations aggregated per x value"
+        if color_mode == 'facet':
+            color_info += f" and {color_variable}"
+    
+    fig.update_layout(
+        height=plot_height,
+        width=1400,
+        showlegend=(render_mode == 'aggregate' or color_mode == 'facet'),
+        legend=dict(title=dict(text=color_variable)) if color_mode == 'facet' else None,
+        title_text=f"Method: {method} | X-axis: {x_variable}{color_info}",
+        font=dict(size=10),
+        margin=dict(r=150)  # Extra margin on right for colorbar
+    )
+    
+    return fig
@@ -0,0 +1,333 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# BITMAP / SORTED-ARRAY INDEX FOR SIMULATION FILTERING
+# ============================================================================
+
+# Same threshold used by create_simulation_filter_widgets to choose between a
+# multiselect (few distinct values) and a range slider
+MAX_BITMAP_VALUES = 10
+
+
+class FilterIndex:
+    """
+    Per-parameter index over the simulation-parameter columns, built once at load time.
+
+    - Low-cardinality parameters (e.g. gen, noiseDistr, equalNoise, soft_norm)
+      get one packed boolean bitmap per distinct value.
+    - Every numeric parameter with more distinct values (e.g. tau) gets its
+      values sorted together with the row order, so range predicates reduce
+      to two binary searches.
+
+    A filter then becomes a bitwise AND of packed masks (OR within a
+    multiselect), and the rows are extracted with a single final take.
+    """
+
+    def __init__(self, df: pd.DataFrame, params: List[str],
+                 max_bitmap_values: int = MAX_BITMAP_VALUES):
+        """
+        :param df: DataFrame holding (at least) the parameter columns
+        :param params: Parameter columns to index
+        :param max_bitmap_values: Maximum number of distinct values for bitmap indexing
+        """
+        self.n_rows = len(df)
+        self.params = list(params)
+        self.bitmaps: Dict[str, Dict[Hashable, np.ndarray]] = {}
+        self.nan_bitmaps: Dict[str, np.ndarray] = {}
+        self.sorted_values: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+        self._values: Dict[str, np.ndarray] = {}
+
+        self.all_rows = np.packbits(np.ones(self.n_rows, dtype=bool))
+
+        for param in self.params:
+            column = df[param]
+            values = column.to_numpy()
+            self._values[param] = values
+
+            is_nan = column.isna().to_numpy()
+            self.nan_bitmaps[param] = np.packbits(is_nan)
+
+            codes, uniques = pd.factorize(column, sort=True)
+            if len(uniques) <= max_bitmap_values:
+                self.bitmaps[param] = {
+                    uniques[code]: np.packbits(codes == code)
+                    for code in range(len(uniques))
+                }
+            elif pd.api.types.is_numeric_dtype(column):
+                valid_rows = np.flatnonzero(~is_nan)
+                order = valid_rows[np.argsort(values[valid_rows], kind='stable')]
+                self.sorted_values[param] = (values[order], order)
+
+    # ------------------------------------------------------------------------
+    # Packed-mask helpers
+    # ------------------------------------------------------------------------
+
+    def pack_rows(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Build a packed mask with the given row positions set.
+
+        :param rows: Row positions
+        :return: Packed uint8 mask
+        """
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[rows] = True
+        return np.packbits(mask)
+
+    def unpack(self, packed: np.ndarray) -> np.ndarray:
+        """
+        Expand a packed mask into a boolean array of length n_rows.
+
+        :param packed: Packed uint8 mask
+        :return: Boolean mask
+        """
+        return np.unpackbits(packed, count=self.n_rows).view(bool)
+
+    def count(self, packed: np.ndarray) -> int:
+        """
+        Count the rows set in a packed mask.
+
+        :param packed: Packed uint8 mask
+        :return: Number of selected rows
+        """
+        return int(np.unpackbits(packed).sum())
+
+    # ------------------------------------------------------------------------
+    # Predicates
+    # ------------------------------------------------------------------------
+
+    def value_mask(self, param: str, values: List) -> np.ndarray:
+        """
+        Packed mask of the rows whose parameter value is in `values` (multiselect).
+
+        :param param: Parameter name
+        :param values: Accepted values
+        :return: Packed uint8 mask
+        """
+        bitmaps = self.bitmaps.get(param)
+        if bitmaps is None:
+            return np.packbits(pd.Series(self._values[param]).isin(values).to_numpy())
+
+        packed = np.zeros_like(self.all_rows)
+        for value in values:
+            if pd.isna(value):
+                packed |= self.nan_bitmaps[param]
+            elif value in bitmaps:
+                packed |= bitmaps[value]
+        return packed
+
+    def range_mask(self, param: str, min_val, max_val) -> np.ndarray:
+        """
+        Packed mask of the rows with min_val <= parameter <= max_val (slider).
+
+        :param param: Parameter name
+        :param min_val: Lower bound (inclusive)
+        :param max_val: Upper bound (inclusive)
+        :return: Packed uint8 mask
+        """
+        if param in self.sorted_values:
+            sorted_vals, order = self.sorted_values[param]
+            lo = np.searchsorted(sorted_vals, min_val, side='left')
+            hi = np.searchsorted(sorted_vals, max_val, side='right')
+            return self.pack_rows(order[lo:hi])
+
+        if param in self.bitmaps:
+            return self.value_mask(param, [value for value in self.bitmaps[param]
+                                           if min_val <= value <= max_val])
+
+        values = self._values[param]
+        return np.packbits((values >= min_val) & (values <= max_val))
+
+    def predicate_mask(self, key: str, value) -> Optional[np.ndarray]:
+        """
+        Packed mask for one entry of the selected_filters dictionary.
+
+        :param key: Filter key (parameter name, or '{param}_range' for sliders)
+        :param value: Widget value (list of values, or (min, max) tuple)
+        :return: Packed uint8 mask, or None if the entry does not constrain the rows
+        """
+        if key.endswith('_range'):
+            min_val, max_val = value
+            return self.range_mask(key[:-len('_range')], min_val, max_val)
+        if isinstance(value, list) and len(value) > 0:
+            return self.value_mask(key, value)
+        return None
+
+    def mask(self, selected_filters: Dict) -> np.ndarray:
+        """
+        Packed mask of the rows matching all selected filters.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Packed uint8 mask
+        """
+        packed = self.all_rows.copy()
+        for key, value in selected_filters.items():
+            predicate = self.predicate_mask(key, value)
+            if predicate is not None:
+                packed &= predicate
+        return packed
+
+    def positions(self, selected_filters: Dict) -> np.ndarray:
+        """
+        Row positions matching all selected filters.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Sorted array of row positions
+        """
+        return np.flatnonzero(self.unpack(self.mask(selected_filters)))
+
+    # ------------------------------------------------------------------------
+    # Profile of a filtered subset
+    # ------------------------------------------------------------------------
+
+    def subset_profile(self, rows: np.ndarray) -> Dict[str, Dict]:
+        """
+        Per-parameter profile of a subset of rows, read from the index instead
+        of scanning the filtered columns.
+
+        Bitmap parameters only test which value bitmaps intersect the subset;
+        sorted parameters walk their sorted values once.
+
+        :param rows: Boolean mask of length n_rows (e.g. IncrementalFilter.matching())
+        :return: Dictionary parameter -> {'count', 'nan_count', 'min', 'max', 'n_distinct'}
+                 (min and max are None when the subset holds no valid value)
+        """
+        packed = np.packbits(rows)
+        count = int(np.count_nonzero(rows))
+        profile = {}
+        for param in self.params:
+            if param in self.sorted_values:
+                sorted_vals, order = self.sorted_values[param]
+                present = sorted_vals[rows[order]]
+                n_distinct = 1 + int(np.count_nonzero(present[1:] != present[:-1])) if len(present) else 0
+            else:
+                if param in self.bitmaps:
+                    present = [value for value, bitmap in self.bitmaps[param].items()
+                               if (bitmap & packed).any()]
+                else:
+                    present = sorted(pd.Series(self._values[param][rows]).dropna().unique())
+                n_distinct = len(present)
+            profile[param] = {
+                'count': count,
+                'nan_count': self.count(self.nan_bitmaps[param] & packed),
+                'min': present[0] if len(present) else None,
+                'max': present[-1] if len(present) else None,
+                'n_distinct': n_distinct,
+            }
+        return profile
+
+
+# ============================================================================
+# INCREMENTAL RE-EVALUATION OF THE FILTER FORM
+# ============================================================================
+
+def canonical_filter_value(value) -> str:
+    """
+    Canonical, hashable representation of a widget value (list or range tuple).
+
+    :param value: Widget value
+    :return: String key
+    """
+    if isinstance(value, (list, tuple)):
+        return repr(tuple(value))
+    return repr(value)
+
+
+class IncrementalFilter:
+    """
+    Filter state that only re-evaluates the predicates whose widget value changed.
+
+    The packed mask of every predicate is cached together with the widget value
+    it was computed from. For every row the number of predicates it fails is
+    kept, so replacing one predicate only costs that predicate: the failures
+    of its old mask are removed and those of its new mask are added. A row
+    matches the filter when it fails no predicate.
+
+    Exposes the same positions() method as FilterIndex, so it can be passed
+    to filter_data_by_parameters as the index.
+    """
+
+    def __init__(self, index: FilterIndex):
+        """
+        :param index: FilterIndex the predicates are evaluated on
+        """
+        self.index = index
+        self._value_keys: Dict[str, str] = {}
+        self._masks: Dict[str, np.ndarray] = {}
+        self._failures = np.zeros(index.n_rows, dtype=np.uint8)
+        self.recomputed_keys: List[str] = []
+
+    def _apply(self, key: str, new_mask: Optional[np.ndarray]) -> None:
+        """Swap the cached mask of one predicate and update the failure counts."""
+        old_mask = self._masks.pop(key, None)
+        if old_mask is not None:
+            self._failures -= ~self.index.unpack(old_mask)
+        if new_mask is not None:
+            self._failures += ~self.index.unpack(new_mask)
+            self._masks[key] = new_mask
+
+    def update(self, selected_filters: Dict) -> List[str]:
+        """
+        Bring the cached predicates in line with the current widget values.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Keys of the predicates that had to be recomputed
+        """
+        recomputed = []
+        for key in list(self._value_keys):
+            if key not in selected_filters:
+                self._apply(key, None)
+                del self._value_keys[key]
+                recomputed.append(key)
+
+        for key, value in selected_filters.items():
+            value_key = canonical_filter_value(value)
+            if self._value_keys.get(key) == value_key:
+                continue
+            self._apply(key, self.index.predicate_mask(key, value))
+            self._value_keys[key] = value_key
+            recomputed.append(key)
+
+        self.recomputed_keys = recomputed
+        return recomputed
+
+    def matching(self) -> np.ndarray:
+        """Boolean mask of the rows matching all cached predicates."""
+        return self._failures == 0
+
+    def count(self) -> int:
+        """Exact number of rows matching all cached predicates."""
+        return int(np.count_nonzero(self._failures == 0))
+
+    def value_counts(self, param: str) -> Dict[Hashable, int]:
+        """
+        Number of matching rows per value of a bitmap-indexed parameter, under
+        all cached predicates except the parameter's own (multiselect) one.
+
+        These are the counts a multiselect option would contribute if selected.
+
+        :param param: Parameter name
+        :return: Dictionary value -> row count (empty if the parameter has no bitmaps)
+        """
+        bitmaps = self.index.bitmaps.get(param)
+        if bitmaps is None:
+            return {}
+        failures = self._failures
+        own_mask = self._masks.get(param)
+        if own_mask is not None:
+            failures = failures - ~self.index.unpack(own_mask)
+        others = np.packbits(failures == 0)
+        return {value: self.index.count(bitmap & others) for value, bitmap in bitmaps.items()}
+
+    def positions(self, selected_filters: Dict) -> np.ndarray:
+        """
+        Row positions matching all selected filters, recomputing only changed predicates.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Sorted array of row positions
+        """
+        self.update(selected_filters)
+        return np.flatnonzero(self.matching())
@@ -1,99 +1,64 @@
 import pandas as pd
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import streamlit as st
-from typing import Dict, List, Tuple
-import re
-import math
+from typing import Dict, List
+
+from _utils.analysis import compute_results_summary, compute_simulation_summary, varying_parameters
+from _utils.figures import build_metrics_figure
+from _utils.profile import profile_distinct_values
+from _utils.stats_engine import RESULTS_STAT_COLUMNS, metric_rank_direction, rank_methods
 
 
 # ============================================================================
 # NEW WORKFLOW FUNCTIONS (Dynamic, Config-Free Architecture)
 # ============================================================================
 
-def extract_metadata_from_data(df: pd.DataFrame) -> Tuple[List[str], List[str], List[str], List[str]]:
+# Session-state key of a filter widget: prefix + its key in selected_filters
+# (distinct from the app's own session keys such as 'filter_clicked')
+FILTER_WIDGET_KEY_PREFIX = "filter_widget__"
+
+
+def read_filter_widget_state() -> Dict:
     """
-    Extract metadata (methods, metrics, and simulation parameters) from the data DataFrame.
+    Read the current filter widget values from the session state, before the
+    widgets are drawn (e.g. to label their options with live counts).
     
-    The DataFrame structure is: simulation_param_columns, then {method}_{metric} columns.
-    Known simulation parameters come from the MATLAB script's headerSimulationParameters.
+    :return: Dictionary of filter values, as returned by create_simulation_filter_widgets
+             (empty before the widgets were first drawn)
+    """
+    return {key[len(FILTER_WIDGET_KEY_PREFIX):]: value for key, value in st.session_state.items()
+            if key.startswith(FILTER_WIDGET_KEY_PREFIX)}
+
+
+def format_option_count(value, counts: Dict) -> str:
+    """
+    Label a multiselect option with its number of matching rows.
     
-    :param df: Input DataFrame
-    :return: Tuple of (headerSimulationParameters, headerMethods, headerMetrics, all_columns)
+    :param value: Option value
+    :param counts: Dictionary value -> count (see IncrementalFilter.value_counts)
+    :return: Option label
     """
-    known_sim_params = [
-        'fake_units', 'time_series_length', 'num_latent', 'noiseDistr', 'equalNoise',
-        'soft_norm', 'gen', 'decayCap', 'decayFactor', 'noiseFactor', 'nonLinAlfa',
-        'noise_var', 'nonLinear_var', 'tau'
-    ]
-    
-    # Get simulation parameters that actually exist in the data
-    header_sim_params = [col for col in known_sim_params if col in df.columns]
-    
-    # Extract methods and metrics from remaining columns
-    methods_set = set()
-    metrics_set = set()
-    
-    for col in df.columns:
-        if col not in header_sim_params:
-            # Pattern: {method}_{metric} or {method}_recon_accuracy
-            parts = col.rsplit('_', 1)
-            if len(parts) == 2:
-                method_part, metric_part = parts
-                # Handle special case: if metric_part is "recon_accuracy", the full metric is that
-                if metric_part == 'accuracy':  # part of recon_accuracy
-                    # Handle {method}_recon_accuracy
-                    if method_part.endswith('_recon'):
-                        actual_method = method_part.rsplit('_', 1)[0]
-                        methods_set.add(actual_method)
-                        metrics_set.add('recon_accuracy')
-                    else:
-                        methods_set.add(method_part)
-                        metrics_set.add(metric_part)
-                elif metric_part == 'accuracy_opt':  # part of recon_accuracy_opt
-                    if method_part.endswith('_recon'):
-                        actual_method = method_part.rsplit('_', 1)[0]
-                        methods_set.add(actual_method)
-                        metrics_set.add('recon_accuracy_opt')
-                    else:
-                        methods_set.add(method_part)
-                        metrics_set.add(metric_part)
-                else:
-                    methods_set.add(method_part)
-                    metrics_set.add(metric_part)
-    
-    # Better approach: use regex to parse {method}_{metric} pattern
-    methods_set = set()
-    metrics_set = set()
-    
-    known_metrics = {'k', 'dim_error', 'tot_expl_var', 'estimated_noise_var', 
-                     'estimated_noise_err', 'recon_accuracy', 'dim_error_opt',
-                     'estimated_noise_err_opt', 'recon_accuracy_opt'}
-    
-    for col in df.columns:
-        if col not in header_sim_params:
-            # Try to match {method}_{metric}
-            match = re.match(r'^(.+)_(k|dim_error|tot_expl_var|estimated_noise_var|estimated_noise_err|recon_accuracy|dim_error_opt|estimated_noise_err_opt|recon_accuracy_opt)$', col)
-            if match:
-                method = match.group(1)
-                metric = match.group(2)
-                methods_set.add(method)
-                metrics_set.add(metric)
-    
-    header_methods = sorted(list(methods_set))
-    header_metrics = sorted(list(metrics_set))
-    
-    return header_sim_params, header_methods, header_metrics, df.columns.tolist()
+    count = counts.get(value)
+    return str(value) if count is None else f"{value} ({count:,})"
 
 
 def create_simulation_filter_widgets(df: pd.DataFrame, header_sim_params: List[str], 
-                                     exclude_cols: List[str] = None) -> Dict:
+                                     exclude_cols: List[str] = None,
+                                     profile: Dict[str, Dict] = None,
+                                     value_counts: Dict[str, Dict] = None) -> Dict:
     """
     Create interactive filter widgets for simulation parameters.
     
+    With a precomputed column profile (see profile.py) the options and slider
+    bounds are read from it instead of scanning the columns. Widgets are keyed
+    (see FILTER_WIDGET_KEY_PREFIX), so their values survive option relabeling.
+    
     :param df: Input DataFrame
     :param header_sim_params: List of simulation parameter column names
     :param exclude_cols: Columns to exclude from filtering
+    :param profile: Optional profile of the columns of `df`
+    :param value_counts: Optional per-parameter {value: matching rows}, shown
+                         next to the multiselect options
     :return: Dictionary of selected filter values
     """
     if exclude_cols is None:
@@ -114,58 +79,44 @@ def create_simulation_filter_widgets(df: pd.DataFrame, header_sim_params: List[s
         col_idx = idx % cols_per_row
         
         with cols[col_idx]:
-            unique_values = sorted(df[param].unique())
             param_type = df[param].dtype
+            if profile is not None and param in profile:
+                unique_values = profile_distinct_values(profile[param], param_type)
+                param_min, param_max = profile[param]['min'], profile[param]['max']
+            else:
+                unique_values = sorted(df[param].unique())
+                param_min, param_max = df[param].min(), df[param].max()
             
-            if len(unique_values) <= 10:
+            if unique_values is not None and len(unique_values) <= 10:
                 # Use multiselect for few unique values
+                counts = (value_counts or {}).get(param, {})
                 selected_filters[param] = st.multiselect(
                     f"Select {param}",
                     unique_values,
-                    default=unique_values
+                    default=unique_values,
+                    format_func=lambda value, counts=counts: format_option_count(value, counts),
+                    key=f"{FILTER_WIDGET_KEY_PREFIX}{param}"
                 )
             else:
                 # Use slider for many unique values
                 if param_type in ['float64', 'float32']:
-                    min_val, max_val = float(df[param].min()), float(df[param].max())
+                    min_val, max_val = float(param_min), float(param_max)
                     selected_filters[f"{param}_range"] = st.slider(
                         f"Select {param} range",
-                        min_val, max_val, (min_val, max_val)
+                        min_val, max_val, (min_val, max_val),
+                        key=f"{FILTER_WIDGET_KEY_PREFIX}{param}_range"
                     )
                 else:
-                    min_val, max_val = int(df[param].min()), int(df[param].max())
+                    min_val, max_val = int(param_min), int(param_max)
                     selected_filters[f"{param}_range"] = st.slider(
                         f"Select {param} range",
-                        min_val, max_val, (min_val, max_val)
+                        min_val, max_val, (min_val, max_val),
+                        key=f"{FILTER_WIDGET_KEY_PREFIX}{param}_range"
                     )
     
     return selected_filters
 
 
-def filter_data_by_parameters(df: pd.DataFrame, selected_filters: Dict) -> pd.DataFrame:
-    """
-    Filter the DataFrame based on selected simulation parameters.
-    
-    :param df: Input DataFrame
-    :param selected_filters: Dictionary of selected filter values
-    :return: Filtered DataFrame
-    """
-    filtered_df = df.copy()
-    
-    for key, value in selected_filters.items():
-        if key.endswith('_range'):
-            # Range filter
-            param = key.replace('_range', '')
-            min_val, max_val = value
-            filtered_df = filtered_df[(filtered_df[param] >= min_val) & (filtered_df[param] <= max_val)]
-        else:
-            # Multiselect filter
-            if isinstance(value, list) and len(value) > 0:
-                filtered_df = filtered_df[filtered_df[key].isin(value)]
-    
-    return filtered_df
-
-
 def create_method_selector(header_methods: List[str]) -> str:
     """
     Create a widget to select a method.
@@ -179,21 +130,21 @@ def create_method_selector(header_methods: List[str]) -> str:
 
 
 def create_independent_variable_selector(header_sim_params: List[str], 
-                                         filtered_data: pd.DataFrame) -> str:
+                                         filtered_data: pd.DataFrame,
+                                         subset_profile: Dict[str, Dict] = None) -> str:
     """
     Create a widget to select the independent variable for plots.
     
     :param header_sim_params: List of simulation parameter names
     :param filtered_data: Filtered DataFrame to determine available options
+    :param subset_profile: Optional profile of the filtered rows (FilterIndex.subset_profile),
+                           used instead of counting distinct values
     :return: Selected independent variable name
     """
     st.subheader("Select Independent Variable for Plots")
     
     # Only show parameters that have variation in the filtered data
-    available_params = []
-    for param in header_sim_params:
-        if filtered_data[param].nunique() > 1:
-            available_params.append(param)
+    available_params = varying_parameters(header_sim_params, filtered_data, subset_profile)
     
     if not available_params:
         st.warning("No parameters with variation in filtered data. Using first parameter.")
@@ -204,19 +155,19 @@ def create_independent_variable_selector(header_sim_params: List[str],
 
 
 def create_color_variable_selector(header_sim_params: List[str], 
-                                   filtered_data: pd.DataFrame) -> str:
+                                   filtered_data: pd.DataFrame,
+                                   subset_profile: Dict[str, Dict] = None) -> str:
     """
     Create a widget to select a parameter for coloring the plot points.
     
     :param header_sim_params: List of simulation parameter names
     :param filtered_data: Filtered DataFrame to determine available options
+    :param subset_profile: Optional profile of the filtered rows (FilterIndex.subset_profile),
+                           used instead of counting distinct values
     :return: Selected color variable name
     """
     # Only show parameters that have variation in the filtered data
-    available_params = []
-    for param in header_sim_params:
-        if filtered_data[param].nunique() > 1:
-            available_params.append(param)
+    available_params = varying_parameters(header_sim_params, filtered_data, subset_profile)
     
     if not available_params:
         st.info("No parameters with variation. Colors will be uniform.")
@@ -228,215 +179,207 @@ def create_color_variable_selector(header_sim_params: List[str],
 
 def create_metrics_plots(filtered_data: pd.DataFrame, method: str, x_variable: str,
                          header_metrics: List[str], 
-                         color_variable: str = None) -> go.Figure:
+                         color_variable: str = None,
+                         render_mode: str = 'auto',
+                         color_mode: str = 'auto') -> go.Figure:
     """
-    Create subplots for all metrics as a function of the selected independent variable.
-    Displays plots in a 3-column grid layout.
+    Create subplots for all metrics as a function of the selected independent variable,
+    reporting an error in the app when the method has no data.
     
-    :param filtered_data: Filtered DataFrame
-    :param method: Selected method name
-    :param x_variable: Independent variable name
-    :param header_metrics: List of metric names
-    :param color_variable: Optional variable to use for color coding
-    :return: Plotly Figure object
+    See build_metrics_figure for the parameters.
+    
+    :return: Plotly Figure object, or None if no metric has data
     """
-    import math
-    
-    # Remove metrics that don't have data for this method or have too many NaNs
-    available_metrics = []
-    for metric in header_metrics:
-        col_name = f"{method}_{metric}"
-        if col_name in filtered_data.columns:
-            # Check if most values are not NaN
-            if filtered_data[col_name].notna().sum() > len(filtered_data) * 0.1:
-                available_metrics.append(metric)
-    
-    if not available_metrics:
+    fig = build_metrics_figure(filtered_data, method, x_variable, header_metrics,
+                               color_variable, render_mode, color_mode)
+    if fig is None:
         st.error(f"No data available for method '{method}'")
-        return None
-    
-    # Calculate grid dimensions (3 columns)
-    cols_per_row = 3
-    num_rows = math.ceil(len(available_metrics) / cols_per_row)
-    
-    # Create subplots with 3 columns
-    fig = make_subplots(
-        rows=num_rows, 
-        cols=cols_per_row,
-        subplot_titles=[metric.replace('_', ' ').title() for metric in available_metrics],
-        vertical_spacing=0.12,
-        horizontal_spacing=0.10
-    )
-    
-    # Add traces for each metric
-    for idx, metric in enumerate(available_metrics):
-        col_name = f"{method}_{metric}"
-        
-        # Get valid data (non-NaN)
-        valid_mask = filtered_data[col_name].notna() & filtered_data[x_variable].notna()
-        x_data = filtered_data[valid_mask][x_variable]
-        y_data = filtered_data[valid_mask][col_name]
-        
-        # Prepare color data
-        color_data = None
-        if color_variable and color_variable in filtered_data.columns:
-            color_data = filtered_data[valid_mask][color_variable]
-        
-        # Calculate position in grid
-        row_pos = (idx // cols_per_row) + 1
-        col_pos = (idx % cols_per_row) + 1
-        
-        # Show colorbar only on the last trace if we have color data
-        show_colorbar = (idx == len(available_metrics) - 1) and (color_data is not None)
-        
-        scatter = go.Scatter(
-            x=x_data,
-            y=y_data,
-            mode='markers',
-            name=metric,
-            showlegend=False,
-            marker=dict(
-                size=7,
-                color=color_data if color_data is not None else 'rgba(99, 99, 99, 0.8)',
-                colorscale='Greys' if color_data is not None else None,
-                showscale=show_colorbar,
-                reversescale=True if color_data is not None else False,
-                line=dict(
-                    color='royalblue',
-                    width=0.5
-                ),
-                colorbar=dict(
-                    title=color_variable if color_variable else None,
-                    thickness=15,
-                    len=0.7,
-                    x=1.02
-                ) if show_colorbar else None,
-                opacity=0.75
-            )
-        )
-        
-        fig.add_trace(scatter, row=row_pos, col=col_pos)
-        
-        # Update axes labels
-        fig.update_xaxes(
-            title_text=x_variable.replace('_', ' ').title(), 
-            row=row_pos, col=col_pos,
-            showgrid=True,
-            gridwidth=0.5,
-            griddash='dash',
-            gridcolor='rgba(200, 200, 200, 0.4)'
-        )
-        fig.update_yaxes(
-            title_text=metric.replace('_', ' ').title(), 
-            row=row_pos, col=col_pos,
-            showgrid=True,
-            gridwidth=0.5,
-            griddash='dash',
-            gridcolor='rgba(200, 200, 200, 0.4)'
-        )
+    return fig
+
+
+def compute_data_completeness(filtered_data: pd.DataFrame, subset_profile: Dict[str, Dict] = None,
+                              table_profile: Dict[str, Dict] = None) -> float:
+    """
+    Compute the percentage of non-missing cells of the filtered data.
     
-    # Update layout
-    plot_height = 350 * num_rows  # Approx 3x the original (250 -> ~350 per plot)
-    color_info = f" | Color: {color_variable}" if color_variable else ""
+    NaN counts are taken from the profile of the filtered rows (simulation
+    parameters) and, when the filtered data holds every row, from the profile
+    of the table; only the remaining columns are counted.
     
-    fig.update_layout(
-        height=plot_height,
-        width=1400,
-        showlegend=False,
-        title_text=f"Method: {method} | X-axis: {x_variable}{color_info}",
-        font=dict(size=10),
-        margin=dict(r=150)  # Extra margin on right for colorbar
-    )
+    :param filtered_data: Filtered DataFrame
+    :param subset_profile: Optional profile of the filtered rows (FilterIndex.subset_profile)
+    :param table_profile: Optional profile of the whole table (see profile.py)
+    :return: Completeness in percent
+    """
+    n_rows, n_cols = filtered_data.shape
+    if n_rows * n_cols == 0:
+        return 0.0
+    
+    missing = 0
+    counted_columns = []
+    for col in filtered_data.columns:
+        if subset_profile is not None and col in subset_profile:
+            missing += subset_profile[col]['nan_count']
+        elif table_profile is not None and col in table_profile and table_profile[col]['count'] == n_rows:
+            missing += table_profile[col]['nan_count']
+        else:
+            counted_columns.append(col)
+    if counted_columns:
+        missing += int(filtered_data[counted_columns].isna().to_numpy().sum())
     
-    return fig
+    return (1 - missing / (n_rows * n_cols)) * 100
 
 
-def display_simulation_summary(filtered_data: pd.DataFrame, header_sim_params: List[str]) -> None:
+def display_simulation_summary(filtered_data: pd.DataFrame, header_sim_params: List[str],
+                               summary_df: pd.DataFrame = None) -> None:
     """
     Display a summary of the filtered simulations.
     
     :param filtered_data: Filtered DataFrame
     :param header_sim_params: List of simulation parameter names
+    :param summary_df: Optional precomputed output of compute_simulation_summary
     """
     st.subheader("Filtered Simulation Summary")
     
-    summary_data = {
-        'Parameter': [],
-        'Min': [],
-        'Mean': [],
-        'Max': [],
-        'Unique Values': []
-    }
-    
-    for param in header_sim_params:
-        if param in filtered_data.columns:
-            summary_data['Parameter'].append(param)
-            
-            # Check if column is numeric or categorical
-            if pd.api.types.is_numeric_dtype(filtered_data[param]):
-                summary_data['Min'].append(f"{filtered_data[param].min():.4g}")
-                summary_data['Mean'].append(f"{filtered_data[param].mean():.4g}")
-                summary_data['Max'].append(f"{filtered_data[param].max():.4g}")
-            else:
-                # For categorical/string columns, show unique values
-                summary_data['Min'].append(str(filtered_data[param].min()))
-                summary_data['Mean'].append("—")
-                summary_data['Max'].append(str(filtered_data[param].max()))
-            
-            summary_data['Unique Values'].append(filtered_data[param].nunique())
+    if summary_df is None:
+        summary_df = compute_simulation_summary(filtered_data, header_sim_params)
     
-    st.dataframe(pd.DataFrame(summary_data), use_container_width=True)
+    st.dataframe(summary_df, use_container_width=True)
 
 
 def display_results_summary(filtered_data: pd.DataFrame, method: str, 
-                           header_metrics: List[str]) -> None:
+                           header_metrics: List[str],
+                           stats_df: pd.DataFrame = None,
+                           ci_df: pd.DataFrame = None) -> None:
     """
     Display comprehensive statistics for all metrics across filtered simulations.
     
     :param filtered_data: Filtered DataFrame
     :param method: Selected method name
     :param header_metrics: List of metric names
+    :param stats_df: Optional precomputed output of compute_results_summary
+    :param ci_df: Optional output of compute_bootstrap_intervals, shown as
+                  [low, high] next to each statistic
     """
     st.subheader("Results Summary Statistics")
     
-    # Prepare statistics data
-    stats_data = {
-        'Metric': [],
-        'Mean': [],
-        'Std': [],
-        '5th %ile': [],
-        '25th %ile': [],
-        'Median': [],
-        '75th %ile': [],
-        '95th %ile': []
-    }
-    
-    for metric in header_metrics:
-        col_name = f"{method}_{metric}"
-        
-        # Check if column exists and has valid data
-        if col_name not in filtered_data.columns:
-            continue
-        
-        # Get valid data (non-NaN)
-        data = filtered_data[col_name].dropna()
-        
-        if len(data) == 0:
-            continue
-        
-        # Compute statistics
-        stats_data['Metric'].append(metric.replace('_', ' ').title())
-        stats_data['Mean'].append(f"{data.mean():.4g}")
-        stats_data['Std'].append(f"{data.std():.4g}")
-        stats_data['5th %ile'].append(f"{data.quantile(0.05):.4g}")
-        stats_data['25th %ile'].append(f"{data.quantile(0.25):.4g}")
-        stats_data['Median'].append(f"{data.quantile(0.50):.4g}")
-        stats_data['75th %ile'].append(f"{data.quantile(0.75):.4g}")
-        stats_data['95th %ile'].append(f"{data.quantile(0.95):.4g}")
+    if stats_df is None:
+        stats_df = compute_results_summary(filtered_data, method, header_metrics)
     
     # Display as dataframe
-    if stats_data['Metric']:
-        stats_df = pd.DataFrame(stats_data)
-        st.dataframe(stats_df, use_container_width=True, hide_index=True)
+    if not stats_df.empty:
+        display_df = stats_df.copy()
+        for column in RESULTS_STAT_COLUMNS:
+            display_df[column] = display_df[column].map(lambda value: f"{value:.4g}")
+        if ci_df is not None:
+            intervals = display_df[['Metric']].merge(ci_df, on='Metric', how='left')
+            for column in RESULTS_STAT_COLUMNS:
+                display_df[column] += [f" [{low:.4g}, {high:.4g}]" for low, high
+                                       in zip(intervals[f"{column} low"], intervals[f"{column} high"])]
+        display_df['Metric'] = display_df['Metric'].str.replace('_', ' ').str.title()
+        st.dataframe(display_df, use_container_width=True, hide_index=True)
     else:
         st.warning(f"No valid data available for method '{method}'")
+
+
+def create_method_comparison_heatmap(method_stats: pd.DataFrame, 
+                                     statistic: str = 'Median') -> go.Figure:
+    """
+    Create a heatmap ranking all methods on every rankable metric.
+    
+    Cells are colored by the rank of the method on each metric (1 = best) and
+    annotated with the value of the chosen statistic.
+    
+    :param method_stats: Output of compute_method_statistics
+    :param statistic: Statistic shown in the cells
+    :return: Plotly Figure object, or None if no metric can be ranked
+    """
+    metrics = [metric for metric in method_stats.index.unique(level='metric')
+               if metric_rank_direction(metric) is not None]
+    if not metrics:
+        return None
+    
+    ranks = pd.concat(
+        {metric: rank_methods(method_stats, metric, statistic)['Rank'] for metric in metrics},
+        axis=1
+    )
+    values = method_stats[statistic].unstack('metric').reindex(index=ranks.index, columns=metrics)
+    
+    # Best methods (lowest mean rank) at the top
+    order = ranks.mean(axis=1).sort_values(ascending=False).index
+    ranks, values = ranks.loc[order], values.loc[order]
+    
+    fig = go.Figure(go.Heatmap(
+        z=ranks.to_numpy(),
+        x=[metric.replace('_', ' ').title() for metric in metrics],
+        y=list(order),
+        text=values.map(lambda value: f"{value:.3g}").to_numpy(),
+        texttemplate="%{text}",
+        colorscale='RdYlGn',
+        reversescale=True,
+        colorbar=dict(title="Rank"),
+        hovertemplate="%{y} | %{x}<br>" + statistic + ": %{text}<br>Rank: %{z}<extra></extra>"
+    ))
+    fig.update_layout(
+        height=40 * len(order) + 150,
+        title_text=f"Method ranking by {statistic.lower()} (1 = best)",
+        font=dict(size=10)
+    )
+    return fig
+
+
+def display_method_comparison(method_stats: pd.DataFrame) -> None:
+    """
+    Display a ranking table and heatmap comparing all methods at once.
+    
+    :param method_stats: Output of compute_method_statistics
+    """
+    st.subheader("Method Comparison")
+    
+    metrics = list(method_stats.index.unique(level='metric'))
+    rankable = [metric for metric in metrics if metric_rank_direction(metric) is not None]
+    if not rankable:
+        st.warning("No rankable metrics available for comparison")
+        return
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        rank_metric = st.selectbox(
+            "Rank methods by metric",
+            rankable,
+            index=rankable.index('dim_error') if 'dim_error' in rankable else 0
+        )
+    with col2:
+        statistic = st.selectbox("Statistic", ['Median', 'Mean'])
+    
+    ranking = rank_methods(method_stats, rank_metric, statistic)
+    display_df = ranking.reset_index()
+    display_df['Rank'] = display_df['Rank'].astype('Int64')
+    for column in RESULTS_STAT_COLUMNS:
+        display_df[column] = display_df[column].map(lambda value: f"{value:.4g}")
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
+    
+    fig = create_method_comparison_heatmap(method_stats, statistic)
+    if fig is not None:
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def display_performance_panel(run_record: Dict) -> None:
+    """
+    Display the per-stage timings (and memory peaks, if traced) of a script run.
+    
+    :param run_record: Output of RunProfiler.finish
+    """
+    st.caption(f"⏱️ Last rerun: {run_record['total_ms']:.0f} ms")
+    stages = pd.DataFrame(run_record['stages'])
+    if stages.empty:
+        return
+    
+    # Nested stages (helpers called within a step) are indented under their step
+    display_df = pd.DataFrame({
+        'Stage': [' ' * depth + name for depth, name in zip(stages['depth'], stages['name'])],
+        'Time (ms)': stages['ms'].round(1),
+    })
+    if 'peak_mb' in stages.columns:
+        display_df['Peak (MB)'] = stages['peak_mb'].round(2)
+    st.dataframe(display_df, use_container_width=True, hide_index=True)
@@ -0,0 +1,352 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from _utils.data_cache import compute_file_key, write_manifest
+from _utils.profile import ProfileAccumulator
+from _utils.schema import extract_metadata_from_data
+
+
+# ============================================================================
+# OUT-OF-CORE CHUNKED INGESTION INTO A PARTITIONED COLUMNAR STORE
+# ============================================================================
+
+STORE_SUFFIX = ".store"
+PARTITION_COLUMNS = ['gen', 'noiseDistr', 'soft_norm']
+ROW_ID_COLUMN = '_row_id'
+DEFAULT_CHUNK_ROWS = 250_000
+ROW_GROUP_ROWS = 65_536
+NULL_PARTITION = '__null__'
+
+# CSV files larger than this are ingested chunk by chunk instead of parsed at once
+LARGE_TABLE_BYTES = 1 << 30
+
+
+def get_store_dir(csv_path: Path) -> Path:
+    """
+    Return the directory of the partitioned store of a CSV file (e.g. data/Data_table.store).
+
+    :param csv_path: Path to the source CSV file
+    :return: Store directory
+    """
+    return Path(csv_path).with_suffix(STORE_SUFFIX)
+
+
+def partition_value(value) -> str:
+    """
+    Format a partition value as used in the hive-style directory names.
+
+    Integral floats are written as integers, so that a value read as 1.0 from
+    the CSV and a widget value 1 map to the same partition.
+
+    :param value: Partition column value
+    :return: Directory-safe string
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return NULL_PARTITION
+    if isinstance(value, (float, np.floating)) and float(value).is_integer():
+        return str(int(value))
+    if isinstance(value, np.generic):
+        value = value.item()
+    return str(value)
+
+
+def detect_csv_dtypes(csv_path: Path, sample_rows: int = 10_000) -> Dict[str, object]:
+    """
+    Choose one dtype per column so every chunk (and partition file) shares a schema.
+
+    Text columns are read as strings and every other column as float64;
+    integer columns are restored by dtype compaction after loading.
+
+    :param csv_path: Path to the source CSV file
+    :param sample_rows: Number of rows inspected to detect text columns
+    :return: Dictionary column -> dtype for pd.read_csv
+    """
+    sample = pd.read_csv(csv_path, nrows=sample_rows)
+    return {col: (str if not pd.api.types.is_numeric_dtype(sample[col]) else 'float64')
+            for col in sample.columns}
+
+
+def write_partitions(chunk: pd.DataFrame, parts_dir: Path, partition_cols: List[str],
+                     file_name: str, schema: pa.Schema) -> List[str]:
+    """
+    Write one chunk of rows into hive-style partition directories.
+
+    :param chunk: Chunk of rows (including the row id column)
+    :param parts_dir: Root directory of the partition files
+    :param partition_cols: Columns used for partitioning
+    :param file_name: Name of the file written in every touched partition
+    :param schema: Arrow schema of the non-partition columns
+    :return: Relative paths of the written files
+    """
+    written = []
+    groups = chunk.groupby(partition_cols, dropna=False, observed=True, sort=False) if partition_cols \
+        else [((), chunk)]
+    for key, group in groups:
+        key = key if isinstance(key, tuple) else (key,)
+        relative_dir = Path(*[f"{col}={partition_value(val)}" for col, val in zip(partition_cols, key)])
+        (parts_dir / relative_dir).mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(group.drop(columns=partition_cols), schema=schema,
+                                     preserve_index=False)
+        pq.write_table(table, parts_dir / relative_dir / file_name, row_group_size=ROW_GROUP_ROWS)
+        written.append(str(relative_dir / file_name))
+    return written
+
+
+class AggregateAccumulator:
+    """
+    Running count, sum and sum of squares of the {method}_{metric} columns.
+    """
+
+    def __init__(self, columns: List[str]):
+        """
+        :param columns: Metric columns to aggregate
+        """
+        self.columns = list(columns)
+        self.count = np.zeros(len(columns), dtype=np.int64)
+        self.sum = np.zeros(len(columns))
+        self.sum_sq = np.zeros(len(columns))
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk of rows.
+
+        :param chunk: DataFrame chunk holding the metric columns
+        """
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        self.count += valid.sum(axis=0)
+        self.sum += np.where(valid, values, 0.0).sum(axis=0)
+        self.sum_sq += np.where(valid, values ** 2, 0.0).sum(axis=0)
+
+    def result(self) -> Dict[str, Dict]:
+        """
+        :return: Dictionary column -> {'count', 'sum', 'sum_sq'}
+        """
+        return {col: {'count': int(self.count[i]), 'sum': float(self.sum[i]),
+                      'sum_sq': float(self.sum_sq[i])}
+                for i, col in enumerate(self.columns)}
+
+
+def ingest_csv_chunked(csv_path: Path, store_dir: Path = None,
+                       chunk_rows: int = DEFAULT_CHUNK_ROWS,
+                       partition_cols: List[str] = None) -> Dict:
+    """
+    Stream a CSV file into a partitioned Parquet store in a single pass.
+
+    While reading the chunks, the per-column profile, the metric aggregates
+    and the simulation-parameter columns (used to build the FilterIndex) are
+    accumulated, and each chunk is written to hive-style partitions (by
+    default gen/noiseDistr/soft_norm). Only the simulation parameters are
+    kept in memory, so the table itself may be larger than RAM.
+
+    Layout of the store:
+        manifest.json       source key, metadata, profile, aggregates
+        sim_params.parquet  simulation-parameter columns in row-id order
+        parts/              {col}={value}/.../part-NNNNN.parquet
+
+    :param csv_path: Path to the source CSV file
+    :param store_dir: Output directory (default: next to the CSV, see get_store_dir)
+    :param chunk_rows: Number of rows per chunk
+    :param partition_cols: Partition columns (default PARTITION_COLUMNS, if present)
+    :return: Store manifest
+    """
+    csv_path = Path(csv_path)
+    store_dir = Path(store_dir) if store_dir is not None else get_store_dir(csv_path)
+    start = time.perf_counter()
+
+    header = pd.read_csv(csv_path, nrows=0)
+    header_sim_params, header_methods, header_metrics, all_columns = extract_metadata_from_data(header)
+    if partition_cols is None:
+        partition_cols = [col for col in PARTITION_COLUMNS if col in header_sim_params]
+    metric_columns = [f"{method}_{metric}" for method in header_methods for metric in header_metrics
+                      if f"{method}_{metric}" in all_columns]
+    dtypes = detect_csv_dtypes(csv_path)
+
+    # Build into a temporary directory and swap it in at the end
+    tmp_dir = store_dir.with_name(store_dir.name + ".tmp")
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    parts_dir = tmp_dir / "parts"
+    parts_dir.mkdir(parents=True)
+
+    profile = ProfileAccumulator()
+    aggregates = AggregateAccumulator(metric_columns)
+    sim_chunks = []
+    files = []
+    schema = None
+    n_rows = 0
+
+    for chunk_idx, chunk in enumerate(pd.read_csv(csv_path, chunksize=chunk_rows, dtype=dtypes)):
+        row_ids = pd.DataFrame({ROW_ID_COLUMN: np.arange(n_rows, n_rows + len(chunk), dtype=np.int64)},
+                               index=chunk.index)
+        chunk = pd.concat([row_ids, chunk], axis=1)
+        n_rows += len(chunk)
+
+        profile.update(chunk.drop(columns=ROW_ID_COLUMN))
+        aggregates.update(chunk)
+        sim_chunks.append(chunk[header_sim_params])
+
+        if schema is None:
+            schema = pa.Schema.from_pandas(chunk.drop(columns=partition_cols), preserve_index=False)
+        files += write_partitions(chunk, parts_dir, partition_cols, f"part-{chunk_idx:05d}.parquet", schema)
+
+    sim_data = pd.concat(sim_chunks, ignore_index=True) if sim_chunks else header[header_sim_params]
+    sim_data.to_parquet(tmp_dir / "sim_params.parquet", index=False)
+
+    manifest = {
+        'source': str(csv_path),
+        'source_key': compute_file_key(csv_path),
+        'n_rows': n_rows,
+        'columns': all_columns,
+        'header_sim_params': header_sim_params,
+        'header_methods': header_methods,
+        'header_metrics': header_metrics,
+        'partition_cols': partition_cols,
+        'files': files,
+        'profile': profile.result(),
+        'aggregates': aggregates.result(),
+        'cold_load_seconds': time.perf_counter() - start,
+    }
+    write_manifest(tmp_dir / "manifest.json", manifest)
+
+    if store_dir.exists():
+        shutil.rmtree(store_dir)
+    os.replace(tmp_dir, store_dir)
+    return manifest
+
+
+# ============================================================================
+# QUERYING THE PARTITIONED STORE
+# ============================================================================
+
+class PartitionedStore:
+    """
+    Read access to a store written by ingest_csv_chunked or ingest_shards.
+
+    Filters from the UI are translated into Arrow dataset expressions, so only
+    the partitions (directory pruning) and row groups (min/max statistics)
+    that can match the predicates are read.
+    """
+
+    def __init__(self, store_dir: Path):
+        """
+        :param store_dir: Store directory
+        """
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / "manifest.json", "r") as handle:
+            self.manifest = json.load(handle)
+        self.partition_cols = self.manifest['partition_cols']
+        partitioning = ds.partitioning(
+            pa.schema([(col, pa.string()) for col in self.partition_cols]), flavor="hive"
+        ) if self.partition_cols else None
+        # Only the files listed in the manifest belong to the store, so files
+        # written by an interrupted (incremental) ingest are never read
+        parts_dir = self.store_dir / "parts"
+        self.dataset = ds.dataset([str(parts_dir / file) for file in self.manifest['files']],
+                                  format="parquet", partitioning=partitioning,
+                                  partition_base_dir=str(parts_dir))
+
+    def read_sim_params(self) -> pd.DataFrame:
+        """
+        Read the simulation-parameter columns (row-id order).
+
+        :return: DataFrame indexed by row id
+        """
+        sim_data = pd.read_parquet(self.store_dir / self.manifest.get('sim_params_file', "sim_params.parquet"))
+        if ROW_ID_COLUMN in sim_data.columns:
+            sim_data = sim_data.set_index(ROW_ID_COLUMN)
+        return sim_data
+
+    def _predicate(self, key: str, value) -> Optional[ds.Expression]:
+        """Arrow expression for one entry of the selected_filters dictionary."""
+        is_range = key.endswith('_range')
+        param = key[:-len('_range')] if is_range else key
+
+        if param in self.partition_cols:
+            if is_range:
+                min_val, max_val = value
+                distinct = self.manifest['profile'][param]['distinct'] or []
+                value = [val for val in distinct if val is not None and min_val <= val <= max_val]
+            elif not (isinstance(value, list) and len(value) > 0):
+                return None
+            return ds.field(param).isin([partition_value(val) for val in value])
+
+        if is_range:
+            min_val, max_val = value
+            return (ds.field(param) >= float(min_val)) & (ds.field(param) <= float(max_val))
+        if isinstance(value, list) and len(value) > 0:
+            return ds.field(param).isin([partition_value(val) if isinstance(val, str) else float(val)
+                                         for val in value])
+        return None
+
+    def filter_expression(self, selected_filters: Dict) -> Optional[ds.Expression]:
+        """
+        Translate the UI filters into one Arrow dataset expression.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Expression, or None if nothing is constrained
+        """
+        expression = None
+        for key, value in selected_filters.items():
+            predicate = self._predicate(key, value)
+            if predicate is not None:
+                expression = predicate if expression is None else expression & predicate
+        return expression
+
+    def read(self, selected_filters: Dict, columns: List[str] = None) -> pd.DataFrame:
+        """
+        Read the rows matching the filters, touching only the matching partitions/row groups.
+
+        :param selected_filters: Dictionary of selected filter values
+        :param columns: Columns to read (default: all stored columns)
+        :return: DataFrame indexed by row id, in row-id order
+        """
+        if columns is not None:
+            columns = [ROW_ID_COLUMN] + [col for col in columns if col != ROW_ID_COLUMN]
+        table = self.dataset.to_table(columns=columns, filter=self.filter_expression(selected_filters))
+        return table.to_pandas().set_index(ROW_ID_COLUMN).sort_index()
+
+    def read_rows(self, row_ids: np.ndarray, columns: List[str],
+                  partition_values: Dict[str, List] = None) -> pd.DataFrame:
+        """
+        Read given rows by row id, pruning partitions by the values those rows have.
+
+        :param row_ids: Row ids to read
+        :param columns: Columns to read
+        :param partition_values: Optional partition column -> values present in the rows
+        :return: DataFrame indexed by row id, in the order of `row_ids`
+        """
+        expression = ds.field(ROW_ID_COLUMN).isin(pa.array(np.asarray(row_ids, dtype=np.int64)))
+        for col, values in (partition_values or {}).items():
+            expression &= ds.field(col).isin([partition_value(val) for val in values])
+        table = self.dataset.to_table(columns=[ROW_ID_COLUMN] + list(columns), filter=expression)
+        return table.to_pandas().set_index(ROW_ID_COLUMN).reindex(row_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest a simulation table CSV into a partitioned Parquet store, chunk by chunk."
+    )
+    parser.add_argument("csv_path", type=Path, help="Source CSV file (e.g. data/Data_table.csv)")
+    parser.add_argument("--store-dir", type=Path, default=None, help="Output store directory")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows per chunk")
+    args = parser.parse_args()
+
+    manifest = ingest_csv_chunked(args.csv_path, args.store_dir, args.chunk_rows)
+    print(f"Ingested {manifest['n_rows']} rows into {len(manifest['files'])} files "
+          f"in {manifest['cold_load_seconds']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+
+# ============================================================================
+# PER-RERUN STAGE TIMING AND MEMORY INSTRUMENTATION
+# ============================================================================
+
+PERF_LOGGER_NAME = "dimensionality.perf"
+
+# JSON lines go to this file when set, otherwise to stderr
+PERF_LOG_FILE_ENV = "PERF_LOG_FILE"
+
+# Profiler of the script run executing in the current thread (None outside the app)
+_current_profiler: contextvars.ContextVar = contextvars.ContextVar("current_profiler", default=None)
+
+# tracemalloc is process-wide: it runs while at least one profiler traces memory
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users += 1
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+
+def _stop_tracing() -> None:
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class RunProfiler:
+    """
+    Timings (and optionally tracemalloc memory peaks) of the stages of one script run.
+
+    Stages nest: a helper called inside a numbered step of the app is
+    recorded as a child of that step. Memory peaks are measured with
+    tracemalloc, which is process-wide, so with concurrent sessions a peak
+    may include allocations of other sessions.
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        """
+        :param trace_memory: Whether to record tracemalloc peaks (slows the run down)
+        """
+        self.trace_memory = trace_memory
+        self.records: List[Dict] = []
+        self._stack: List[Dict] = []
+        self._start = time.perf_counter()
+        self._token = None
+        self.finished = False
+
+    def activate(self) -> 'RunProfiler':
+        """
+        Make this the profiler of the current thread (used by instrumented()).
+
+        :return: self
+        """
+        # A run interrupted by a newer rerun never reached its finish() call
+        previous = _current_profiler.get()
+        if previous is not None and not previous.finished:
+            previous.finish(interrupted=True)
+        if self.trace_memory:
+            _start_tracing()
+        self._token = _current_profiler.set(self)
+        return self
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Context manager timing one stage.
+
+        :param name: Stage name (e.g. "Step 1: Filter simulations")
+        """
+        frame = {'name': name, 'depth': len(self._stack), 'peak': 0, 'start_mem': 0}
+        if self.trace_memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in self._stack:
+                parent['peak'] = max(parent['peak'], peak)
+            tracemalloc.reset_peak()
+            frame['start_mem'] = frame['peak'] = current
+        record = {'name': name, 'path': " / ".join([f['name'] for f in self._stack] + [name]),
+                  'depth': frame['depth']}
+        self.records.append(record)
+        self._stack.append(frame)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            record['ms'] = (time.perf_counter() - start) * 1000
+            self._stack.pop()
+            if self.trace_memory and tracemalloc.is_tracing():
+                _, peak = tracemalloc.get_traced_memory()
+                frame['peak'] = max(frame['peak'], peak)
+                record['peak_mb'] = (frame['peak'] - frame['start_mem']) / 1e6
+                if self._stack:
+                    self._stack[-1]['peak'] = max(self._stack[-1]['peak'], frame['peak'])
+
+    def finish(self, **context) -> Dict:
+        """
+        Close the run, emit its JSON log line and deactivate the profiler.
+
+        Calling it again (e.g. at the end of the script after an early stop) does nothing.
+
+        :param context: Extra fields of the log record (session id, selection, ...)
+        :return: Log record of the run
+        """
+        record = self.summary(**context)
+        if self.finished:
+            return record
+        self.finished = True
+        if self._token is not None:
+            try:
+                _current_profiler.reset(self._token)
+            except ValueError:
+                # Finished from another thread (a later run of the same session)
+                pass
+            self._token = None
+        if self.trace_memory:
+            _stop_tracing()
+        get_perf_logger().info(json.dumps(record, default=str))
+        return record
+
+    def summary(self, **context) -> Dict:
+        """
+        Structured record of the run.
+
+        :param context: Extra fields of the record
+        :return: Dictionary with 'event', 'timestamp', 'total_ms', 'trace_memory',
+                 the context fields and 'stages' (name, path, depth, ms, peak_mb)
+        """
+        return {
+            'event': 'rerun',
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'total_ms': (time.perf_counter() - self._start) * 1000,
+            'trace_memory': self.trace_memory,
+            **context,
+            'stages': [dict(record) for record in self.records if 'ms' in record],
+        }
+
+
+def current_profiler() -> Optional[RunProfiler]:
+    """Return the active profiler of the current thread, if any."""
+    return _current_profiler.get()
+
+
+def instrumented(func: Callable) -> Callable:
+    """
+    Decorator recording each call of a function as a stage of the active profiler.
+
+    Calls outside a profiled run (background prefetching, batch and service
+    use) go straight to the function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        profiler = _current_profiler.get()
+        if profiler is None:
+            return func(*args, **kwargs)
+        with profiler.stage(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def get_perf_logger() -> logging.Logger:
+    """
+    Return the logger of the per-rerun JSON records (configured on first use).
+
+    :return: Logger writing one JSON object per line
+    """
+    logger = logging.getLogger(PERF_LOGGER_NAME)
+    if not logger.handlers:
+        log_file = os.environ.get(PERF_LOG_FILE_ENV)
+        handler = logging.FileHandler(log_file) if log_file else logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    return logger
@@ -0,0 +1,422 @@
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from _utils.data_cache import (
+    build_columnar_cache,
+    get_cache_paths,
+    make_load_report,
+    validate_cache,
+    validate_manifest,
+)
+from _utils.dtypes import compact_dtypes
+from _utils.filter_index import FilterIndex
+from _utils.ingest import (
+    LARGE_TABLE_BYTES,
+    ROW_ID_COLUMN,
+    PartitionedStore,
+    get_store_dir,
+    ingest_csv_chunked,
+    partition_value,
+)
+from _utils.profile import PROFILE_SUFFIX, load_or_build_profile, profile_parquet
+from _utils.schema import parse_schema
+from _utils.shards import get_shard_store_dir, ingest_shards
+from _utils.stats_cube import StatsCube, build_stats_cube, select_cube_params
+
+
+# ============================================================================
+# COLUMN-PROJECTED LAZY ACCESS TO THE SIMULATION TABLE
+# ============================================================================
+
+# Simulation table read by the CLIs and the query service by default
+DEFAULT_DATA_PATH = Path("data/Data_table.csv")
+
+# Rows per batch when streaming a selection (see iter_rows)
+EXPORT_BATCH_ROWS = 65_536
+
+class LazyDataTable:
+    """
+    Lazy, column-projected view of the simulation table.
+
+    Only the header is read to extract metadata. The simulation-parameter
+    columns are loaded eagerly, while the {method}_{metric} columns of a method
+    are read from the columnar cache the first time that method is requested
+    and kept afterwards. Peak memory and load time therefore scale with the
+    methods actually inspected rather than with all of them.
+    """
+
+    def __init__(self, csv_path: Path):
+        """
+        :param csv_path: Path to the source CSV file (its columnar cache is
+                         built on first use if missing or stale)
+        """
+        self.csv_path = Path(csv_path)
+
+        start = time.perf_counter()
+        manifest, cache_hit = self._open_source()
+
+        # Schema from the header only (memoized, shared by every table with this header)
+        self.schema = parse_schema(self.columns)
+        self.header_sim_params = list(self.schema.sim_params)
+        self.header_methods = list(self.schema.methods)
+        self.header_metrics = list(self.schema.metrics)
+
+        # Simulation parameters are always needed (filters, widgets, summaries)
+        self.sim_data, sim_report = compact_dtypes(self._read_sim_params(), self.header_sim_params,
+                                                   self.header_metrics)
+        self.filter_index = FilterIndex(self.sim_data, self.header_sim_params)
+        load_seconds = time.perf_counter() - start
+
+        self.version = manifest['source_key']['sha256']
+        self.load_report = make_load_report(manifest, self.cache_path, cache_hit, load_seconds)
+        # Wall-clock end of the load (a shared table may be handed to many later runs)
+        self.loaded_at = time.time()
+
+        # Distinct values, min/max and NaN counts of every column (see profile.py)
+        self.profile_path = self._profile_path()
+        self.profile = load_or_build_profile(self.profile_path, self.version, self._build_profile)
+
+        self._method_data: Dict[str, pd.DataFrame] = {}
+        self._compaction_reports: Dict[str, Dict] = {'__sim_params__': sim_report}
+        self._stats_cubes: Dict[str, Optional[StatsCube]] = {}
+        self._lock = threading.Lock()
+
+    def _open_source(self) -> Tuple[Dict, bool]:
+        """
+        Make sure the columnar cache is up to date and read its schema.
+
+        Sets `cache_path` and `columns`.
+
+        :return: Tuple of (cache manifest, whether the existing cache was valid)
+        """
+        self.cache_path, _ = get_cache_paths(self.csv_path)
+        manifest = validate_cache(self.csv_path)
+        cache_hit = manifest is not None
+        if not cache_hit:
+            _, manifest = build_columnar_cache(self.csv_path)
+        self.columns = pq.read_schema(self.cache_path).names
+        return manifest, cache_hit
+
+    def _profile_path(self) -> Path:
+        """Path of the profile sidecar of the source."""
+        return self.csv_path.with_suffix(PROFILE_SUFFIX)
+
+    def _build_profile(self) -> Dict[str, Dict]:
+        """Profile all columns by streaming the columnar cache."""
+        return profile_parquet(self.cache_path)
+
+    def _read_sim_params(self) -> pd.DataFrame:
+        """Read the simulation-parameter columns of all rows."""
+        return pd.read_parquet(self.cache_path, columns=self.header_sim_params)
+
+    def _read_method_columns(self, method: str) -> pd.DataFrame:
+        """Read the metric columns of a method for all rows."""
+        return pd.read_parquet(self.cache_path, columns=self.method_columns(method))
+
+    @property
+    def shape(self):
+        """Shape of the full (logical) table."""
+        return self.sim_data.shape[0], len(self.columns)
+
+    @property
+    def memory_report(self) -> Dict:
+        """
+        Memory saved by dtype compaction over all materialized columns.
+
+        :return: Dictionary with 'bytes_before', 'bytes_after' and 'bytes_saved'
+        """
+        reports = list(self._compaction_reports.values())
+        bytes_before = sum(report['bytes_before'] for report in reports)
+        bytes_after = sum(report['bytes_after'] for report in reports)
+        return {
+            'bytes_before': bytes_before,
+            'bytes_after': bytes_after,
+            'bytes_saved': bytes_before - bytes_after,
+        }
+
+    def method_columns(self, method: str) -> List[str]:
+        """
+        Return the {method}_{metric} column names present for a method.
+
+        :param method: Method name
+        :return: List of column names
+        """
+        return list(self.schema.method_columns.get(method, []))
+
+    def loaded_methods(self) -> List[str]:
+        """Return the methods whose metric columns are already materialized."""
+        return list(self._method_data)
+
+    def load_method(self, method: str, keep: bool = True) -> pd.DataFrame:
+        """
+        Materialize (once) and return the metric columns of a method.
+
+        :param method: Method name
+        :param keep: Whether to keep the columns in memory for later calls; with
+                     False (background prefetching) columns not yet materialized
+                     are read into a temporary frame that is not cached
+        :return: DataFrame with the method's metric columns, aligned with sim_data
+        """
+        method_data = self._method_data.get(method)
+        if method_data is not None:
+            return method_data
+        if not keep:
+            method_data, _ = compact_dtypes(self._read_method_columns(method), self.header_sim_params,
+                                            self.header_metrics)
+            method_data.index = self.sim_data.index
+            return method_data
+
+        with self._lock:
+            method_data = self._method_data.get(method)
+            if method_data is None:
+                method_data = self._read_method_columns(method)
+                method_data, report = compact_dtypes(method_data, self.header_sim_params,
+                                                     self.header_metrics)
+                method_data.index = self.sim_data.index
+                self._compaction_reports[method] = report
+                self._method_data[method] = method_data
+        return method_data
+
+    def with_method(self, frame: pd.DataFrame, method: str, keep: bool = True) -> pd.DataFrame:
+        """
+        Attach the metric columns of a method to a (filtered) sim-parameter frame.
+
+        :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+        :param method: Method name
+        :param keep: Whether newly read columns stay materialized (see load_method)
+        :return: DataFrame with the simulation parameters and the method's metrics
+        """
+        return self.with_methods(frame, [method], keep)
+
+    def with_methods(self, frame: pd.DataFrame, methods: List[str], keep: bool = True) -> pd.DataFrame:
+        """
+        Attach the metric columns of several methods to a (filtered) sim-parameter frame.
+
+        :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+        :param methods: Method names
+        :param keep: Whether newly read columns stay materialized (see load_method)
+        :return: DataFrame with the simulation parameters and the methods' metrics
+        """
+        method_frames = [self.load_method(method, keep).loc[frame.index] for method in methods]
+        return pd.concat([frame] + method_frames, axis=1)
+
+    def iter_rows(self, frame: pd.DataFrame, columns: List[str] = None,
+                  batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Stream the rows of a (filtered) sim-parameter frame with any columns, batch by batch.
+
+        Batches are read from the columnar cache, skipping the row groups that
+        hold none of the rows, so the full selection is never materialized.
+
+        :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+        :param columns: Columns to read (default: all columns of the table)
+        :param batch_rows: Maximum number of rows read per batch
+        :return: Iterator of DataFrames, in table order
+        """
+        columns = list(columns) if columns is not None else list(self.columns)
+        positions = np.sort(self.sim_data.index.get_indexer(frame.index))
+        parquet = pq.ParquetFile(self.cache_path)
+        group_start = 0
+        for group in range(parquet.num_row_groups):
+            group_rows = parquet.metadata.row_group(group).num_rows
+            lo, hi = np.searchsorted(positions, [group_start, group_start + group_rows])
+            if hi > lo:
+                batch_start = group_start
+                for batch in parquet.iter_batches(batch_size=batch_rows, row_groups=[group], columns=columns):
+                    batch_lo, batch_hi = np.searchsorted(positions, [batch_start, batch_start + batch.num_rows])
+                    if batch_hi > batch_lo:
+                        yield batch.take(pa.array(positions[batch_lo:batch_hi] - batch_start)).to_pandas()
+                    batch_start += batch.num_rows
+            group_start += group_rows
+
+    def stats_cube(self, method: str, build: bool = True) -> Optional[StatsCube]:
+        """
+        Return (building it once) the statistics cube of a method.
+
+        :param method: Method name
+        :param build: Whether to build the cube if it does not exist yet
+        :return: StatsCube, or None if the table is too small for a cube to pay off
+                 (or it was not built yet and `build` is False)
+        """
+        if method in self._stats_cubes:
+            return self._stats_cubes[method]
+        if not build:
+            return None
+
+        # Decided from the index alone: no column is read when no cube is built
+        cube_params = select_cube_params(self.filter_index)
+        if not cube_params:
+            self._stats_cubes[method] = None
+            return None
+
+        method_data = self.load_method(method)
+        with self._lock:
+            if method not in self._stats_cubes:
+                self._stats_cubes[method] = build_stats_cube(
+                    self.sim_data, self.filter_index, cube_params, method_data, method, self.header_metrics
+                )
+        return self._stats_cubes[method]
+
+
+# ============================================================================
+# STORE-BACKED TABLE FOR SIMULATION TABLES LARGER THAN RAM
+# ============================================================================
+
+class StoreDataTable(LazyDataTable):
+    """
+    LazyDataTable backed by the partitioned store of ingest_csv_chunked.
+
+    The CSV is ingested chunk by chunk (never loaded whole), only the
+    simulation parameters are kept in memory, and metric columns are read
+    for the filtered rows only, touching just the partitions and row groups
+    that hold them.
+    """
+
+    def _open_source(self) -> Tuple[Dict, bool]:
+        """
+        Make sure the partitioned store is up to date and open it.
+
+        Sets `cache_path` (the store directory), `store` and `columns`.
+
+        :return: Tuple of (store manifest, whether the existing store was valid)
+        """
+        self.cache_path = get_store_dir(self.csv_path)
+        manifest = validate_manifest(self.csv_path, self.cache_path / "manifest.json", self.cache_path)
+        cache_hit = manifest is not None
+        if not cache_hit:
+            manifest = ingest_csv_chunked(self.csv_path, self.cache_path)
+        self.store = PartitionedStore(self.cache_path)
+        self.columns = manifest['columns']
+        return manifest, cache_hit
+
+    def _build_profile(self) -> Dict[str, Dict]:
+        """Profile accumulated while ingesting the store (no extra scan)."""
+        return self.store.manifest['profile']
+
+    def _read_sim_params(self) -> pd.DataFrame:
+        """Read the simulation-parameter columns of all rows."""
+        return self.store.read_sim_params()
+
+    def _read_method_columns(self, method: str) -> pd.DataFrame:
+        """Read the metric columns of a method for all rows."""
+        return self.store.read({}, self.method_columns(method)).reset_index(drop=True)
+
+    def with_methods(self, frame: pd.DataFrame, methods: List[str], keep: bool = True) -> pd.DataFrame:
+        """
+        Attach the metric columns of several methods to a (filtered) sim-parameter frame,
+        reading only the rows of `frame` from the store (these are never kept).
+
+        :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+        :param methods: Method names
+        :param keep: Unused (rows read from the store are not cached)
+        :return: DataFrame with the simulation parameters and the methods' metrics
+        """
+        loaded = [method for method in methods if method in self._method_data]
+        pending = [method for method in methods if method not in self._method_data]
+
+        method_frames = [self._method_data[method].loc[frame.index] for method in loaded]
+        if pending:
+            columns = [col for method in pending for col in self.method_columns(method)]
+            partition_values = {col: frame[col].unique().tolist() for col in self.store.partition_cols}
+            rows = self.store.read_rows(frame.index.to_numpy(), columns, partition_values)
+            rows, _ = compact_dtypes(rows, self.header_sim_params, self.header_metrics)
+            rows.index = frame.index
+            method_frames.append(rows)
+        return pd.concat([frame] + method_frames, axis=1)
+
+    def iter_rows(self, frame: pd.DataFrame, columns: List[str] = None,
+                  batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+        """
+        Stream the rows of a (filtered) sim-parameter frame with any columns, batch by batch.
+
+        Only the partitions and row groups holding the rows are scanned; the
+        simulation parameters are taken from `frame` (already in memory).
+
+        :param frame: Subset of sim_data (e.g. the output of filter_data_by_parameters)
+        :param columns: Columns to read (default: all columns of the table)
+        :param batch_rows: Maximum number of rows read per batch
+        :return: Iterator of DataFrames, in store order (by partition, then row id)
+        """
+        columns = list(columns) if columns is not None else list(self.columns)
+        stored_columns = [col for col in columns if col not in self.header_sim_params]
+        sim_columns = [col for col in columns if col in self.header_sim_params]
+
+        expression = ds.field(ROW_ID_COLUMN).isin(pa.array(frame.index.to_numpy(dtype=np.int64)))
+        for col in self.store.partition_cols:
+            expression &= ds.field(col).isin([partition_value(val) for val in frame[col].unique().tolist()])
+        for batch in self.store.dataset.to_batches(columns=[ROW_ID_COLUMN] + stored_columns,
+                                                   filter=expression, batch_size=batch_rows):
+            if batch.num_rows == 0:
+                continue
+            rows = batch.to_pandas().set_index(ROW_ID_COLUMN)
+            yield pd.concat([frame.loc[rows.index, sim_columns], rows], axis=1)[columns].reset_index(drop=True)
+
+    def stats_cube(self, method: str, build: bool = True) -> Optional[StatsCube]:
+        """
+        No statistics cube for store-backed tables: building one would scan
+        every row of the method, so summaries use exact scans of filtered rows.
+        """
+        return None
+
+
+class ShardedDataTable(StoreDataTable):
+    """
+    StoreDataTable over a directory of CSV shards (see ingest_shards).
+
+    Opening the table ingests only the shards that are new or changed since
+    the last time; shards whose schema does not match are left out and
+    listed in `load_report['rejected_shards']`.
+    """
+
+    def __init__(self, data_dir: Path):
+        """
+        :param data_dir: Directory holding the CSV shards
+        """
+        super().__init__(data_dir)
+        self.load_report['rejected_shards'] = self.rejected_shards
+
+    def _open_source(self) -> Tuple[Dict, bool]:
+        """
+        Bring the store of the shard directory up to date and open it.
+
+        Sets `cache_path` (the store directory), `store`, `columns` and `rejected_shards`.
+
+        :return: Tuple of (store manifest, whether no shard had to be (re)ingested)
+        """
+        self.cache_path = get_shard_store_dir(self.csv_path)
+        manifest = ingest_shards(self.csv_path, self.cache_path)
+        self.store = PartitionedStore(self.cache_path)
+        self.columns = manifest['columns']
+        self.rejected_shards = manifest['rejected']
+        return manifest, not (manifest['ingested'] or manifest['removed'])
+
+    def _profile_path(self) -> Path:
+        """Path of the profile sidecar of the shard directory (next to its store)."""
+        return self.cache_path.with_suffix(PROFILE_SUFFIX)
+
+
+def open_table(csv_path: Path) -> LazyDataTable:
+    """
+    Open the simulation table with the access path suited to its size.
+
+    A directory is opened as a set of CSV shards. Tables larger than
+    LARGE_TABLE_BYTES (or that already have a partitioned store) are served
+    from the store; others from the single columnar cache.
+
+    :param csv_path: Path to the source CSV file, or to a directory of CSV shards
+    :return: LazyDataTable, StoreDataTable or ShardedDataTable
+    """
+    csv_path = Path(csv_path)
+    if csv_path.is_dir():
+        return ShardedDataTable(csv_path)
+    if get_store_dir(csv_path).exists() or csv_path.stat().st_size > LARGE_TABLE_BYTES:
+        return StoreDataTable(csv_path)
+    return LazyDataTable(csv_path)
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# MEMOIZATION OF FIGURES AND RESULT TABLES
+# ============================================================================
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+def _json_default(value):
+    """JSON fallback for NumPy scalars/arrays and other non-JSON values."""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    return str(value)
+
+
+def canonical_key(**parts) -> str:
+    """
+    Build a canonical hash of the inputs of a computation.
+
+    Dictionaries are serialized with sorted keys and tuples like lists, so the
+    same selection always yields the same key regardless of construction order.
+
+    :param parts: Named inputs (dataset version, filters, method, ...)
+    :return: Hex digest string
+    """
+    payload = json.dumps(parts, sort_keys=True, default=_json_default)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory footprint of a cached value in bytes.
+
+    :param value: Cached value
+    :return: Approximate size in bytes
+    """
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, (tuple, list)):
+        return sum(estimate_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache bounded by entry count and total size, with hit/miss counters.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 max_bytes: int = DEFAULT_MAX_BYTES):
+        """
+        :param max_entries: Maximum number of cached values
+        :param max_bytes: Maximum total (estimated) size of the cached values
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str, default: Any = None, count: bool = True) -> Any:
+        """
+        Return a cached value (marking it as recently used), counting the hit or miss.
+
+        :param key: Cache key
+        :param default: Value returned on a miss
+        :param count: Whether the lookup updates the hit/miss counters (False for background prefetching)
+        :return: Cached value or default
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += count
+                return default
+            self._entries.move_to_end(key)
+            self.hits += count
+            return entry[0]
+
+    def put(self, key: str, value: Any) -> None:
+        """
+        Store a value, evicting least recently used entries beyond the bounds.
+
+        :param key: Cache key
+        :param value: Value to cache
+        """
+        size = estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any], count: bool = True) -> Any:
+        """
+        Return the cached value for a key, computing and storing it on a miss.
+
+        :param key: Cache key
+        :param compute: Zero-argument function producing the value
+        :param count: Whether the lookup updates the hit/miss counters
+        :return: Cached or freshly computed value
+        """
+        missing = object()
+        value = self.get(key, missing, count)
+        if value is missing:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        """
+        Return the cache counters.
+
+        :return: Dictionary with 'hits', 'misses', 'hit_rate', 'evictions', 'entries' and 'bytes'
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
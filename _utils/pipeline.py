@@ -0,0 +1,136 @@
+from typing import Callable, Dict, Optional, Tuple
+
+import pandas as pd
+
+from _utils.analysis import compute_bootstrap_intervals, compute_results_summary, compute_simulation_summary
+from _utils.lazy_table import LazyDataTable
+from _utils.memo import ResultCache, canonical_key
+
+
+# ============================================================================
+# MEMOIZED ANALYSIS STEPS (shared by the app and background prefetching)
+# ============================================================================
+
+def cached_simulation_summary(cache: ResultCache, table: LazyDataTable, selected_filters: Dict,
+                              filtered_sims: pd.DataFrame) -> pd.DataFrame:
+    """
+    Simulation summary of the filtered rows, memoized on (dataset version, filters).
+
+    :param cache: ResultCache to use
+    :param table: Loaded table
+    :param selected_filters: Dictionary of selected filter values
+    :param filtered_sims: Filtered simulation-parameter rows
+    :return: Output of compute_simulation_summary
+    """
+    return cache.get_or_compute(
+        canonical_key(section='simulation_summary', version=table.version, filters=selected_filters),
+        lambda: compute_simulation_summary(filtered_sims, table.header_sim_params)
+    )
+
+
+def cached_results_summary(cache: ResultCache, table: LazyDataTable, selected_filters: Dict,
+                           filtered_sims: pd.DataFrame, method: str, prefetch: bool = False,
+                           method_rows: Callable[[], pd.DataFrame] = None) -> Tuple[pd.DataFrame, bool]:
+    """
+    Results summary of a method, memoized on (dataset version, filters, method).
+
+    When the filter aligns with the cells of the method's statistics cube,
+    the summary is merged from the cells (count, mean and std exactly,
+    quantiles from the cells' sketches) without reading the method's rows;
+    otherwise the filtered rows are scanned.
+
+    When prefetching, no cube is built, the method's columns are not kept in
+    memory and the cache lookup does not count as a hit or miss.
+
+    :param cache: ResultCache to use
+    :param table: Loaded table
+    :param selected_filters: Dictionary of selected filter values
+    :param filtered_sims: Filtered simulation-parameter rows
+    :param method: Method name
+    :param prefetch: Whether this is a background prefetch
+    :param method_rows: Optional function returning the filtered rows with the method's
+                        columns (to share one read between several results)
+    :return: Tuple of (output of compute_results_summary, whether the cube was used)
+    """
+    def compute():
+        stats_cube = table.stats_cube(method, build=not prefetch)
+        cube_stats = stats_cube.summarize(selected_filters) if stats_cube is not None else None
+        if cube_stats is not None:
+            return cube_stats, True
+        filtered_data = (method_rows() if method_rows is not None
+                         else table.with_method(filtered_sims, method, keep=not prefetch))
+        return compute_results_summary(filtered_data, method, table.header_metrics), False
+
+    return cache.get_or_compute(
+        canonical_key(section='results_summary', version=table.version,
+                      filters=selected_filters, method=method),
+        compute, count=not prefetch
+    )
+
+
+def cached_bootstrap_intervals(cache: ResultCache, table: LazyDataTable, selected_filters: Dict,
+                               filtered_sims: pd.DataFrame, method: str, n_resamples: int,
+                               confidence: float, seed: int) -> pd.DataFrame:
+    """
+    Bootstrap confidence intervals of the results summary, memoized on
+    (dataset version, filters, method, resamples, confidence, seed).
+
+    :param cache: ResultCache to use
+    :param table: Loaded table
+    :param selected_filters: Dictionary of selected filter values
+    :param filtered_sims: Filtered simulation-parameter rows
+    :param method: Method name
+    :param n_resamples: Number of bootstrap resamples
+    :param confidence: Confidence level of the intervals
+    :param seed: Random seed
+    :return: Output of compute_bootstrap_intervals
+    """
+    return cache.get_or_compute(
+        canonical_key(section='bootstrap_intervals', version=table.version, filters=selected_filters,
+                      method=method, n_resamples=n_resamples, confidence=confidence, seed=seed),
+        lambda: compute_bootstrap_intervals(table.with_method(filtered_sims, method), method,
+                                            table.header_metrics, n_resamples, confidence, seed)
+    )
+
+
+def cached_metrics_figure_json(cache: ResultCache, table: LazyDataTable, selected_filters: Dict,
+                               filtered_sims: pd.DataFrame, method: str, x_variable: str,
+                               color_variable: Optional[str], color_mode: str = 'auto',
+                               prefetch: bool = False,
+                               method_rows: Callable[[], pd.DataFrame] = None) -> Optional[str]:
+    """
+    Serialized metrics figure, memoized on (dataset version, filters, method, x, color, color mode).
+
+    :param cache: ResultCache to use
+    :param table: Loaded table
+    :param selected_filters: Dictionary of selected filter values
+    :param filtered_sims: Filtered simulation-parameter rows
+    :param method: Method name
+    :param x_variable: Independent variable name
+    :param color_variable: Optional color variable name
+    :param color_mode: 'auto', 'facet' or 'continuous' (see build_metrics_figure)
+    :param prefetch: Whether this is a background prefetch (see cached_results_summary)
+    :param method_rows: Optional function returning the filtered rows with the method's columns
+    :return: Figure JSON, or None if the method has no data
+    """
+    # Imported here so that users of the summaries alone (the query service) do not load Plotly
+    from _utils.figures import build_metrics_figure
+
+    def compute():
+        fig = build_metrics_figure(
+            filtered_data=(method_rows() if method_rows is not None
+                           else table.with_method(filtered_sims, method, keep=not prefetch)),
+            method=method,
+            x_variable=x_variable,
+            header_metrics=table.header_metrics,
+            color_variable=color_variable,
+            color_mode=color_mode
+        )
+        return fig.to_json() if fig is not None else None
+
+    return cache.get_or_compute(
+        canonical_key(section='metrics_figure', version=table.version, filters=selected_filters,
+                      method=method, x_variable=x_variable, color_variable=color_variable,
+                      color_mode=color_mode),
+        compute, count=not prefetch
+    )
@@ -0,0 +1,145 @@
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# SERVER-SIDE AGGREGATION FOR LARGE SCATTER PLOTS
+# ============================================================================
+
+# Above SVG_MAX_POINTS rows per subplot, markers are drawn with WebGL; above
+# WEBGL_MAX_POINTS, per-x aggregates are drawn instead of individual points
+SVG_MAX_POINTS = 5_000
+WEBGL_MAX_POINTS = 100_000
+
+# Maximum number of x groups; continuous x variables are binned beyond this
+MAX_X_GROUPS = 60
+
+AGGREGATE_QUANTILES = [0.05, 0.25, 0.50, 0.75, 0.95]
+
+
+def choose_render_mode(n_points: int) -> str:
+    """
+    Choose how to draw a scatter subplot given its number of points.
+
+    :param n_points: Number of points per subplot
+    :return: 'svg', 'webgl' or 'aggregate'
+    """
+    if n_points <= SVG_MAX_POINTS:
+        return 'svg'
+    if n_points <= WEBGL_MAX_POINTS:
+        return 'webgl'
+    return 'aggregate'
+
+
+def group_x_values(x: pd.Series, max_groups: int = MAX_X_GROUPS):
+    """
+    Assign every x value to a group: its distinct value, or an equal-width bin.
+
+    :param x: Independent variable values (no NaNs)
+    :param max_groups: Maximum number of groups before binning numeric values
+    :return: Tuple of (group code per value, group position on the x axis)
+    """
+    if not pd.api.types.is_numeric_dtype(x):
+        codes, labels = pd.factorize(x, sort=True)
+        return codes, np.asarray(labels, dtype=object)
+
+    values = x.to_numpy(dtype=np.float64)
+    labels = np.unique(values)
+    if len(labels) <= max_groups:
+        return np.searchsorted(labels, values), labels
+
+    edges = np.linspace(labels[0], labels[-1], max_groups + 1)
+    codes = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, max_groups - 1)
+    return codes, (edges[:-1] + edges[1:]) / 2
+
+
+def aggregate_by_x(x: pd.Series, y: pd.Series, max_groups: int = MAX_X_GROUPS) -> Dict[str, np.ndarray]:
+    """
+    Compute per-x-group count and quantiles of y in one vectorized pass.
+
+    Rows are sorted by (group, y) once; the quantiles of every group are then
+    read by position with linear interpolation (as in pandas' quantile).
+
+    :param x: Independent variable values (no NaNs)
+    :param y: Metric values aligned with x (no NaNs)
+    :param max_groups: Maximum number of groups before binning numeric x values
+    :return: Dictionary with 'x', 'count' and one 'q{percent}' array per quantile
+             in AGGREGATE_QUANTILES (e.g. 'q50' for the median)
+    """
+    codes, positions = group_x_values(x, max_groups)
+    y_values = y.to_numpy(dtype=np.float64)
+
+    order = np.lexsort((y_values, codes))
+    sorted_y = y_values[order]
+    counts = np.bincount(codes, minlength=len(positions))
+    present = counts > 0
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])[present]
+    counts = counts[present]
+
+    result = {'x': positions[present], 'count': counts}
+    for q in AGGREGATE_QUANTILES:
+        rank = starts + q * (counts - 1)
+        lower = np.floor(rank).astype(np.int64)
+        upper = np.ceil(rank).astype(np.int64)
+        weight = rank - lower
+        result[f"q{int(round(q * 100))}"] = sorted_y[lower] * (1 - weight) + sorted_y[upper] * weight
+    return result
+
+
+# ============================================================================
+# FACETS OF A COLOR VARIABLE
+# ============================================================================
+
+# Non-numeric color variables, and numeric ones with at most this many levels,
+# are drawn as one trace group per level instead of a continuous color scale
+MAX_FACET_LEVELS = 10
+
+# 'auto' picks 'facet' or 'continuous' with choose_color_mode
+COLOR_MODES = ['auto', 'facet', 'continuous']
+
+
+def choose_color_mode(color_data: pd.Series, max_levels: int = MAX_FACET_LEVELS) -> str:
+    """
+    Choose how to color the points by a variable.
+
+    :param color_data: Values of the color variable
+    :param max_levels: Maximum number of levels of a faceted numeric variable
+    :return: 'facet' or 'continuous'
+    """
+    if not pd.api.types.is_numeric_dtype(color_data) or pd.api.types.is_bool_dtype(color_data):
+        return 'facet'
+    return 'facet' if color_data.nunique() <= max_levels else 'continuous'
+
+
+def group_rows_by_level(values: pd.Series) -> Tuple[np.ndarray, List[np.ndarray]]:
+    """
+    Group row positions by the level of a variable, in one pass over the rows.
+
+    Rows with a missing level are left out.
+
+    :param values: Values of the variable
+    :return: Tuple of (sorted levels, list with the row positions of each level)
+    """
+    codes, levels = pd.factorize(values, sort=True)
+    order = np.argsort(codes, kind='stable')
+    # Missing values have code -1 and sort first
+    order = order[np.count_nonzero(codes < 0):]
+    counts = np.bincount(codes[codes >= 0], minlength=len(levels))
+    return np.asarray(levels, dtype=object), np.split(order, np.cumsum(counts)[:-1])
+
+
+def to_plot_array(values: pd.Series) -> np.ndarray:
+    """
+    Convert a column into a compact typed array for Plotly.
+
+    Numeric columns become float32, which Plotly serializes as a base64
+    typed array (half the size of float64); other columns stay objects.
+
+    :param values: Column
+    :return: NumPy array
+    """
+    if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+        return values.to_numpy(dtype=np.float32, na_value=np.nan)
+    return values.to_numpy(dtype=object)
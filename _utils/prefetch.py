@@ -0,0 +1,184 @@
+import threading
+from concurrent.futures import Executor, Future
+from typing import Callable, Dict, List, Optional
+
+import pandas as pd
+
+from _utils.analysis import varying_parameters
+from _utils.lazy_table import LazyDataTable
+from _utils.memo import ResultCache, canonical_key, estimate_size
+from _utils.pipeline import cached_metrics_figure_json, cached_results_summary
+
+
+# ============================================================================
+# BACKGROUND PREFETCH OF RESULTS FOR OTHER METHODS / X VARIABLES
+# ============================================================================
+
+# Share of the result cache's byte budget that one prefetch generation may fill
+PREFETCH_BYTES_FRACTION = 0.25
+
+
+class Prefetcher:
+    """
+    Per-session scheduler of background jobs that warm the shared ResultCache.
+
+    Jobs are grouped in generations identified by a key (dataset version,
+    filters, x and color variables). Scheduling a new generation cancels the
+    pending jobs of the previous one; jobs already running finish, but their
+    results are still valid cache entries for their own key.
+    """
+
+    def __init__(self, executor: Executor):
+        """
+        :param executor: Executor running the jobs (shared across sessions)
+        """
+        self._executor = executor
+        self._lock = threading.Lock()
+        self._generation: Optional[str] = None
+        self._futures: List[Future] = []
+
+    def schedule(self, generation: str, jobs: List[Callable[[], object]]) -> bool:
+        """
+        Start a new generation of jobs, cancelling stale pending ones.
+
+        :param generation: Key identifying the inputs of the jobs
+        :param jobs: Zero-argument functions to run in the background
+        :return: False if this generation is already scheduled (nothing done)
+        """
+        with self._lock:
+            if generation == self._generation:
+                return False
+            for future in self._futures:
+                future.cancel()
+            self._generation = generation
+            self._futures = [self._executor.submit(self._run, generation, job) for job in jobs]
+        return True
+
+    def _run(self, generation: str, job: Callable[[], object]) -> None:
+        """Run a job unless its generation became stale while it was queued."""
+        if generation != self._generation:
+            return
+        job()
+
+    def cancel(self) -> None:
+        """Cancel all pending jobs."""
+        with self._lock:
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+            self._generation = None
+
+    def progress(self) -> Dict:
+        """
+        Return the progress of the current generation.
+
+        :return: Dictionary with 'done', 'total' and 'failed' job counts
+        """
+        with self._lock:
+            futures = list(self._futures)
+        done = [future for future in futures if future.done() and not future.cancelled()]
+        failed = sum(1 for future in done if future.exception() is not None)
+        return {'done': len(done), 'total': len(futures), 'failed': failed}
+
+
+class _ByteBudget:
+    """
+    Bytes a prefetch generation may still add to the cache, shared by its jobs.
+    """
+
+    def __init__(self, max_bytes: int):
+        """
+        :param max_bytes: Budget of the generation
+        """
+        self._left = max_bytes
+        self._lock = threading.Lock()
+
+    def exhausted(self) -> bool:
+        with self._lock:
+            return self._left <= 0
+
+    def spend(self, value) -> None:
+        with self._lock:
+            self._left -= estimate_size(value)
+
+
+def _prefetch_method(cache: ResultCache, table: LazyDataTable, selected_filters: Dict,
+                     filtered_sims: pd.DataFrame, method: str, summary: bool, x_variables: List[str],
+                     color_variable: Optional[str], color_mode: str, budget: _ByteBudget) -> None:
+    """
+    Prefetch the results of one method from a single read of its columns.
+
+    The columns are read on the first cache miss and shared by the summary and
+    all figures; results stop being computed once the budget is exhausted.
+    See prefetch_analysis for the other parameters.
+
+    :param summary: Whether to prefetch the results summary
+    :param x_variables: Independent variables of the figures to prefetch
+    :param budget: Byte budget of the generation
+    """
+    rows = []
+
+    def method_rows() -> pd.DataFrame:
+        if not rows:
+            rows.append(table.with_method(filtered_sims, method, keep=False))
+        return rows[0]
+
+    steps = []
+    if summary:
+        steps.append(lambda: cached_results_summary(cache, table, selected_filters, filtered_sims, method,
+                                                    prefetch=True, method_rows=method_rows))
+    for x_variable in x_variables:
+        steps.append(lambda x_variable=x_variable: cached_metrics_figure_json(
+            cache, table, selected_filters, filtered_sims, method, x_variable, color_variable, color_mode,
+            prefetch=True, method_rows=method_rows))
+
+    for step in steps:
+        if budget.exhausted():
+            return
+        budget.spend(step())
+
+
+def prefetch_analysis(prefetcher: Prefetcher, cache: ResultCache, table: LazyDataTable,
+                      selected_filters: Dict, filtered_sims: pd.DataFrame, current_method: str,
+                      x_variable: str, color_variable: Optional[str], color_mode: str = 'auto',
+                      subset_profile: Optional[Dict[str, Dict]] = None) -> None:
+    """
+    Schedule the precomputation of summaries and figures the user is likely to request next.
+
+    One job per method: the results summary and the figure (with the current
+    x and color variables) of every other method, then the figures of the
+    current method for the other independent variables. Each job reads its
+    method's columns once, into a temporary (not kept in the table), and no
+    statistics cube is built. A generation stops adding results once they
+    fill PREFETCH_BYTES_FRACTION of the cache's byte budget.
+
+    :param prefetcher: Session Prefetcher
+    :param cache: Shared ResultCache the results are stored in
+    :param table: Loaded table
+    :param selected_filters: Dictionary of selected filter values
+    :param filtered_sims: Filtered simulation-parameter rows
+    :param current_method: Method currently displayed
+    :param x_variable: Current independent variable
+    :param color_variable: Current color variable
+    :param color_mode: Current color mode
+    :param subset_profile: Optional profile of the filtered rows (FilterIndex.subset_profile)
+    """
+    generation = canonical_key(version=table.version, filters=selected_filters,
+                               x_variable=x_variable, color_variable=color_variable, color_mode=color_mode)
+    budget = _ByteBudget(int(cache.max_bytes * PREFETCH_BYTES_FRACTION))
+
+    jobs = []
+    for method in table.header_methods:
+        if method != current_method:
+            jobs.append(lambda method=method: _prefetch_method(
+                cache, table, selected_filters, filtered_sims, method, True, [x_variable],
+                color_variable, color_mode, budget))
+
+    other_x_variables = [param for param in varying_parameters(table.header_sim_params, filtered_sims, subset_profile)
+                         if param != x_variable]
+    if other_x_variables:
+        jobs.append(lambda: _prefetch_method(
+            cache, table, selected_filters, filtered_sims, current_method, False, other_x_variables,
+            color_variable, color_mode, budget))
+
+    prefetcher.schedule(generation, jobs)
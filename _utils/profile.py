@@ -0,0 +1,204 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+
+
+# ============================================================================
+# PER-COLUMN PROFILE (distinct values, min/max, NaN counts, cardinality)
+# ============================================================================
+
+# Distinct values are tracked up to this many per column
+PROFILE_MAX_DISTINCT = 64
+
+# Sidecar file next to the source (e.g. data/Data_table.profile.json)
+PROFILE_SUFFIX = ".profile.json"
+PROFILE_BATCH_ROWS = 100_000
+
+
+def to_builtin(value):
+    """
+    Convert a NumPy/pandas scalar into a JSON-serializable Python value.
+
+    :param value: Scalar value
+    :return: Python scalar (None for missing values)
+    """
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+class ProfileAccumulator:
+    """
+    Build a per-column profile incrementally, one chunk of rows at a time.
+
+    For every column it tracks the row and NaN counts, the min and max and the
+    set of distinct values (dropped once it exceeds `max_distinct`, in which
+    case the cardinality is reported as None, i.e. "more than max_distinct").
+    """
+
+    def __init__(self, max_distinct: int = PROFILE_MAX_DISTINCT):
+        """
+        :param max_distinct: Maximum number of distinct values tracked per column
+        """
+        self.max_distinct = max_distinct
+        self._columns: Dict[str, Dict] = {}
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """
+        Add a chunk of rows to the profile.
+
+        :param chunk: DataFrame chunk (same columns for every chunk)
+        """
+        for col in chunk.columns:
+            series = chunk[col]
+            stats = self._columns.setdefault(col, {
+                'dtype': str(series.dtype), 'count': 0, 'nan_count': 0,
+                'min': None, 'max': None, 'distinct': set(),
+            })
+            valid = series.dropna()
+            stats['count'] += len(series)
+            stats['nan_count'] += len(series) - len(valid)
+            if valid.empty:
+                continue
+
+            chunk_min, chunk_max = valid.min(), valid.max()
+            stats['min'] = chunk_min if stats['min'] is None else min(stats['min'], chunk_min)
+            stats['max'] = chunk_max if stats['max'] is None else max(stats['max'], chunk_max)
+
+            if stats['distinct'] is not None:
+                stats['distinct'].update(valid.unique().tolist())
+                if len(stats['distinct']) > self.max_distinct:
+                    stats['distinct'] = None
+
+    def result(self) -> Dict[str, Dict]:
+        """
+        Return the JSON-serializable profile.
+
+        :return: Dictionary column -> {'dtype', 'count', 'nan_count', 'min', 'max',
+                 'n_distinct', 'distinct'} ('n_distinct' and 'distinct' are None
+                 when the column has more than max_distinct values)
+        """
+        profile = {}
+        for col, stats in self._columns.items():
+            distinct = stats['distinct']
+            distinct = sorted(to_builtin(value) for value in distinct) if distinct is not None else None
+            profile[col] = {
+                'dtype': stats['dtype'],
+                'count': int(stats['count']),
+                'nan_count': int(stats['nan_count']),
+                'min': to_builtin(stats['min']),
+                'max': to_builtin(stats['max']),
+                'n_distinct': len(distinct) if distinct is not None else None,
+                'distinct': distinct,
+            }
+        return profile
+
+
+def merge_profiles(profiles: List[Dict[str, Dict]],
+                   max_distinct: int = PROFILE_MAX_DISTINCT) -> Dict[str, Dict]:
+    """
+    Combine the profiles of disjoint sets of rows (e.g. the shards of a table).
+
+    :param profiles: Outputs of ProfileAccumulator.result, with the same columns
+    :param max_distinct: Maximum number of distinct values tracked per column
+    :return: Profile of all rows, in the same format
+    """
+    merged: Dict[str, Dict] = {}
+    for profile in profiles:
+        for col, stats in profile.items():
+            total = merged.setdefault(col, {
+                'dtype': stats['dtype'], 'count': 0, 'nan_count': 0,
+                'min': None, 'max': None, 'distinct': set(),
+            })
+            total['count'] += stats['count']
+            total['nan_count'] += stats['nan_count']
+            if stats['min'] is not None:
+                total['min'] = stats['min'] if total['min'] is None else min(total['min'], stats['min'])
+                total['max'] = stats['max'] if total['max'] is None else max(total['max'], stats['max'])
+            if total['distinct'] is not None:
+                if stats['distinct'] is None:
+                    total['distinct'] = None
+                else:
+                    total['distinct'].update(stats['distinct'])
+                    if len(total['distinct']) > max_distinct:
+                        total['distinct'] = None
+
+    for stats in merged.values():
+        distinct = stats['distinct']
+        stats['distinct'] = sorted(distinct) if distinct is not None else None
+        stats['n_distinct'] = len(distinct) if distinct is not None else None
+    return merged
+
+
+# ============================================================================
+# PROFILE SIDECAR (one per dataset version)
+# ============================================================================
+
+def profile_parquet(parquet_path: Path, batch_rows: int = PROFILE_BATCH_ROWS) -> Dict[str, Dict]:
+    """
+    Profile every column of a Parquet file, one batch of rows at a time.
+
+    :param parquet_path: Path to the Parquet file (e.g. the columnar cache)
+    :param batch_rows: Number of rows read per batch
+    :return: Profile (see ProfileAccumulator.result)
+    """
+    profile = ProfileAccumulator()
+    for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=batch_rows):
+        profile.update(batch.to_pandas())
+    return profile.result()
+
+
+def load_or_build_profile(profile_path: Path, version: str,
+                          build: Callable[[], Dict[str, Dict]]) -> Dict[str, Dict]:
+    """
+    Read the profile sidecar of a dataset version, building and writing it if
+    it is missing or belongs to another version.
+
+    :param profile_path: Path to the sidecar JSON file
+    :param version: Dataset version (content hash of the source)
+    :param build: Zero-argument function computing the profile
+    :return: Profile (see ProfileAccumulator.result)
+    """
+    profile_path = Path(profile_path)
+    try:
+        with open(profile_path, "r") as handle:
+            sidecar = json.load(handle)
+        if sidecar.get('version') == version:
+            return sidecar['profile']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    profile = build()
+    tmp_path = profile_path.with_name(profile_path.name + ".tmp")
+    try:
+        with open(tmp_path, "w") as handle:
+            json.dump({'version': version, 'profile': profile}, handle)
+        os.replace(tmp_path, profile_path)
+    except OSError:
+        # Read-only data directory: the profile is simply rebuilt next time
+        pass
+    return profile
+
+
+def profile_distinct_values(stats: Dict, dtype) -> Optional[List]:
+    """
+    Distinct values of a profiled column, in the dtype of its in-memory column.
+
+    :param stats: Profile entry of the column
+    :param dtype: dtype of the loaded (compacted) column
+    :return: Sorted distinct values, followed by NaN if the column has missing
+             values, or None if the column has more than PROFILE_MAX_DISTINCT values
+    """
+    if stats['distinct'] is None:
+        return None
+    values = pd.Series(stats['distinct']).astype(dtype).tolist() if stats['distinct'] else []
+    if stats['nan_count'] > 0:
+        values.append(np.nan)
+    return values
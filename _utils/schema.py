@@ -0,0 +1,188 @@
+import functools
+import json
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from _utils.instrumentation import instrumented
+
+
+# ============================================================================
+# TABLE SCHEMA: SIMULATION PARAMETERS AND {method}_{metric} COLUMNS
+# ============================================================================
+
+# Simulation parameters, in the order of the MATLAB script's headerSimulationParameters
+KNOWN_SIM_PARAMS = [
+    'fake_units', 'time_series_length', 'num_latent', 'noiseDistr', 'equalNoise',
+    'soft_norm', 'gen', 'decayCap', 'decayFactor', 'noiseFactor', 'nonLinAlfa',
+    'noise_var', 'nonLinear_var', 'tau'
+]
+KNOWN_METRICS = [
+    'k', 'dim_error', 'tot_expl_var', 'estimated_noise_var', 'estimated_noise_err',
+    'recon_accuracy', 'dim_error_opt', 'estimated_noise_err_opt', 'recon_accuracy_opt'
+]
+
+# JSON file with extra {"sim_params": [...], "metrics": [...]} merged into the defaults
+SCHEMA_REGISTRY_ENV = "SCHEMA_REGISTRY_FILE"
+
+# Number of distinct (registry, header) schemas kept in memory
+SCHEMA_CACHE_SIZE = 32
+
+
+class SchemaRegistry:
+    """
+    Known simulation parameters and metrics, with the compiled column pattern.
+
+    A metric column is {method}_{metric}; when several registered metrics
+    end a column name, the longest one wins (so 'dim_error_opt' is never
+    read as method '..._dim_error' and metric 'opt').
+    """
+
+    def __init__(self, sim_params: Iterable[str] = KNOWN_SIM_PARAMS, metrics: Iterable[str] = KNOWN_METRICS):
+        """
+        :param sim_params: Simulation parameter names, in display order
+        :param metrics: Metric names
+        """
+        self.sim_params = tuple(dict.fromkeys(sim_params))
+        self.metrics = tuple(dict.fromkeys(metrics))
+        if not self.metrics:
+            raise ValueError("The schema registry needs at least one metric")
+        alternatives = "|".join(re.escape(metric) for metric in sorted(self.metrics, key=len, reverse=True))
+        # Lazy method group: the shortest method, i.e. the longest metric suffix
+        self.pattern = re.compile(rf"^(.+?)_({alternatives})$")
+
+    def extend(self, sim_params: Iterable[str] = (), metrics: Iterable[str] = ()) -> 'SchemaRegistry':
+        """
+        Return a registry with additional simulation parameters and metrics.
+
+        :param sim_params: Extra simulation parameter names
+        :param metrics: Extra metric names
+        :return: New SchemaRegistry
+        """
+        return SchemaRegistry(self.sim_params + tuple(sim_params), self.metrics + tuple(metrics))
+
+    def parse(self, columns: Sequence[str]) -> 'TableSchema':
+        """
+        Parse a table header (memoized per registry and header, process-wide).
+
+        :param columns: Column names, in table order
+        :return: TableSchema (shared: do not modify it)
+        """
+        return _parse_columns(self, tuple(columns))
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, SchemaRegistry) and self.sim_params == other.sim_params
+                and self.metrics == other.metrics)
+
+    def __hash__(self) -> int:
+        return hash((self.sim_params, self.metrics))
+
+
+class TableSchema:
+    """
+    Parsed header of a simulation table.
+
+    Attributes: columns, sim_params (registry order), methods and metrics
+    (sorted), column_index ((method, metric) -> column position) and
+    method_columns (method -> its metric columns, in metrics order).
+    """
+
+    def __init__(self, columns: Tuple[str, ...], sim_params: List[str],
+                 column_index: Dict[Tuple[str, str], int]):
+        """
+        :param columns: Column names, in table order
+        :param sim_params: Simulation parameters present in the table
+        :param column_index: (method, metric) -> column position
+        """
+        self.columns = columns
+        self.sim_params = sim_params
+        self.column_index = column_index
+        self.methods = sorted({method for method, _ in column_index})
+        self.metrics = sorted({metric for _, metric in column_index})
+        self.method_columns = {
+            method: [columns[column_index[(method, metric)]] for metric in self.metrics
+                     if (method, metric) in column_index]
+            for method in self.methods
+        }
+
+    def column(self, method: str, metric: str) -> Optional[str]:
+        """
+        Name of the {method}_{metric} column.
+
+        :param method: Method name
+        :param metric: Metric name
+        :return: Column name, or None if the table does not have it
+        """
+        position = self.column_index.get((method, metric))
+        return None if position is None else self.columns[position]
+
+
+@functools.lru_cache(maxsize=SCHEMA_CACHE_SIZE)
+def _parse_columns(registry: SchemaRegistry, columns: Tuple[str, ...]) -> TableSchema:
+    """Parse a header in one pass over its columns (see SchemaRegistry.parse)."""
+    known_sim_params = set(registry.sim_params)
+    match = registry.pattern.match
+    column_index = {}
+    for position, col in enumerate(columns):
+        if col in known_sim_params:
+            continue
+        parsed = match(col)
+        if parsed is not None:
+            column_index.setdefault(parsed.groups(), position)
+
+    present = set(columns)
+    sim_params = [param for param in registry.sim_params if param in present]
+    return TableSchema(columns, sim_params, column_index)
+
+
+def clear_schema_cache() -> None:
+    """Forget all parsed headers (e.g. to time a cold parse)."""
+    _parse_columns.cache_clear()
+
+
+@functools.lru_cache(maxsize=1)
+def get_registry() -> SchemaRegistry:
+    """
+    Return the default registry: the known parameters and metrics, extended
+    with those of the JSON file named by SCHEMA_REGISTRY_ENV (if set).
+
+    :return: SchemaRegistry
+    """
+    registry = SchemaRegistry()
+    registry_file = os.environ.get(SCHEMA_REGISTRY_ENV)
+    if registry_file:
+        with open(registry_file, "r") as handle:
+            extra = json.load(handle)
+        registry = registry.extend(extra.get('sim_params', []), extra.get('metrics', []))
+    return registry
+
+
+def parse_schema(columns: Sequence[str], registry: SchemaRegistry = None) -> TableSchema:
+    """
+    Parse a table header with a registry (default: get_registry()).
+
+    :param columns: Column names, in table order
+    :param registry: Optional SchemaRegistry
+    :return: TableSchema (shared: do not modify it)
+    """
+    return (registry or get_registry()).parse(columns)
+
+
+@instrumented
+def extract_metadata_from_data(df: pd.DataFrame) -> Tuple[List[str], List[str], List[str], List[str]]:
+    """
+    Extract metadata (methods, metrics, and simulation parameters) from the data DataFrame.
+    
+    The DataFrame structure is: simulation_param_columns, then {method}_{metric} columns.
+    Known simulation parameters and metrics come from the schema registry
+    (see _utils.schema); parsed headers are memoized, so only the first call
+    for a header scans its columns.
+    
+    :param df: Input DataFrame
+    :return: Tuple of (headerSimulationParameters, headerMethods, headerMetrics, all_columns)
+    """
+    all_columns = df.columns.tolist()
+    schema = parse_schema(all_columns)
+    return list(schema.sim_params), list(schema.methods), list(schema.metrics), all_columns
@@ -0,0 +1,329 @@
+import argparse
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from _utils.analysis import compute_simulation_statistics, filter_data_by_parameters, normalize_filters
+from _utils.lazy_table import DEFAULT_DATA_PATH, LazyDataTable, open_table
+from _utils.memo import ResultCache, canonical_key
+from _utils.pipeline import cached_results_summary
+
+
+# ============================================================================
+# LOCAL HTTP/JSON QUERY SERVICE
+# ============================================================================
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+JSON_TYPE = "application/json"
+ARROW_TYPE = "application/vnd.apache.arrow.stream"
+
+# Latencies kept per endpoint for the percentiles of /stats
+LATENCY_WINDOW = 10_000
+LATENCY_PERCENTILES = [50, 90, 95, 99]
+
+
+class LatencyRecorder:
+    """
+    Thread-safe record of the most recent request latencies per endpoint.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        :param window: Number of latencies kept per endpoint
+        """
+        self.window = window
+        self._latencies: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        """
+        Add the latency of one request.
+
+        :param endpoint: Endpoint path
+        :param seconds: Time spent answering the request
+        """
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(seconds)
+            self._counts[endpoint] = self._counts.get(endpoint, 0) + 1
+
+    def summary(self) -> Dict[str, Dict]:
+        """
+        Latency percentiles per endpoint, in milliseconds.
+
+        :return: Dictionary endpoint -> {'count', 'p50_ms', 'p90_ms', 'p95_ms', 'p99_ms', 'max_ms'}
+        """
+        with self._lock:
+            latencies = {endpoint: np.array(values) for endpoint, values in self._latencies.items()}
+            counts = dict(self._counts)
+        summary = {}
+        for endpoint, values in latencies.items():
+            percentiles = np.percentile(values, LATENCY_PERCENTILES) * 1000
+            summary[endpoint] = {'count': counts[endpoint],
+                                 **{f"p{p}_ms": float(value) for p, value in zip(LATENCY_PERCENTILES, percentiles)},
+                                 'max_ms': float(values.max() * 1000)}
+        return summary
+
+
+def frame_to_records(frame: pd.DataFrame) -> list:
+    """
+    Convert a DataFrame to JSON-serializable records (NaN becomes null).
+
+    :param frame: DataFrame
+    :return: List of dictionaries, one per row
+    """
+    frame = frame.astype(object).where(frame.notna(), None)
+    return [{col: (value.item() if isinstance(value, np.generic) else value) for col, value in row.items()}
+            for row in frame.to_dict(orient='records')]
+
+
+def encode_frame(frame: pd.DataFrame, response_format: str, extra: Dict = None) -> Tuple[bytes, str]:
+    """
+    Encode a result table as JSON or as an Arrow IPC stream.
+
+    :param frame: Result table
+    :param response_format: 'json' or 'arrow'
+    :param extra: Additional top-level fields of the JSON response
+    :return: Tuple of (body, content type)
+    """
+    if response_format == 'arrow':
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes(), ARROW_TYPE
+    body = {**(extra or {}), 'data': frame_to_records(frame)}
+    return json.dumps(body).encode("utf-8"), JSON_TYPE
+
+
+class QueryService:
+    """
+    Answers the queries of the HTTP endpoints from one shared in-memory table.
+
+    Encoded responses are kept in a bounded ResultCache keyed on the
+    canonical query (endpoint, dataset version, filters, method, format);
+    the underlying summaries share the memoization used by the app.
+    """
+
+    def __init__(self, table: LazyDataTable, cache: ResultCache = None):
+        """
+        :param table: Loaded table (shared by all request threads)
+        :param cache: Response cache (default: a new ResultCache)
+        """
+        self.table = table
+        self.cache = cache if cache is not None else ResultCache()
+        self.latencies = LatencyRecorder()
+
+    def _filter(self, query: Dict) -> Tuple[Dict, pd.DataFrame]:
+        """Normalize the query filters and return them with the matching sim-parameter rows."""
+        selected_filters = normalize_filters(query.get('filters'), self.table.header_sim_params)
+        return selected_filters, filter_data_by_parameters(self.table.sim_data, selected_filters,
+                                                           index=self.table.filter_index)
+
+    def _method(self, query: Dict) -> str:
+        """Validated method of a query."""
+        method = query.get('method')
+        if method is None or str(method) not in self.table.header_methods:
+            raise ValueError(f"'method' must be one of {self.table.header_methods}")
+        return str(method)
+
+    def metadata(self) -> Dict:
+        """Schema of the served table."""
+        return {'version': self.table.version, 'n_rows': self.table.shape[0],
+                'header_sim_params': self.table.header_sim_params,
+                'header_methods': self.table.header_methods,
+                'header_metrics': self.table.header_metrics}
+
+    def stats(self) -> Dict:
+        """Latency percentiles per endpoint and response cache statistics."""
+        return {'latency': self.latencies.summary(), 'cache': self.cache.stats()}
+
+    def filtered_rows(self, query: Dict, response_format: str) -> Tuple[bytes, str]:
+        """
+        Rows matching the filters (optionally with the metric columns of a method).
+
+        :param query: {'filters': {...}, 'method': optional method name}
+        :param response_format: 'json' or 'arrow'
+        :return: Tuple of (body, content type)
+        """
+        def compute():
+            _, filtered_sims = self._filter(query)
+            frame = filtered_sims
+            if query.get('method') is not None:
+                frame = self.table.with_method(filtered_sims, self._method(query))
+            return encode_frame(frame.reset_index(drop=True), response_format, {'n_rows': len(frame)})
+
+        return self.cache.get_or_compute(
+            canonical_key(endpoint='filter', version=self.table.version, filters=query.get('filters'),
+                          method=query.get('method'), format=response_format),
+            compute
+        )
+
+    def simulation_summary(self, query: Dict, response_format: str) -> Tuple[bytes, str]:
+        """
+        Numeric simulation summary of the rows matching the filters (see compute_simulation_statistics).
+
+        :param query: {'filters': {...}}
+        :param response_format: 'json' or 'arrow'
+        :return: Tuple of (body, content type)
+        """
+        def compute():
+            _, filtered_sims = self._filter(query)
+            summary = compute_simulation_statistics(filtered_sims, self.table.header_sim_params)
+            return encode_frame(summary, response_format, {'n_rows': len(filtered_sims)})
+
+        return self.cache.get_or_compute(
+            canonical_key(endpoint='simulation_summary', version=self.table.version,
+                          filters=query.get('filters'), format=response_format),
+            compute
+        )
+
+    def results_summary(self, query: Dict, response_format: str) -> Tuple[bytes, str]:
+        """
+        Results summary of a method over the rows matching the filters (see compute_results_summary).
+
+        :param query: {'filters': {...}, 'method': method name}
+        :param response_format: 'json' or 'arrow'
+        :return: Tuple of (body, content type)
+        """
+        def compute():
+            method = self._method(query)
+            selected_filters, filtered_sims = self._filter(query)
+            if len(filtered_sims) == 0:
+                raise ValueError("No simulations match the filters")
+            stats_df, from_cube = cached_results_summary(self.cache, self.table, selected_filters,
+                                                         filtered_sims, method)
+            return encode_frame(stats_df, response_format,
+                                {'n_rows': len(filtered_sims), 'method': method, 'from_cube': from_cube})
+
+        return self.cache.get_or_compute(
+            canonical_key(endpoint='results_summary', version=self.table.version,
+                          filters=query.get('filters'), method=query.get('method'), format=response_format),
+            compute
+        )
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    HTTP front end of a QueryService (set as the `service` class attribute).
+
+    GET  /health, /metadata, /stats
+    POST /filter, /simulation_summary, /results_summary   JSON body with
+         'filters' (see normalize_filters) and 'method'; add ?format=arrow
+         (or Accept: application/vnd.apache.arrow.stream) for an Arrow stream
+    """
+
+    service: QueryService = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        """Silence the per-request log lines (latencies are reported by /stats)."""
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_json(self, status: int, payload: Dict) -> None:
+        self._send(status, json.dumps(payload).encode("utf-8"), JSON_TYPE)
+
+    def _response_format(self, url) -> str:
+        requested = parse_qs(url.query).get('format', [None])[0]
+        if requested is None:
+            requested = 'arrow' if ARROW_TYPE in self.headers.get("Accept", "") else 'json'
+        if requested not in ('json', 'arrow'):
+            raise ValueError("format must be 'json' or 'arrow'")
+        return requested
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        routes = {'/health': lambda: {'status': 'ok', 'version': self.service.table.version},
+                  '/metadata': self.service.metadata,
+                  '/stats': self.service.stats}
+        if url.path not in routes:
+            self._send_json(404, {'error': f"Unknown endpoint {url.path}"})
+            return
+        try:
+            self._send_json(200, routes[url.path]())
+        except Exception as error:
+            self._send_json(500, {'error': f"{type(error).__name__}: {error}"})
+        finally:
+            self.service.latencies.record(url.path, time.perf_counter() - start)
+
+    def do_POST(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        routes = {'/filter': self.service.filtered_rows,
+                  '/simulation_summary': self.service.simulation_summary,
+                  '/results_summary': self.service.results_summary}
+        if url.path not in routes:
+            self._send_json(404, {'error': f"Unknown endpoint {url.path}"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            query = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(query, dict):
+                raise ValueError("The request body must be a JSON object")
+            body, content_type = routes[url.path](query, self._response_format(url))
+        except (ValueError, KeyError, TypeError) as error:
+            self._send_json(400, {'error': str(error)})
+        except Exception as error:
+            self._send_json(500, {'error': f"{type(error).__name__}: {error}"})
+        else:
+            self._send(200, body, content_type)
+        finally:
+            self.service.latencies.record(url.path, time.perf_counter() - start)
+
+
+def make_server(table: LazyDataTable, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                cache: ResultCache = None) -> ThreadingHTTPServer:
+    """
+    Create (without starting) a threaded HTTP server over a loaded table.
+
+    :param table: Loaded table
+    :param host: Interface to bind
+    :param port: Port to bind (0 picks a free port)
+    :param cache: Response cache (default: a new ResultCache)
+    :return: ThreadingHTTPServer; call serve_forever() to start it
+    """
+    handler = type("BoundQueryHandler", (QueryHandler,), {'service': QueryService(table, cache)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve filtered simulation statistics over a local HTTP/JSON API."
+    )
+    parser.add_argument("--data", type=Path, default=DEFAULT_DATA_PATH,
+                        help="Source CSV file or directory of CSV shards")
+    parser.add_argument("--host", default=DEFAULT_HOST, help="Interface to bind")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Port to bind")
+    args = parser.parse_args()
+
+    server = make_server(open_table(args.data), args.host, args.port)
+    print(f"Serving {args.data} on http://{server.server_address[0]}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
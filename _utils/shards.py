@@ -0,0 +1,356 @@
+import argparse
+import hashlib
+import json
+import os
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from _utils.data_cache import compute_file_key, read_manifest, write_manifest
+from _utils.ingest import (
+    PARTITION_COLUMNS,
+    ROW_ID_COLUMN,
+    AggregateAccumulator,
+    detect_csv_dtypes,
+    write_partitions,
+)
+from _utils.profile import ProfileAccumulator, merge_profiles
+from _utils.schema import extract_metadata_from_data, parse_schema
+
+
+# ============================================================================
+# INCREMENTAL INGESTION OF A DIRECTORY OF CSV SHARDS
+# ============================================================================
+
+# Directory the app reads shards from (used only when there is no data/Data_table.csv)
+DEFAULT_SHARD_DIR = Path("data/shards")
+
+SHARD_PATTERN = "*.csv"
+SHARD_STORE_NAME = "shards.store"
+
+# Row ids are (shard id << SHARD_ROW_BITS) | row number within the shard, so
+# shards can be ingested independently and in parallel
+SHARD_ROW_BITS = 32
+
+
+def discover_shards(data_dir: Path, pattern: str = SHARD_PATTERN) -> List[Path]:
+    """
+    List the CSV shards of a data directory, in name order.
+
+    :param data_dir: Directory holding the shards
+    :param pattern: Glob pattern of the shard files
+    :return: Sorted list of shard paths
+    """
+    data_dir = Path(data_dir)
+    if not data_dir.is_dir():
+        return []
+    return sorted(path for path in data_dir.glob(pattern) if path.is_file())
+
+
+def get_shard_store_dir(data_dir: Path) -> Path:
+    """
+    Return the directory of the partitioned store built from the shards of a directory.
+
+    :param data_dir: Directory holding the shards
+    :return: Store directory
+    """
+    return Path(data_dir) / SHARD_STORE_NAME
+
+
+def shard_dtypes(columns: List[str], text_columns: List[str]) -> Dict[str, object]:
+    """
+    Dtypes used to parse every shard: strings for text columns, float64 otherwise.
+
+    :param columns: Column names
+    :param text_columns: Columns holding text
+    :return: Dictionary column -> dtype for pd.read_csv
+    """
+    return {col: (str if col in text_columns else 'float64') for col in columns}
+
+
+def shard_schema(columns: List[str], text_columns: List[str], partition_cols: List[str]) -> pa.Schema:
+    """
+    Arrow schema shared by the partition files of all shards.
+
+    :param columns: Column names
+    :param text_columns: Columns holding text
+    :param partition_cols: Partition columns (not stored in the files)
+    :return: Arrow schema, starting with the row id column
+    """
+    fields = [(ROW_ID_COLUMN, pa.int64())]
+    fields += [(col, pa.string() if col in text_columns else pa.float64())
+               for col in columns if col not in partition_cols]
+    return pa.schema(fields)
+
+
+def check_shard_schema(columns: List[str], reference: Dict) -> Optional[str]:
+    """
+    Check that the header of a shard matches the schema of the store.
+
+    :param columns: Column names of the shard
+    :param reference: Dictionary with 'header_sim_params', 'header_methods' and 'header_metrics'
+    :return: None if the shard matches, otherwise a description of the mismatch
+    """
+    header_sim_params, header_methods, header_metrics, _ = extract_metadata_from_data(
+        pd.DataFrame(columns=columns)
+    )
+    found = {'header_sim_params': header_sim_params, 'header_methods': header_methods,
+             'header_metrics': header_metrics}
+    for key, label in [('header_methods', 'methods'), ('header_metrics', 'metrics'),
+                       ('header_sim_params', 'simulation parameters')]:
+        missing = sorted(set(reference[key]) - set(found[key]))
+        extra = sorted(set(found[key]) - set(reference[key]))
+        if missing or extra:
+            return f"{label} differ (missing: {missing or 'none'}, unexpected: {extra or 'none'})"
+    if sorted(columns) != sorted(reference['columns']):
+        missing = sorted(set(reference['columns']) - set(columns))
+        extra = sorted(set(columns) - set(reference['columns']))
+        return f"columns differ (missing: {missing or 'none'}, unexpected: {extra or 'none'})"
+    return None
+
+
+def _ingest_shard(csv_path: str, parts_dir: str, shard_id: int, reference: Dict) -> Dict:
+    """
+    Parse one shard and write its partition files (runs in a worker thread).
+
+    :param csv_path: Path to the shard
+    :param parts_dir: Root directory of the partition files
+    :param shard_id: Id of this shard version (high bits of its row ids)
+    :param reference: Store schema ('columns', 'text_columns', 'partition_cols',
+                      'header_sim_params', 'metric_columns')
+    :return: Dictionary with 'source_key', 'shard_id', 'n_rows', 'files', 'profile',
+             'aggregates', 'seconds' and 'sim_params'
+    """
+    start = time.perf_counter()
+    columns = reference['columns']
+    partition_cols = reference['partition_cols']
+
+    chunk = pd.read_csv(csv_path, dtype=shard_dtypes(columns, reference['text_columns']))
+    chunk = chunk[columns]
+    row_ids = pd.DataFrame({ROW_ID_COLUMN: (np.int64(shard_id) << SHARD_ROW_BITS)
+                            + np.arange(len(chunk), dtype=np.int64)}, index=chunk.index)
+    chunk = pd.concat([row_ids, chunk], axis=1)
+
+    profile = ProfileAccumulator()
+    profile.update(chunk.drop(columns=ROW_ID_COLUMN))
+    aggregates = AggregateAccumulator(reference['metric_columns'])
+    aggregates.update(chunk)
+
+    file_name = f"{re.sub(r'[^A-Za-z0-9_.-]', '_', Path(csv_path).stem)}-{shard_id:05d}.parquet"
+    files = write_partitions(chunk, Path(parts_dir), partition_cols, file_name,
+                             shard_schema(columns, reference['text_columns'], partition_cols))
+    return {
+        'source_key': compute_file_key(Path(csv_path)),
+        'shard_id': shard_id,
+        'n_rows': len(chunk),
+        'files': files,
+        'profile': profile.result(),
+        'aggregates': aggregates.result(),
+        'seconds': time.perf_counter() - start,
+        'sim_params': chunk[[ROW_ID_COLUMN] + reference['header_sim_params']],
+    }
+
+
+def _merge_aggregates(shards: Dict[str, Dict], metric_columns: List[str]) -> Dict[str, Dict]:
+    """Sum the per-shard metric aggregates."""
+    merged = {col: {'count': 0, 'sum': 0.0, 'sum_sq': 0.0} for col in metric_columns}
+    for shard in shards.values():
+        for col, stats in shard['aggregates'].items():
+            for key in merged[col]:
+                merged[col][key] += stats[key]
+    return merged
+
+
+def _dataset_key(shards: Dict[str, Dict]) -> Dict:
+    """Version key of the whole directory: a hash of the shard names and hashes."""
+    digest = hashlib.sha256(json.dumps(
+        {name: shard['source_key']['sha256'] for name, shard in shards.items()}, sort_keys=True
+    ).encode())
+    return {'sha256': digest.hexdigest()}
+
+
+def _find_reference(shard_paths: List[Path], partition_cols: Optional[List[str]]) -> Dict:
+    """Schema of a new store, taken from the first shard in name order."""
+    first = shard_paths[0]
+    columns = pd.read_csv(first, nrows=0).columns.tolist()
+    header_sim_params, header_methods, header_metrics, _ = extract_metadata_from_data(
+        pd.DataFrame(columns=columns)
+    )
+    if partition_cols is None:
+        partition_cols = [col for col in PARTITION_COLUMNS if col in header_sim_params]
+    dtypes = detect_csv_dtypes(first)
+    reference = {
+        'columns': columns,
+        'text_columns': [col for col, dtype in dtypes.items() if dtype is str],
+        'partition_cols': partition_cols,
+        'header_sim_params': header_sim_params,
+        'header_methods': header_methods,
+        'header_metrics': header_metrics,
+        'metric_columns': [col for method in header_methods for col in parse_schema(columns).method_columns[method]],
+    }
+    return reference
+
+
+def ingest_shards(data_dir: Path, store_dir: Path = None, pattern: str = SHARD_PATTERN,
+                  max_workers: int = None, partition_cols: List[str] = None) -> Dict:
+    """
+    Bring the partitioned store of a directory of CSV shards up to date.
+
+    Only shards that are new or whose content changed (by mtime/size, then
+    SHA-256) are parsed, in parallel worker threads that each write their
+    own partition files. The files, simulation parameters, profile and
+    aggregates of unchanged shards are kept as they are; those of changed or
+    deleted shards are dropped. A shard whose header does not match the
+    schema of the store (checked with extract_metadata_from_data) is rejected
+    and reported in the manifest instead of triggering a rebuild.
+
+    The manifest is written last and lists every file of the store, so an
+    interrupted update leaves the previous version intact.
+
+    :param data_dir: Directory holding the shards
+    :param store_dir: Store directory (default: see get_shard_store_dir)
+    :param pattern: Glob pattern of the shard files
+    :param max_workers: Number of worker threads (default: one per CPU)
+    :param partition_cols: Partition columns of a new store (default PARTITION_COLUMNS, if present)
+    :return: Store manifest ('ingested', 'unchanged', 'removed' and 'rejected' describe this update)
+    """
+    data_dir = Path(data_dir)
+    store_dir = Path(store_dir) if store_dir is not None else get_shard_store_dir(data_dir)
+    shard_paths = discover_shards(data_dir, pattern)
+    if not shard_paths:
+        raise FileNotFoundError(f"No shards matching {pattern} in {data_dir}")
+
+    previous = read_manifest(store_dir / "manifest.json") or {}
+    previous_shards = previous.get('shards', {})
+    if previous_shards:
+        reference = previous['reference']
+    else:
+        reference = _find_reference(shard_paths, partition_cols)
+
+    # Unchanged shards are recognized from their mtime and size without reading them
+    shards = {}
+    pending = []
+    rejected = {}
+    for path in shard_paths:
+        known = previous_shards.get(path.name)
+        key = compute_file_key(path, with_hash=False)
+        if known is not None and all(known['source_key'][k] == key[k] for k in ('mtime_ns', 'size')):
+            shards[path.name] = known
+            continue
+        mismatch = check_shard_schema(pd.read_csv(path, nrows=0).columns.tolist(), reference)
+        if mismatch is not None:
+            rejected[path.name] = mismatch
+            continue
+        if known is not None:
+            key = compute_file_key(path)
+            if key['sha256'] == known['source_key']['sha256']:
+                shards[path.name] = dict(known, source_key=key)
+                continue
+        pending.append(path)
+    unchanged = sorted(shards)
+
+    parts_dir = store_dir / "parts"
+    parts_dir.mkdir(parents=True, exist_ok=True)
+    next_shard_id = previous.get('next_shard_id', 0)
+    sim_frames = []
+    if pending:
+        shard_ids = range(next_shard_id, next_shard_id + len(pending))
+        next_shard_id += len(pending)
+        # Threads, not processes: shards are ingested from inside the app, where a
+        # forked child could inherit held locks and a spawned one would re-run the
+        # app script (Streamlit installs it as __main__); CSV parsing and Parquet
+        # writing release the GIL
+        with ThreadPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, len(pending))) as pool:
+            futures = {path.name: pool.submit(_ingest_shard, str(path), str(parts_dir), shard_id, reference)
+                       for path, shard_id in zip(pending, shard_ids)}
+            for name, future in futures.items():
+                try:
+                    result = future.result()
+                except ValueError as error:
+                    # e.g. text found in a numeric column
+                    rejected[name] = f"could not be parsed with the store schema ({error})"
+                    continue
+                sim_frames.append(result.pop('sim_params'))
+                shards[name] = result
+
+    if not shards:
+        raise ValueError(f"No valid shards in {data_dir}: {rejected}")
+    # Previous shard versions that are no longer part of the store
+    replaced = [name for name, shard in previous_shards.items()
+                if name not in shards or shards[name]['shard_id'] != shard['shard_id']]
+
+    # Simulation parameters: keep the rows of unchanged shards, add the new ones
+    if unchanged and (pending or replaced):
+        previous_sims = pd.read_parquet(store_dir / previous['sim_params_file'])
+        kept_ids = [shards[name]['shard_id'] for name in unchanged]
+        keep = np.isin(previous_sims[ROW_ID_COLUMN].to_numpy() >> SHARD_ROW_BITS, kept_ids)
+        sim_frames.insert(0, previous_sims[keep])
+    generation = previous.get('generation', -1)
+    if pending or replaced or not previous_shards:
+        generation += 1
+        sim_data = pd.concat(sim_frames, ignore_index=True).sort_values(ROW_ID_COLUMN, ignore_index=True)
+        sim_data.to_parquet(store_dir / f"sim_params-{generation:05d}.parquet", index=False)
+    sim_params_file = f"sim_params-{generation:05d}.parquet"
+
+    shards = {name: shards[name] for name in sorted(shards)}
+    manifest = {
+        'source': str(data_dir),
+        'source_key': _dataset_key(shards),
+        'n_rows': int(sum(shard['n_rows'] for shard in shards.values())),
+        'columns': reference['columns'],
+        'header_sim_params': reference['header_sim_params'],
+        'header_methods': reference['header_methods'],
+        'header_metrics': reference['header_metrics'],
+        'partition_cols': reference['partition_cols'],
+        'files': [file for shard in shards.values() for file in shard['files']],
+        'sim_params_file': sim_params_file,
+        'profile': merge_profiles([shard['profile'] for shard in shards.values()]),
+        'aggregates': _merge_aggregates(shards, reference['metric_columns']),
+        'cold_load_seconds': sum(shard['seconds'] for shard in shards.values()),
+        'reference': reference,
+        'shards': shards,
+        'next_shard_id': next_shard_id,
+        'generation': generation,
+        'ingested': sorted(path.name for path in pending if path.name in shards),
+        'unchanged': unchanged,
+        'removed': sorted(set(previous_shards) - set(shards)),
+        'rejected': rejected,
+    }
+    write_manifest(store_dir / "manifest.json", manifest)
+
+    # Drop the files of replaced or deleted shards once the new manifest is in place
+    for name in replaced:
+        for file in previous_shards[name]['files']:
+            (parts_dir / file).unlink(missing_ok=True)
+    if previous_shards and previous['sim_params_file'] != sim_params_file:
+        (store_dir / previous['sim_params_file']).unlink(missing_ok=True)
+    return manifest
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest new or changed CSV shards of a directory into its partitioned Parquet store."
+    )
+    parser.add_argument("data_dir", type=Path, nargs="?", default=DEFAULT_SHARD_DIR,
+                        help=f"Directory holding the CSV shards (default: {DEFAULT_SHARD_DIR})")
+    parser.add_argument("--store-dir", type=Path, default=None, help="Output store directory")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker threads")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    manifest = ingest_shards(args.data_dir, args.store_dir, max_workers=args.workers)
+    print(f"{len(manifest['ingested'])} shards ingested, {len(manifest['unchanged'])} unchanged, "
+          f"{len(manifest['removed'])} removed ({manifest['n_rows']} rows) "
+          f"in {time.perf_counter() - start:.1f}s")
+    for name, reason in manifest['rejected'].items():
+        print(f"Rejected {name}: {reason}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Tuple
+
+import pandas as pd
+import streamlit as st
+
+from _utils.data_cache import compute_file_key
+from _utils.lazy_table import LazyDataTable, open_table
+from _utils.memo import ResultCache
+from _utils.shards import discover_shards
+from _utils.upper_bound import UpperBoundIndex
+
+
+# ============================================================================
+# PROCESS-WIDE SHARED DATASET
+# ============================================================================
+
+# All sessions read the same frames. With Copy-on-Write (always on from
+# pandas 3), any in-place change made by a session creates a private copy
+# instead of altering the shared data, so handing out the frames is zero-copy.
+if int(pd.__version__.split('.')[0]) < 3 and hasattr(pd.options.mode, 'copy_on_write'):
+    pd.options.mode.copy_on_write = True
+
+
+# Worker threads shared by all sessions for background prefetching
+PREFETCH_WORKERS = 2
+
+
+@st.cache_resource(max_entries=1, show_spinner="Loading simulation table...")
+def _load_shared_table(csv_path: str, source_key: Tuple) -> LazyDataTable:
+    """
+    Load the simulation table once per server process and source version
+    (from the columnar cache, or the partitioned store for large tables).
+
+    `source_key` is only used as part of the cache key: when the CSV changes
+    a new table is loaded and, with max_entries=1, the old one is released.
+
+    :param csv_path: Path to the source CSV file, or to a directory of CSV shards
+    :param source_key: (mtime_ns, size) of the source CSV file, or (name, mtime_ns, size) of every shard
+    :return: Shared LazyDataTable
+    """
+    return open_table(Path(csv_path))
+
+
+def get_shared_table(csv_path: Path) -> LazyDataTable:
+    """
+    Return the process-wide table for a CSV file or shard directory, shared by all sessions.
+
+    The table, its metadata, filter index and materialized method columns
+    are loaded once per server process; extra sessions cost no data memory.
+
+    Adding, replacing or deleting a shard of a directory changes the key, so
+    the next rerun ingests just that shard and swaps the table in.
+
+    :param csv_path: Path to the source CSV file, or to a directory of CSV shards
+    :return: Shared LazyDataTable (treat as read-only)
+    """
+    if Path(csv_path).is_dir():
+        keys = [(path.name, compute_file_key(path, with_hash=False)) for path in discover_shards(csv_path)]
+        return _load_shared_table(str(csv_path), tuple((name, key['mtime_ns'], key['size'])
+                                                       for name, key in keys))
+    key = compute_file_key(csv_path, with_hash=False)
+    return _load_shared_table(str(csv_path), (key['mtime_ns'], key['size']))
+
+
+def reload_shared_table() -> None:
+    """
+    Drop the shared table so the next get_shared_table call reloads it.
+
+    Sessions still holding the previous table keep a valid object until their
+    next rerun, so a reload never invalidates data mid-run.
+    """
+    _load_shared_table.clear()
+
+
+@st.cache_resource(max_entries=1, show_spinner="Indexing the simulation grid...")
+def get_upper_bound_index(_table: LazyDataTable, version: str) -> UpperBoundIndex:
+    """
+    Return the process-wide upper-bound lookup index of a table.
+
+    :param _table: Loaded table (not hashed)
+    :param version: Dataset version of the table (cache key)
+    :return: Shared UpperBoundIndex
+    """
+    return UpperBoundIndex.from_table(_table)
+
+
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """
+    Return the process-wide cache of figures and result tables.
+
+    Keys include the dataset version, so entries of a reloaded table are
+    never served for the new one (they simply age out of the LRU).
+
+    :return: Shared ResultCache
+    """
+    return ResultCache()
+
+
+@st.cache_resource
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    """
+    Return the process-wide worker pool used for background prefetching.
+
+    :return: Shared ThreadPoolExecutor
+    """
+    return ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
@@ -0,0 +1,268 @@
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from _utils.filter_index import FilterIndex
+from _utils.stats_engine import RESULTS_QUANTILES, RESULTS_STAT_COLUMNS
+
+
+# ============================================================================
+# PRE-AGGREGATED STATISTICS CUBE OVER DISCRETE SIMULATION PARAMETERS
+# ============================================================================
+
+# Order statistics kept per cell and metric column (quantile sketch resolution)
+SKETCH_POINTS = 128
+
+# Minimum average number of rows per cell, so merged sketches stay well below
+# the size of the rows they summarize
+MIN_ROWS_PER_CELL = 4 * SKETCH_POINTS
+
+
+def select_cube_params(index: FilterIndex) -> List[str]:
+    """
+    Choose the discrete parameters the cube is grouped by.
+
+    Bitmap-indexed parameters are added from the fewest distinct values up,
+    as long as the number of cells (bounded by the product of the numbers of
+    values) leaves at least MIN_ROWS_PER_CELL rows per cell on average. Only
+    the index is read, so no row is scanned to decide.
+
+    :param index: FilterIndex over the simulation parameters
+    :return: Cube parameters, in index order (empty if none fits)
+    """
+    max_cells = index.n_rows // MIN_ROWS_PER_CELL
+    n_values = {
+        param: len(index.bitmaps[param]) + (1 if index.count(index.nan_bitmaps[param]) > 0 else 0)
+        for param in index.params if param in index.bitmaps
+    }
+    chosen = set()
+    n_cells = 1
+    for param in sorted(n_values, key=n_values.get):
+        if n_cells * n_values[param] > max_cells:
+            break
+        chosen.add(param)
+        n_cells *= n_values[param]
+    return [param for param in index.params if param in chosen]
+
+
+class StatsCube:
+    """
+    Mergeable statistics of the metric columns of one method, grouped by
+    discrete simulation parameters (see select_cube_params).
+
+    Each cell holds, for every metric column, the count, the sum and the sum
+    of squares (centred on the column mean for numerical stability), and a
+    quantile sketch: up to SKETCH_POINTS order statistics of the cell's
+    values, evenly spaced in rank, each standing for n / points rows. Cells
+    with fewer rows keep all their values.
+
+    For a filter that selects whole cells, count, mean and std are merged
+    exactly; quantiles are read from the merged sketches of the selected
+    cells, with a rank error of at most 1 / SKETCH_POINTS of the selected
+    rows (exact when every selected cell kept all its values).
+    """
+
+    def __init__(self, sim_data: pd.DataFrame, index: FilterIndex, cube_params: List[str],
+                 metric_data: pd.DataFrame, metrics: List[str]):
+        """
+        :param sim_data: Simulation-parameter columns the index was built on
+        :param index: FilterIndex over sim_data
+        :param cube_params: Discrete parameters defining the cells (see select_cube_params)
+        :param metric_data: {method}_{metric} columns aligned with sim_data
+        :param metrics: Metric name of each column of metric_data
+        """
+        self.index = index
+        self.metrics = list(metrics)
+        self.cube_params = list(cube_params)
+
+        # Cell id of every row from the codes of the cube parameters
+        param_codes = []
+        self.param_values: Dict[str, list] = {}
+        for param in self.cube_params:
+            codes, uniques = pd.factorize(sim_data[param], sort=True)
+            codes = np.where(codes < 0, len(uniques), codes)  # NaN gets its own code
+            param_codes.append(codes)
+            self.param_values[param] = list(uniques) + [np.nan]
+
+        dims = [len(self.param_values[param]) for param in self.cube_params]
+        flat_ids = np.ravel_multi_index(param_codes, dims)
+        cell_ids, row_cells = np.unique(flat_ids, return_inverse=True)
+        self.cell_keys = np.stack(np.unravel_index(cell_ids, dims), axis=1)
+        self.n_cells = len(self.cell_keys)
+
+        n_cols = len(self.metrics)
+        self.count = np.zeros((self.n_cells, n_cols), dtype=np.int64)
+        self.sum = np.zeros((self.n_cells, n_cols))
+        self.sum_sq = np.zeros((self.n_cells, n_cols))
+        self.center = np.zeros(n_cols)
+
+        # Sketch points of each column, sorted by value across all cells:
+        # (values, cell of each point, rows each point stands for)
+        self.sketches = []
+
+        for col_idx, column in enumerate(metric_data.columns):
+            values = metric_data[column].to_numpy(dtype=np.float64)
+            valid = ~np.isnan(values)
+            cells = row_cells[valid]
+            values = values[valid]
+            if len(values) == 0:
+                self.sketches.append((np.empty(0), np.empty(0, dtype=np.int64), np.empty(0)))
+                continue
+
+            center = values.mean()
+            self.center[col_idx] = center
+
+            shifted = values - center
+            counts = np.bincount(cells, minlength=self.n_cells)
+            self.count[:, col_idx] = counts
+            self.sum[:, col_idx] = np.bincount(cells, weights=shifted, minlength=self.n_cells)
+            self.sum_sq[:, col_idx] = np.bincount(cells, weights=shifted ** 2, minlength=self.n_cells)
+
+            self.sketches.append(self._build_sketch(values, cells, counts))
+
+    @staticmethod
+    def _build_sketch(values: np.ndarray, cells: np.ndarray, counts: np.ndarray) -> tuple:
+        """
+        Pick the sketch points of one column: in every cell, the values at the
+        centres of SKETCH_POINTS equal rank intervals.
+
+        :param values: Non-NaN values of the column
+        :param cells: Cell of each value
+        :param counts: Number of values per cell
+        :return: Tuple of (point values, point cells, point weights), sorted by value
+        """
+        by_cell = np.lexsort((values, cells))
+        sorted_values = values[by_cell]
+        cell_start = np.concatenate([[0], np.cumsum(counts)[:-1]])
+
+        points = np.minimum(counts, SKETCH_POINTS)
+        point_cells = np.repeat(np.arange(len(counts)), points)
+        point_start = np.concatenate([[0], np.cumsum(points)[:-1]])
+        rank_in_points = np.arange(len(point_cells)) - point_start[point_cells]
+        cell_counts = counts[point_cells]
+        cell_points = points[point_cells]
+        ranks = ((rank_in_points + 0.5) * cell_counts / cell_points).astype(np.int64)
+
+        point_values = sorted_values[cell_start[point_cells] + ranks]
+        weights = cell_counts / cell_points
+        order = np.argsort(point_values, kind='stable')
+        return point_values[order], point_cells[order], weights[order]
+
+    def cell_mask(self, selected_filters: Dict) -> Optional[np.ndarray]:
+        """
+        Boolean mask of the cells selected by a filter, if it aligns with cube cells.
+
+        A filter aligns when every predicate either targets a cube parameter or
+        keeps every row of its (non-cube) parameter.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: Boolean mask over cells, or None if the filter cuts through cells
+        """
+        mask = np.ones(self.n_cells, dtype=bool)
+        for key, value in selected_filters.items():
+            is_range = key.endswith('_range')
+            param = key[:-len('_range')] if is_range else key
+
+            if param not in self.cube_params:
+                if is_range and self._covers_full_range(param, value):
+                    continue
+                if not is_range and (not (isinstance(value, list) and len(value) > 0)
+                                     or self._keeps_all_values(param, value)):
+                    continue
+                return None
+
+            param_values = self.param_values[param]
+            if is_range:
+                min_val, max_val = value
+                accepted = [code for code, val in enumerate(param_values)
+                            if not pd.isna(val) and min_val <= val <= max_val]
+            elif isinstance(value, list) and len(value) > 0:
+                accepted = [code for code, val in enumerate(param_values)
+                            if any(val == v or (pd.isna(val) and pd.isna(v)) for v in value)]
+            else:
+                continue
+            mask &= np.isin(self.cell_keys[:, self.cube_params.index(param)], accepted)
+        return mask
+
+    def _covers_full_range(self, param: str, value) -> bool:
+        """Whether a range predicate on a sorted-indexed parameter keeps every row."""
+        if param not in self.index.sorted_values:
+            return False
+        sorted_vals, _ = self.index.sorted_values[param]
+        if len(sorted_vals) != self.index.n_rows:  # NaN rows would be dropped
+            return False
+        min_val, max_val = value
+        return min_val <= sorted_vals[0] and max_val >= sorted_vals[-1]
+
+    def _keeps_all_values(self, param: str, value: list) -> bool:
+        """Whether a multiselect predicate on a bitmap-indexed parameter keeps every row."""
+        if param not in self.index.bitmaps:
+            return False
+        if self.index.count(self.index.nan_bitmaps[param]) > 0:  # NaN rows are never selected
+            return False
+        return set(self.index.bitmaps[param]).issubset(value)
+
+    def summarize(self, selected_filters: Dict) -> Optional[pd.DataFrame]:
+        """
+        Summary statistics for a filter, merged from the selected cells.
+
+        :param selected_filters: Dictionary of selected filter values
+        :return: DataFrame in the format of compute_results_summary, or None if
+                 the filter does not align with cube cells (use an exact scan)
+        """
+        mask = self.cell_mask(selected_filters)
+        if mask is None:
+            return None
+
+        count = self.count[mask].sum(axis=0)
+        total = self.sum[mask].sum(axis=0)
+        total_sq = self.sum_sq[mask].sum(axis=0)
+        targets = np.asarray(RESULTS_QUANTILES)
+
+        rows = []
+        for col_idx, metric in enumerate(self.metrics):
+            n = int(count[col_idx])
+            if n == 0:
+                continue
+            shifted_mean = total[col_idx] / n
+            mean = self.center[col_idx] + shifted_mean
+            if n > 1:
+                variance = max(total_sq[col_idx] - n * shifted_mean ** 2, 0.0) / (n - 1)
+                std = float(np.sqrt(variance))
+            else:
+                std = float('nan')
+
+            # Each point sits at the centre of the ranks it stands for; the
+            # quantile is interpolated between points as np.quantile does between rows
+            point_values, point_cells, weights = self.sketches[col_idx]
+            selected = mask[point_cells]
+            point_values = point_values[selected]
+            weights = weights[selected]
+            positions = np.cumsum(weights) - weights / 2
+            quantiles = np.interp(targets * (n - 1) + 0.5, positions, point_values)
+
+            rows.append([metric, mean, std, *quantiles])
+
+        return pd.DataFrame(rows, columns=['Metric'] + RESULTS_STAT_COLUMNS)
+
+
+def build_stats_cube(sim_data: pd.DataFrame, index: FilterIndex, cube_params: List[str],
+                     method_data: pd.DataFrame, method: str, header_metrics: List[str]) -> Optional[StatsCube]:
+    """
+    Build the statistics cube of one method.
+
+    :param sim_data: Simulation-parameter columns the index was built on
+    :param index: FilterIndex over sim_data
+    :param cube_params: Output of select_cube_params (non-empty)
+    :param method_data: The method's metric columns, aligned with sim_data
+    :param method: Method name
+    :param header_metrics: List of metric names
+    :return: StatsCube, or None if the method has no metric columns
+    """
+    metrics = [metric for metric in header_metrics if f"{method}_{metric}" in method_data.columns]
+    if not metrics:
+        return None
+
+    columns = [f"{method}_{metric}" for metric in metrics]
+    return StatsCube(sim_data, index, cube_params, method_data[columns], metrics)
@@ -0,0 +1,113 @@
+import warnings
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# VECTORIZED STATISTICS OVER ALL (METHOD, METRIC) COLUMNS
+# ============================================================================
+
+# Quantiles reported by the results summary, with their column names
+RESULTS_QUANTILES = [0.05, 0.25, 0.50, 0.75, 0.95]
+RESULTS_STAT_COLUMNS = ['Mean', 'Std', '5th %ile', '25th %ile', 'Median', '75th %ile', '95th %ile']
+
+
+def batched_column_statistics(values: np.ndarray) -> np.ndarray:
+    """
+    Compute count, mean, std and the summary quantiles of every column at once.
+
+    NaNs are ignored per column. Columns without valid values yield NaN
+    statistics and a count of 0.
+
+    :param values: 2D float array (rows x columns)
+    :return: Array of shape (columns, 1 + len(RESULTS_STAT_COLUMNS)) holding
+             count followed by the RESULTS_STAT_COLUMNS statistics
+    """
+    n_cols = values.shape[1]
+    count = np.count_nonzero(~np.isnan(values), axis=0)
+    if values.shape[0] == 0:
+        stats = np.full((n_cols, len(RESULTS_STAT_COLUMNS)), np.nan)
+        return np.column_stack([count, stats])
+
+    with warnings.catch_warnings():
+        # All-NaN columns and single-value std are expected here
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        mean = np.nanmean(values, axis=0)
+        std = np.nanstd(values, axis=0, ddof=1)
+        quantiles = np.nanquantile(values, RESULTS_QUANTILES, axis=0)
+
+    return np.column_stack([count, mean, std, quantiles.T])
+
+
+def build_method_metric_frame(df: pd.DataFrame, header_methods: List[str],
+                              header_metrics: List[str]) -> pd.DataFrame:
+    """
+    Reshape the {method}_{metric} columns into a (method, metric) MultiIndex frame.
+
+    :param df: DataFrame holding {method}_{metric} columns
+    :param header_methods: List of method names
+    :param header_metrics: List of metric names
+    :return: DataFrame with a (method, metric) column MultiIndex (existing columns only)
+    """
+    pairs = [(method, metric) for method in header_methods for metric in header_metrics
+             if f"{method}_{metric}" in df.columns]
+    frame = df[[f"{method}_{metric}" for method, metric in pairs]]
+    frame = frame.set_axis(pd.MultiIndex.from_tuples(pairs, names=['method', 'metric']), axis=1)
+    return frame
+
+
+def compute_method_statistics(method_metric_frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute every summary statistic for every (method, metric) column in one pass.
+
+    :param method_metric_frame: Output of build_method_metric_frame
+    :return: DataFrame indexed by (method, metric) with 'Count' and the
+             RESULTS_STAT_COLUMNS statistics
+    """
+    values = method_metric_frame.to_numpy(dtype=np.float64)
+    stats = batched_column_statistics(values)
+    result = pd.DataFrame(stats, index=method_metric_frame.columns,
+                          columns=['Count'] + RESULTS_STAT_COLUMNS)
+    result['Count'] = result['Count'].astype(np.int64)
+    return result
+
+
+# ============================================================================
+# METHOD RANKING
+# ============================================================================
+
+def metric_rank_direction(metric: str) -> Optional[str]:
+    """
+    How methods should be ranked on a metric.
+
+    :param metric: Metric name
+    :return: 'abs' (closest to zero is best) for error metrics, 'desc' (highest
+             is best) for accuracy metrics, None when there is no natural order
+    """
+    if 'err' in metric:
+        return 'abs'
+    if 'accuracy' in metric:
+        return 'desc'
+    return None
+
+
+def rank_methods(method_stats: pd.DataFrame, metric: str, statistic: str = 'Median') -> pd.DataFrame:
+    """
+    Rank all methods on one metric.
+
+    :param method_stats: Output of compute_method_statistics
+    :param metric: Metric to rank on
+    :param statistic: Statistic column used for ranking
+    :return: DataFrame indexed by method with all statistics and a 'Rank'
+             column (1 = best), sorted by rank
+    """
+    table = method_stats.xs(metric, level='metric').copy()
+    direction = metric_rank_direction(metric)
+    score = table[statistic]
+    if direction == 'abs':
+        score = score.abs()
+    ascending = direction != 'desc'
+    table.insert(0, 'Rank', score.rank(ascending=ascending, method='min'))
+    return table.sort_values('Rank', na_position='last')
@@ -0,0 +1,129 @@
+import argparse
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+
+# ============================================================================
+# SYNTHETIC SIMULATION TABLES (same schema as data/Data_table.csv)
+# ============================================================================
+
+SYNTHETIC_METHODS = ['80', '90', 'PR', 'K1', 'PA', 'optimal_SVHT', 'CV_rows', 'CV_cols',
+                     'CV_bicross', 'CV_rows&cols', 'OPTIMAL_knowing_struct']
+SYNTHETIC_METRICS = ['k', 'dim_error', 'tot_expl_var', 'estimated_noise_var', 'estimated_noise_err',
+                     'recon_accuracy', 'dim_error_opt', 'estimated_noise_err_opt', 'recon_accuracy_opt']
+
+# Discrete simulation parameters and the values drawn for them
+DISCRETE_PARAM_VALUES = {
+    'fake_units': [50, 100, 200, 400],
+    'time_series_length': [500, 1000, 2000, 5000, 10000],
+    'num_latent': [5, 10, 50, 100, 1000],
+    'noiseDistr': ['gaussian', 'poisson'],
+    'equalNoise': [0, 1],
+    'soft_norm': [0, 1],
+    'gen': ['dynamical', 'random'],
+    'decayCap': [0.1, 0.5],
+    'nonLinAlfa': [0.0, 0.5, 1.0],
+}
+
+DEFAULT_CHUNK_ROWS = 250_000
+
+
+def generate_data_table(n_rows: int, nan_rate: float = 0.05, seed: int = 0,
+                        methods: List[str] = None, metrics: List[str] = None) -> pd.DataFrame:
+    """
+    Generate a synthetic simulation table with the schema of the real one.
+
+    Columns are the known simulation parameters (in the order of the MATLAB
+    export) followed by the full {method}_{metric} grid. Metric values are
+    loosely tied to the parameters (e.g. k grows with tau and is capped by
+    fake_units) so filters and plots behave realistically.
+
+    :param n_rows: Number of simulations (rows)
+    :param nan_rate: Fraction of missing values in each metric column
+    :param seed: Random seed
+    :param methods: Method names (default SYNTHETIC_METHODS)
+    :param metrics: Metric names (default SYNTHETIC_METRICS)
+    :return: DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    methods = methods if methods is not None else SYNTHETIC_METHODS
+    metrics = metrics if metrics is not None else SYNTHETIC_METRICS
+
+    data: Dict[str, np.ndarray] = {}
+    for param in ['fake_units', 'time_series_length', 'num_latent', 'noiseDistr', 'equalNoise',
+                  'soft_norm', 'gen', 'decayCap']:
+        data[param] = rng.choice(DISCRETE_PARAM_VALUES[param], n_rows)
+    data['decayFactor'] = rng.uniform(0, 2, n_rows).round(3)
+    data['noiseFactor'] = rng.uniform(0, 1, n_rows).round(3)
+    data['nonLinAlfa'] = rng.choice(DISCRETE_PARAM_VALUES['nonLinAlfa'], n_rows)
+    data['noise_var'] = rng.uniform(0, 100, n_rows)
+    data['nonLinear_var'] = rng.uniform(0, 100, n_rows)
+    data['tau'] = rng.uniform(0, 50, n_rows)
+
+    # Shared "true" dimensionality that every method estimates with its own bias
+    true_k = np.minimum(np.minimum(data['num_latent'], data['fake_units']),
+                        1 + data['tau'] * (1 - data['noiseFactor'] / 2) / 2)
+    for method_idx, method in enumerate(methods):
+        bias = 1 + 0.1 * (method_idx - len(methods) / 2)
+        k = np.clip(np.round(true_k * bias + rng.normal(0, 2, n_rows)), 0, data['fake_units'])
+        values = {
+            'k': k,
+            'dim_error': k - data['num_latent'],
+            'tot_expl_var': np.clip(rng.beta(5, 2, n_rows), 0, 1),
+            'estimated_noise_var': np.clip(data['noise_var'] + rng.normal(0, 5, n_rows), 0, 100),
+            'estimated_noise_err': rng.normal(0, 5, n_rows),
+            'recon_accuracy': np.clip(rng.beta(8, 2, n_rows), 0, 1),
+            'dim_error_opt': k - true_k,
+            'estimated_noise_err_opt': rng.normal(0, 3, n_rows),
+            'recon_accuracy_opt': np.clip(rng.beta(9, 2, n_rows), 0, 1),
+        }
+        for metric in metrics:
+            column = values[metric] if metric in values else rng.normal(0, 1, n_rows)
+            column = column.astype(np.float64)
+            column[rng.random(n_rows) < nan_rate] = np.nan
+            data[f"{method}_{metric}"] = column
+
+    return pd.DataFrame(data)
+
+
+def write_data_table(csv_path: Path, n_rows: int, nan_rate: float = 0.05, seed: int = 0,
+                     chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Path:
+    """
+    Write a synthetic simulation table to CSV, chunk by chunk (tables up to
+    1e7 rows never have to fit in memory at once).
+
+    :param csv_path: Output CSV path
+    :param n_rows: Number of simulations (rows)
+    :param nan_rate: Fraction of missing values in each metric column
+    :param seed: Random seed (chunks use seeds spawned from it)
+    :param chunk_rows: Number of rows generated per chunk
+    :return: Output CSV path
+    """
+    csv_path = Path(csv_path)
+    csv_path.parent.mkdir(parents=True, exist_ok=True)
+    n_chunks = max(1, -(-n_rows // chunk_rows))
+    chunk_seeds = np.random.SeedSequence(seed).spawn(n_chunks)
+    for chunk_idx, chunk_seed in enumerate(chunk_seeds):
+        rows = min(chunk_rows, n_rows - chunk_idx * chunk_rows)
+        chunk = generate_data_table(rows, nan_rate, seed=chunk_seed.generate_state(1)[0])
+        chunk.to_csv(csv_path, mode='w' if chunk_idx == 0 else 'a', header=chunk_idx == 0, index=False)
+    return csv_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic simulation table with the real schema.")
+    parser.add_argument("csv_path", type=Path, help="Output CSV file")
+    parser.add_argument("--rows", type=float, default=1e4, help="Number of rows (e.g. 1e3 to 1e7)")
+    parser.add_argument("--nan-rate", type=float, default=0.05, help="Fraction of missing metric values")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    write_data_table(args.csv_path, int(args.rows), args.nan_rate, args.seed)
+    print(f"Wrote {int(args.rows)} rows to {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
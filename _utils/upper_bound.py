@@ -0,0 +1,278 @@
+import argparse
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from _utils.lazy_table import LazyDataTable, open_table
+
+
+# ============================================================================
+# UPPER-BOUND DIMENSIONALITY LOOKUP OVER THE SIMULATION GRID
+# ============================================================================
+
+UPPER_BOUND_METHOD = 'OPTIMAL_knowing_struct'
+UPPER_BOUND_METRIC = 'k'
+T_PARAM = 'time_series_length'
+M_PARAM = 'fake_units'
+TAU_PARAM = 'tau'
+
+# Discrete settings a lookup is conditioned on, with the values recommended
+# for neural data (see README); all other parameters are marginalized over
+RECOMMENDED_CONDITIONS = {
+    'gen': 'dynamical',
+    'noiseDistr': 'poisson',
+    'equalNoise': 0,
+    'soft_norm': 1,
+    'num_latent': 1000,
+}
+
+LOOKUP_COLUMNS = ['upper_bound', 'std', 'sem', 'count', 'on_grid']
+
+
+def _condition_value(value):
+    """Normalize a condition value so that e.g. 1, 1.0 and np.int8(1) compare equal."""
+    if isinstance(value, str):
+        return value
+    return float(value)
+
+
+class UpperBoundIndex:
+    """
+    Precomputed index answering "which upper-bound dimensionality does the
+    oracle estimator find for data with this T, M and tau range?".
+
+    Rows are grouped in cells by the condition settings and the (T, M) grid
+    point. In each cell the rows are sorted by tau and prefix sums of the
+    count, sum and sum of squares of the metric are kept, so the statistics
+    of any tau range are two binary searches away. T and M between grid
+    points are handled by bilinear interpolation (in log scale) of the four
+    surrounding cells; values outside the grid are clamped to its edges.
+    """
+
+    def __init__(self, sim_data: pd.DataFrame, values: pd.Series,
+                 condition_params: List[str] = None):
+        """
+        :param sim_data: Simulation-parameter columns (T, M, tau and the condition params)
+        :param values: Metric aligned with sim_data (e.g. OPTIMAL_knowing_struct_k)
+        :param condition_params: Discrete parameters lookups are conditioned on
+                                 (default: the keys of RECOMMENDED_CONDITIONS)
+        """
+        if condition_params is None:
+            condition_params = list(RECOMMENDED_CONDITIONS)
+        self.condition_params = [param for param in condition_params if param in sim_data.columns]
+
+        t_values = sim_data[T_PARAM].to_numpy(dtype=np.float64)
+        m_values = sim_data[M_PARAM].to_numpy(dtype=np.float64)
+        tau = sim_data[TAU_PARAM].to_numpy(dtype=np.float64)
+        metric = values.to_numpy(dtype=np.float64)
+        keep = ~(np.isnan(t_values) | np.isnan(m_values) | np.isnan(tau))
+
+        self.t_grid = np.unique(t_values[keep])
+        self.m_grid = np.unique(m_values[keep])
+        t_codes = np.searchsorted(self.t_grid, t_values)
+        m_codes = np.searchsorted(self.m_grid, m_values)
+
+        condition_frame = sim_data[self.condition_params].astype(object)
+        condition_keys = [tuple(_condition_value(value) for value in row)
+                          for row in condition_frame.itertuples(index=False, name=None)]
+        self.conditions: Dict[Tuple, int] = {}
+        condition_codes = np.array([self.conditions.setdefault(key, len(self.conditions))
+                                    for key in condition_keys], dtype=np.int64)
+
+        # cell_ids[condition, t, m] -> cell number, -1 where the grid has no rows
+        shape = (max(len(self.conditions), 1), len(self.t_grid), len(self.m_grid))
+        flat = np.ravel_multi_index((condition_codes[keep], t_codes[keep], m_codes[keep]), shape)
+        order = np.lexsort((tau[keep], flat))
+        flat, tau, metric = flat[order], tau[keep][order], metric[keep][order]
+        cell_flat, starts = np.unique(flat, return_index=True)
+        self.cell_ids = np.full(int(np.prod(shape)), -1, dtype=np.int64)
+        self.cell_ids[cell_flat] = np.arange(len(cell_flat))
+        self.cell_ids = self.cell_ids.reshape(shape)
+        bounds = np.append(starts, len(flat))
+
+        # Per cell: sorted tau and prefix sums (centred on the cell mean)
+        self.cells = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            cell_metric = metric[start:stop]
+            valid = ~np.isnan(cell_metric)
+            center = cell_metric[valid].mean() if valid.any() else 0.0
+            centred = np.where(valid, cell_metric - center, 0.0)
+            self.cells.append({
+                'tau': tau[start:stop],
+                'center': center,
+                'count': np.concatenate([[0], np.cumsum(valid)]),
+                'sum': np.concatenate([[0.0], np.cumsum(centred)]),
+                'sum_sq': np.concatenate([[0.0], np.cumsum(centred ** 2)]),
+            })
+
+    @classmethod
+    def from_table(cls, table: LazyDataTable, method: str = UPPER_BOUND_METHOD,
+                   metric: str = UPPER_BOUND_METRIC,
+                   condition_params: List[str] = None) -> 'UpperBoundIndex':
+        """
+        Build the index from a loaded table.
+
+        :param table: Loaded table
+        :param method: Method whose estimates are looked up
+        :param metric: Metric looked up
+        :param condition_params: Discrete parameters lookups are conditioned on
+        :return: UpperBoundIndex
+        """
+        column = f"{method}_{metric}"
+        if column not in table.columns:
+            raise ValueError(f"Column {column} not found in the simulation table")
+        return cls(table.sim_data, table.load_method(method)[column], condition_params)
+
+    def _grid_corners(self, values: np.ndarray, grid: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Lower/upper grid positions and upper weight of each value (log-linear, clamped)."""
+        values = np.clip(values, grid[0], grid[-1])
+        upper = np.clip(np.searchsorted(grid, values), 0, len(grid) - 1)
+        lower = np.clip(upper - 1, 0, len(grid) - 1)
+        exact = grid[upper] == values
+        lower = np.where(exact, upper, lower)
+        log_low, log_high = np.log(grid[lower]), np.log(grid[upper])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(upper == lower, 1.0, (np.log(values) - log_low) / (log_high - log_low))
+        return lower, upper, weight
+
+    def _cell_stats(self, cells: np.ndarray, tau_min: np.ndarray,
+                    tau_max: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Count, mean and variance of the metric per query, from the prefix sums of its cell."""
+        count = np.zeros(len(cells))
+        mean = np.full(len(cells), np.nan)
+        var = np.full(len(cells), np.nan)
+        order = np.argsort(cells, kind='stable')
+        unique_cells, starts = np.unique(cells[order], return_index=True)
+        for cell, rows in zip(unique_cells, np.split(order, starts[1:])):
+            if cell < 0:
+                continue
+            data = self.cells[cell]
+            lo = np.searchsorted(data['tau'], tau_min[rows], side='left')
+            hi = np.searchsorted(data['tau'], tau_max[rows], side='right')
+            n = (data['count'][hi] - data['count'][lo]).astype(np.float64)
+            s = data['sum'][hi] - data['sum'][lo]
+            q = data['sum_sq'][hi] - data['sum_sq'][lo]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                count[rows] = n
+                mean[rows] = np.where(n > 0, data['center'] + s / n, np.nan)
+                var[rows] = np.where(n > 1, np.maximum(q - s * s / n, 0.0) / (n - 1), np.where(n > 0, 0.0, np.nan))
+        return count, mean, var
+
+    def lookup_many(self, queries: pd.DataFrame) -> pd.DataFrame:
+        """
+        Vectorized lookup of many (T, M, tau range, conditions) queries.
+
+        :param queries: DataFrame with columns time_series_length, fake_units,
+                        tau_min and tau_max, plus optional condition columns
+                        (missing ones take the RECOMMENDED_CONDITIONS values)
+        :return: DataFrame aligned with `queries` with columns 'upper_bound'
+                 (mean of the metric), 'std', 'sem', 'count' (number of simulations
+                 used) and 'on_grid' (whether T and M are both grid points)
+        """
+        n = len(queries)
+        t_values = queries[T_PARAM].to_numpy(dtype=np.float64)
+        m_values = queries[M_PARAM].to_numpy(dtype=np.float64)
+        tau_min = queries['tau_min'].to_numpy(dtype=np.float64)
+        tau_max = queries['tau_max'].to_numpy(dtype=np.float64)
+
+        condition_codes = np.full(n, -1, dtype=np.int64)
+        condition_frame = pd.DataFrame({
+            param: queries[param] if param in queries.columns else RECOMMENDED_CONDITIONS.get(param)
+            for param in self.condition_params
+        }, index=queries.index).astype(object)
+        codes, uniques = pd.factorize(pd.Series(list(condition_frame.itertuples(index=False, name=None)),
+                                                dtype=object))
+        for code, key in enumerate(uniques):
+            key = tuple(_condition_value(value) for value in key)
+            condition_codes[codes == code] = self.conditions.get(key, -1)
+
+        t_low, t_high, t_weight = self._grid_corners(t_values, self.t_grid)
+        m_low, m_high, m_weight = self._grid_corners(m_values, self.m_grid)
+        on_grid = (self.t_grid[t_low] == t_values) & (self.t_grid[t_high] == t_values) \
+            & (self.m_grid[m_low] == m_values) & (self.m_grid[m_high] == m_values)
+
+        # Mixture of the four surrounding cells, weighted bilinearly
+        weight_total = np.zeros(n)
+        first = np.zeros(n)
+        second = np.zeros(n)
+        count_total = np.zeros(n)
+        known = condition_codes >= 0
+        for t_idx, t_w in [(t_low, 1 - t_weight), (t_high, t_weight)]:
+            for m_idx, m_w in [(m_low, 1 - m_weight), (m_high, m_weight)]:
+                cells = np.where(known, self.cell_ids[np.maximum(condition_codes, 0), t_idx, m_idx], -1)
+                count, mean, var = self._cell_stats(cells, tau_min, tau_max)
+                weight = np.where(count > 0, t_w * m_w, 0.0)
+                weight_total += weight
+                first += weight * np.nan_to_num(mean)
+                second += weight * np.nan_to_num(var + mean ** 2)
+                count_total += np.where(weight > 0, count, 0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean = np.where(weight_total > 0, first / weight_total, np.nan)
+            std = np.sqrt(np.maximum(np.where(weight_total > 0, second / weight_total, np.nan) - mean ** 2, 0.0))
+            sem = np.where(count_total > 0, std / np.sqrt(count_total), np.nan)
+        return pd.DataFrame({'upper_bound': mean, 'std': std, 'sem': sem,
+                             'count': count_total.astype(np.int64), 'on_grid': on_grid},
+                            index=queries.index, columns=LOOKUP_COLUMNS)
+
+    def lookup(self, time_series_length: float, fake_units: float, tau_min: float, tau_max: float,
+               **conditions) -> Dict:
+        """
+        Estimated upper-bound dimensionality for one dataset.
+
+        :param time_series_length: Number of samples T
+        :param fake_units: Number of observed variables M
+        :param tau_min: Lower end of the tau range (inclusive)
+        :param tau_max: Upper end of the tau range (inclusive)
+        :param conditions: Optional condition settings (e.g. noiseDistr='gaussian');
+                           missing ones take the RECOMMENDED_CONDITIONS values
+        :return: Dictionary with 'upper_bound', 'std', 'sem', 'count' and 'on_grid'
+        """
+        unknown = sorted(set(conditions) - set(self.condition_params))
+        if unknown:
+            raise ValueError(f"Unknown condition parameters: {unknown}")
+        query = pd.DataFrame([{T_PARAM: time_series_length, M_PARAM: fake_units,
+                               'tau_min': tau_min, 'tau_max': tau_max, **conditions}])
+        result = self.lookup_many(query).iloc[0]
+        return {'upper_bound': float(result['upper_bound']), 'std': float(result['std']),
+                'sem': float(result['sem']), 'count': int(result['count']),
+                'on_grid': bool(result['on_grid'])}
+
+    def condition_values(self) -> Dict[str, List]:
+        """
+        Values of each condition parameter present in the index.
+
+        :return: Dictionary param -> sorted list of values
+        """
+        values = {param: set() for param in self.condition_params}
+        for key in self.conditions:
+            for param, value in zip(self.condition_params, key):
+                values[param].add(value)
+        return {param: sorted(param_values) for param, param_values in values.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Look up the upper-bound dimensionality of many datasets from the simulation grid."
+    )
+    parser.add_argument("queries", type=Path,
+                        help="CSV with columns time_series_length, fake_units, tau_min, tau_max "
+                             "(and optional condition columns such as noiseDistr)")
+    parser.add_argument("--data", type=Path, default=Path("data/Data_table.csv"),
+                        help="Source CSV file or directory of CSV shards")
+    parser.add_argument("--output", type=Path, default=None, help="Output CSV (default: print)")
+    args = parser.parse_args()
+
+    index = UpperBoundIndex.from_table(open_table(args.data))
+    queries = pd.read_csv(args.queries)
+    results = pd.concat([queries, index.lookup_many(queries)], axis=1)
+    if args.output is not None:
+        results.to_csv(args.output, index=False)
+    else:
+        print(results.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,51 @@
-import pandas as pd
+import time
+import uuid
+import plotly.io as pio
 import streamlit as st
 from pathlib import Path
 from _utils.helpers import (
-    extract_metadata_from_data,
     create_simulation_filter_widgets,
-    filter_data_by_parameters,
     create_method_selector,
     create_independent_variable_selector,
     create_color_variable_selector,
-    create_metrics_plots,
+    compute_data_completeness,
     display_simulation_summary,
     display_results_summary,
+    display_method_comparison,
+    display_performance_panel,
+    read_filter_widget_state,
+)
+from _utils.analysis import filter_data_by_parameters
+from _utils.filter_index import IncrementalFilter
+from _utils.instrumentation import RunProfiler
+from _utils.stats_engine import build_method_metric_frame, compute_method_statistics
+from _utils.plot_aggregation import COLOR_MODES, MAX_FACET_LEVELS, choose_render_mode
+from _utils.bootstrap import BOOTSTRAP_CONFIDENCE, BOOTSTRAP_RESAMPLES, BOOTSTRAP_SEED
+from _utils.export import DEFAULT_EXPORT_DIR, EXPORT_FORMATS, EXPORT_MIME_TYPES, export_rows, prune_exports
+from _utils.memo import canonical_key
+from _utils.pipeline import (
+    cached_bootstrap_intervals,
+    cached_metrics_figure_json,
+    cached_results_summary,
+    cached_simulation_summary,
+)
+from _utils.prefetch import Prefetcher, prefetch_analysis
+from _utils.shards import DEFAULT_SHARD_DIR
+from _utils.stats_cube import SKETCH_POINTS
+from _utils.shared_store import (
+    get_prefetch_executor,
+    get_result_cache,
+    get_shared_table,
+    get_upper_bound_index,
+    reload_shared_table,
+)
+from _utils.upper_bound import (
+    M_PARAM,
+    RECOMMENDED_CONDITIONS,
+    T_PARAM,
+    TAU_PARAM,
+    UPPER_BOUND_METHOD,
+    UPPER_BOUND_METRIC,
 )
 
 # Set page config
@@ -28,6 +63,41 @@ st.write("Filter simulations and visualize metrics by method and independent var
 # ============================================================================
 if 'filter_clicked' not in st.session_state:
     st.session_state.filter_clicked = False
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+st.session_state.run_count = st.session_state.get('run_count', 0) + 1
+
+# ============================================================================
+# INSTRUMENTATION
+# ============================================================================
+# Every rerun is timed stage by stage and logged as one JSON line; memory
+# peaks are traced only while the debug panel is open (tracemalloc is slow)
+with st.sidebar:
+    show_debug_panel = st.toggle(
+        "🐞 Performance debug panel",
+        help="Per-stage timings and memory peaks of each rerun"
+    )
+    debug_placeholder = st.empty()
+
+previous_profiler = st.session_state.get('run_profiler')
+if previous_profiler is not None and not previous_profiler.finished:
+    previous_profiler.finish(session=st.session_state.session_id, interrupted=True)
+profiler = RunProfiler(trace_memory=show_debug_panel).activate()
+st.session_state.run_profiler = profiler
+
+
+def finish_run():
+    """Log the timings of this rerun and show them in the debug panel."""
+    run_record = profiler.finish(session=st.session_state.session_id, run=st.session_state.run_count)
+    if show_debug_panel:
+        with debug_placeholder.container():
+            display_performance_panel(run_record)
+
+
+def stop_run():
+    """Stop the script early, still logging the timings of this rerun."""
+    finish_run()
+    st.stop()
 
 # ============================================================================
 # LOAD DATA
@@ -36,138 +106,393 @@ st.subheader("Load Data", divider=True)
 
 # Try to load from local file
 data_file_path = Path("data/Data_table.csv")
-if data_file_path.exists():
-    df = pd.read_csv(data_file_path)
-    st.success(f"✅ Loaded data from {data_file_path}")
-    st.write(f"Data shape: {df.shape[0]} simulations × {df.shape[1]} columns")
-else:
+# Without a single table, CSV shards in the shard directory form the table
+# (ingested incrementally)
+if not data_file_path.exists() and DEFAULT_SHARD_DIR.is_dir():
+    data_file_path = DEFAULT_SHARD_DIR
+
+with st.sidebar:
+    if st.button("🔄 Reload data", help="Reload the simulation table for all sessions"):
+        reload_shared_table()
+
+if not data_file_path.exists():
     st.error(f"❌ Data file not found at {data_file_path}")
-    st.stop()
+    stop_run()
+
+with profiler.stage("Load data"):
+    # Loaded once per server process and shared (read-only) by all sessions
+    run_started_at = time.time()
+    table = get_shared_table(data_file_path)
+    session_load_seconds = time.time() - run_started_at
+    load_report = table.load_report
+    # Only the simulation parameters are loaded here; metric columns are
+    # materialized per method once a method is selected
+    df = table.sim_data
+    st.success(f"✅ Loaded data from {data_file_path}")
+    st.write(f"Data shape: {table.shape[0]} simulations × {table.shape[1]} columns")
+    for shard_name, reason in load_report.get('rejected_shards', {}).items():
+        st.warning(f"⚠️ Shard {shard_name} was skipped: {reason}")
+    if load_report['cache_hit']:
+        initial_load = (f"⚡ Warm load from columnar cache in {load_report['load_seconds']:.2f}s "
+                        f"(cold CSV parse: {load_report['cold_load_seconds']:.2f}s, "
+                        f"{load_report['speedup']:.1f}× faster)")
+    else:
+        initial_load = (f"🐢 Cold load from CSV in {load_report['load_seconds']:.2f}s "
+                        f"(columnar cache written to {load_report['cache_path']})")
+    if table.loaded_at >= run_started_at:
+        st.caption(initial_load)
+    else:
+        # Loaded by an earlier run: this run only picked up the shared table
+        st.caption(
+            f"♻️ Shared in-memory table ready in {session_load_seconds * 1000:.0f} ms. "
+            f"Initial load of the shared table: {initial_load}"
+        )
+    # Filled in once the selected method's columns are materialized
+    memory_placeholder = st.empty()
 
 # ============================================================================
 # EXTRACT METADATA
 # ============================================================================
-header_sim_params, header_methods, header_metrics, all_columns = extract_metadata_from_data(df)
+with profiler.stage("Extract metadata"):
+    header_sim_params = table.header_sim_params
+    header_methods = table.header_methods
+    header_metrics = table.header_metrics
 
-st.write("**Metadata extracted:**")
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.write(f"📍 **Simulation Parameters:** {len(header_sim_params)}")
-    with st.expander("View list"):
-        st.write(header_sim_params)
-with col2:
-    st.write(f"🔬 **Methods:** {len(header_methods)}")
-    with st.expander("View list"):
-        st.write(header_methods)
-with col3:
-    st.write(f"📈 **Metrics:** {len(header_metrics)}")
-    with st.expander("View list"):
-        st.write(header_metrics)
+    st.write("**Metadata extracted:**")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.write(f"📍 **Simulation Parameters:** {len(header_sim_params)}")
+        with st.expander("View list"):
+            st.write(header_sim_params)
+    with col2:
+        st.write(f"🔬 **Methods:** {len(header_methods)}")
+        with st.expander("View list"):
+            st.write(header_methods)
+    with col3:
+        st.write(f"📈 **Metrics:** {len(header_metrics)}")
+        with st.expander("View list"):
+            st.write(header_metrics)
+
+# ============================================================================
+# UPPER-BOUND LOOKUP (SIDEBAR)
+# ============================================================================
+with profiler.stage("Upper-bound lookup"):
+    tau_profile = table.profile.get(TAU_PARAM, {})
+    if (f"{UPPER_BOUND_METHOD}_{UPPER_BOUND_METRIC}" in table.columns
+            and all(param in table.header_sim_params for param in (T_PARAM, M_PARAM, TAU_PARAM))
+            and tau_profile.get('min') is not None):
+        with st.sidebar.expander("🎯 Upper-bound lookup"):
+            st.caption(
+                f"Mean {UPPER_BOUND_METRIC} of {UPPER_BOUND_METHOD} for your data's T, M and tau range"
+            )
+            upper_bound_index = get_upper_bound_index(table, table.version)
+            lookup_t = st.number_input("T (time_series_length)", min_value=1, value=1000, step=100)
+            lookup_m = st.number_input("M (fake_units)", min_value=1, value=100, step=10)
+            tau_min, tau_max = float(tau_profile['min']), float(tau_profile['max'])
+            if tau_max > tau_min:
+                lookup_tau = st.slider("tau range", tau_min, tau_max,
+                                       (min(max(10.0, tau_min), tau_max), max(min(40.0, tau_max), tau_min)))
+            else:
+                lookup_tau = (tau_min, tau_max)
+            lookup_conditions = {}
+            for param, values in upper_bound_index.condition_values().items():
+                default = RECOMMENDED_CONDITIONS.get(param)
+                default = float(default) if default is not None and not isinstance(default, str) else default
+                lookup_conditions[param] = st.selectbox(
+                    param, values, index=values.index(default) if default in values else 0,
+                    format_func=lambda value: value if isinstance(value, str) else f"{value:g}",
+                    key=f"lookup_{param}"
+                )
+            lookup = upper_bound_index.lookup(lookup_t, lookup_m, lookup_tau[0], lookup_tau[1],
+                                              **lookup_conditions)
+            if lookup['count'] > 0:
+                st.metric("Upper-bound dimensionality", f"{lookup['upper_bound']:.1f}",
+                          help=f"± {lookup['std']:.1f} std (± {lookup['sem']:.2f} s.e.m.), "
+                               f"{lookup['count']} simulations")
+                if not lookup['on_grid']:
+                    st.caption("T/M between simulated grid points: interpolated.")
+            else:
+                st.caption("No simulations match these settings.")
 
 # ============================================================================
 # FILTERING SECTION
 # ============================================================================
-st.subheader("Step 1: Filter Simulations", divider=True)
+@st.fragment
+def filter_section():
+    """
+    Filter widgets with a live count of the matching simulations.
+
+    Changing a widget reruns only this fragment: the counts are read from the
+    filter index, re-evaluating just the changed predicate. The analysis
+    below runs on the filters applied with the update button.
+    """
+    # Kept apart from the analysis filter, so previews do not evict its cached masks
+    preview_filter = st.session_state.get('preview_filter')
+    if preview_filter is None or preview_filter.index is not table.filter_index:
+        preview_filter = IncrementalFilter(table.filter_index)
+        st.session_state.preview_filter = preview_filter
+
+    # Per-value counts (under the other filters) label the multiselect options
+    preview_filter.update(read_filter_widget_state())
+    value_counts = {param: preview_filter.value_counts(param) for param in table.filter_index.bitmaps}
+
+    with st.container(border=True):
+        # Options and slider bounds come from the precomputed column profile
+        pending_filters = create_simulation_filter_widgets(df, header_sim_params, profile=table.profile,
+                                                           value_counts=value_counts)
+        preview_filter.update(pending_filters)
+        n_matching = preview_filter.count()
+
+        if n_matching == 0:
+            st.warning("⚠️ No simulations match these filters.")
+        else:
+            st.caption(
+                f"🎯 {n_matching:,} / {df.shape[0]:,} simulations match ({n_matching / df.shape[0]:.1%})"
+                f"{'; plots will show per-x aggregates' if choose_render_mode(n_matching) == 'aggregate' else ''}"
+            )
+        if st.button(
+            "🔄 Update Simulation Filtering",
+            use_container_width=True,
+            type="primary",
+            disabled=n_matching == 0
+        ):
+            st.session_state.applied_filters = pending_filters
+            st.session_state.filter_clicked = True
+            st.rerun()
 
-# Create filter widgets in a form
-with st.form("filter_form", border=True):
-    selected_filters = create_simulation_filter_widgets(df, header_sim_params)
-    if st.form_submit_button(
-        "🔄 Update Simulation Filtering",
-        use_container_width=True,
-        type="primary"
-    ):
-        st.session_state.filter_clicked = True
+
+with profiler.stage("Step 1: Filter widgets"):
+    st.subheader("Step 1: Filter Simulations", divider=True)
+    filter_section()
 
 # Only proceed with analysis if the button was clicked
 if not st.session_state.filter_clicked:
     st.info("👈 Adjust the filters above and click the button to proceed with the analysis.")
-    st.stop()
+    stop_run()
+selected_filters = st.session_state.applied_filters
 
 # Apply filters
-filtered_data = filter_data_by_parameters(df, selected_filters)
+with profiler.stage("Step 1: Apply filters"):
+    # Reuse the cached per-parameter masks; only changed widgets are re-evaluated
+    incremental_filter = st.session_state.get('incremental_filter')
+    if incremental_filter is None or incremental_filter.index is not table.filter_index:
+        incremental_filter = IncrementalFilter(table.filter_index)
+        st.session_state.incremental_filter = incremental_filter
+    filtered_sims = filter_data_by_parameters(df, selected_filters, index=incremental_filter)
+    filtered_data = filtered_sims
+    # Distinct values, min/max and NaN counts of the filtered rows, from the index
+    subset_profile = table.filter_index.subset_profile(incremental_filter.matching())
 
-st.write(f"**Filtered result:** {filtered_data.shape[0]} / {df.shape[0]} simulations")
+    st.write(f"**Filtered result:** {filtered_data.shape[0]} / {df.shape[0]} simulations")
 
 if filtered_data.empty:
     st.warning("⚠️ No data matches the current filters. Please adjust the filters.")
-    st.stop()
+    stop_run()
+
+with profiler.stage("Step 1: Simulation summary"):
+    # Figures and tables are memoized on (dataset version, filters, ...), so
+    # unrelated widget changes and returning to a previous selection are free
+    result_cache = get_result_cache()
 
-# Display summary
-display_simulation_summary(filtered_data, header_sim_params)
+    # Display summary
+    simulation_summary = cached_simulation_summary(result_cache, table, selected_filters, filtered_sims)
+    display_simulation_summary(filtered_data, header_sim_params, summary_df=simulation_summary)
 
 # ============================================================================
 # METHOD SELECTION
 # ============================================================================
-st.subheader("Step 2: Select Analysis Method", divider=True)
-selected_method = create_method_selector(header_methods)
+with profiler.stage("Step 2: Method selection"):
+    st.subheader("Step 2: Select Analysis Method", divider=True)
+    selected_method = create_method_selector(header_methods)
+
+    # Attach the selected method's metric columns to the filtered simulations
+    filtered_data = table.with_method(filtered_data, selected_method)
+
+    memory_report = table.memory_report
+    memory_placeholder.caption(
+        f"🗜️ Compact dtypes: {memory_report['bytes_after'] / 1e6:.1f} MB in memory "
+        f"(saved {memory_report['bytes_saved'] / 1e6:.1f} MB of "
+        f"{memory_report['bytes_before'] / 1e6:.1f} MB)"
+    )
 
 # ============================================================================
 # INDEPENDENT VARIABLE SELECTION
 # ============================================================================
-st.subheader("Step 3: Select Independent Variable", divider=True)
-selected_x_var = create_independent_variable_selector(header_sim_params, filtered_data)
+with profiler.stage("Step 3: Independent variable"):
+    st.subheader("Step 3: Select Independent Variable", divider=True)
+    selected_x_var = create_independent_variable_selector(header_sim_params, filtered_data, subset_profile)
 
-if filtered_data[selected_x_var].nunique() <= 1:
+if subset_profile[selected_x_var]['n_distinct'] <= 1:
     st.warning(
         f"⚠️ Selected variable '{selected_x_var}' has no variation in the filtered data. "
         "Please adjust filters to have variation in the independent variable."
     )
-    st.stop()
+    stop_run()
 
 # ============================================================================
 # COLOR VARIABLE SELECTION
 # ============================================================================
-st.subheader("Step 4: Select Color Variable (Optional)", divider=True)
-selected_color_var = create_color_variable_selector(header_sim_params, filtered_data)
+with profiler.stage("Step 4: Color variable and prefetch"):
+    st.subheader("Step 4: Select Color Variable (Optional)", divider=True)
+    selected_color_var = create_color_variable_selector(header_sim_params, filtered_data, subset_profile)
+    selected_color_mode = 'auto'
+    if selected_color_var is not None:
+        selected_color_mode = st.radio(
+            "Color mode", COLOR_MODES, horizontal=True,
+            format_func=lambda mode: {'auto': "Auto", 'facet': "One trace per level",
+                                      'continuous': "Color scale"}[mode],
+            help=f"Auto draws one trace per level for categorical variables and variables "
+                 f"with at most {MAX_FACET_LEVELS} values, and a color scale otherwise"
+        )
 
-st.info(
-    f"**Plotting all metrics** (x-axis: **{selected_x_var}**, method: **{selected_method}**"
-    f"{f', color: **{selected_color_var}**' if selected_color_var else ''})"
-)
+    # Precompute the other methods (and a few other x variables) in the
+    # background, so switching selection is served from the result cache
+    prefetcher = st.session_state.get('prefetcher')
+    if prefetcher is None:
+        prefetcher = Prefetcher(get_prefetch_executor())
+        st.session_state.prefetcher = prefetcher
+    prefetch_analysis(prefetcher, result_cache, table, selected_filters, filtered_sims,
+                      selected_method, selected_x_var, selected_color_var, selected_color_mode,
+                      subset_profile)
+
+    st.info(
+        f"**Plotting all metrics** (x-axis: **{selected_x_var}**, method: **{selected_method}**"
+        f"{f', color: **{selected_color_var}**' if selected_color_var else ''})"
+    )
 
 # ============================================================================
 # RESULTS SUMMARY
 # ============================================================================
-st.subheader("Step 5: Results Summary Statistics", divider=True)
-display_results_summary(filtered_data, selected_method, header_metrics)
+with profiler.stage("Step 5: Results summary"):
+    st.subheader("Step 5: Results Summary Statistics", divider=True)
+    # Merges statistics-cube cells (and their quantile sketches) when the filter
+    # aligns with them, otherwise scans the filtered rows
+    results_stats, from_cube = cached_results_summary(
+        result_cache, table, selected_filters, filtered_sims, selected_method
+    )
+    # Seeded, so the intervals are reproducible (and memoized like the rest)
+    show_intervals = st.toggle(
+        "📏 Bootstrap confidence intervals",
+        help=f"{BOOTSTRAP_CONFIDENCE:.0%} percentile intervals from {BOOTSTRAP_RESAMPLES:,} resamples"
+    )
+    results_intervals = None
+    if show_intervals:
+        with st.spinner("Resampling..."):
+            results_intervals = cached_bootstrap_intervals(
+                result_cache, table, selected_filters, filtered_sims, selected_method,
+                BOOTSTRAP_RESAMPLES, BOOTSTRAP_CONFIDENCE, BOOTSTRAP_SEED
+            )
+    display_results_summary(filtered_data, selected_method, header_metrics, stats_df=results_stats,
+                            ci_df=results_intervals)
+    if from_cube:
+        st.caption(
+            f"Merged from the pre-aggregated statistics cube: mean and std are exact, quantiles come from "
+            f"per-cell sketches (rank error below 1/{SKETCH_POINTS} of the simulations)."
+        )
+    if show_intervals:
+        st.caption(
+            f"[low, high]: {BOOTSTRAP_CONFIDENCE:.0%} percentile bootstrap intervals from "
+            f"{BOOTSTRAP_RESAMPLES:,} resamples of the filtered simulations (seed {BOOTSTRAP_SEED})."
+        )
+
+    # Comparing all methods materializes every method's columns, so it is opt-in
+    if st.toggle("🏁 Compare all methods", help="Rank all criteria on the filtered simulations"):
+        all_methods_data = table.with_methods(filtered_sims, header_methods)
+        method_stats = compute_method_statistics(
+            build_method_metric_frame(all_methods_data, header_methods, header_metrics)
+        )
+        display_method_comparison(method_stats)
 
 # ============================================================================
 # VISUALIZATIONS
 # ============================================================================
 st.subheader("Step 6: Results Visualization", divider=True)
 
-# Create plots
-fig = create_metrics_plots(
-    filtered_data=filtered_data,
-    method=selected_method,
-    x_variable=selected_x_var,
-    header_metrics=header_metrics,
-    color_variable=selected_color_var
-)
+# Create plots (stored as serialized figure JSON)
+with profiler.stage("Step 6: Build figure"):
+    fig_json = cached_metrics_figure_json(
+        result_cache, table, selected_filters, filtered_sims,
+        selected_method, selected_x_var, selected_color_var, selected_color_mode
+    )
 
-if fig is not None:
-    st.plotly_chart(fig, use_container_width=True)
+with profiler.stage("Step 6: Send figure to browser"):
+    if fig_json is not None:
+        st.plotly_chart(pio.from_json(fig_json), use_container_width=True)
+    else:
+        st.error(f"No data available for method '{selected_method}'")
 
 # ============================================================================
 # DATA SUMMARY
 # ============================================================================
 st.subheader("Filtered Data Summary", divider=True)
 
-col1, col2, col3 = st.columns(3)
-with col1:
-    st.metric("Number of Simulations", filtered_data.shape[0])
-with col2:
-    st.metric(
-        f"Unique {selected_x_var} values",
-        filtered_data[selected_x_var].nunique()
-    )
-with col3:
-    st.metric(
-        "Data Completeness",
-        f"{(filtered_data.notna().sum().sum() / (filtered_data.shape[0] * filtered_data.shape[1]) * 100):.1f}%"
-    )
+with profiler.stage("Data summary"):
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Number of Simulations", filtered_data.shape[0])
+    with col2:
+        st.metric(
+            f"Unique {selected_x_var} values",
+            subset_profile[selected_x_var]['n_distinct']
+        )
+    with col3:
+        st.metric(
+            "Data Completeness",
+            f"{compute_data_completeness(filtered_data, subset_profile, table.profile):.1f}%"
+        )
+
+    # Show first few rows of filtered data
+    with st.expander("📋 View filtered data (first 10 rows)"):
+        st.dataframe(filtered_data.head(10), use_container_width=True)
+
+with profiler.stage("Export"):
+    # The full selection is streamed from the columnar cache/store to a file
+    # in batches, so exporting never holds a second copy of it in memory
+    with st.expander("💾 Export filtered data"):
+        export_col1, export_col2 = st.columns(2)
+        with export_col1:
+            export_format = st.selectbox("Format", list(EXPORT_FORMATS), key="export_format")
+        with export_col2:
+            export_projected = st.checkbox(f"Only {selected_method} metric columns", value=True,
+                                           help="Otherwise the metrics of every method are exported")
+        export_method = selected_method if export_projected else None
+        export_key = canonical_key(version=table.version, filters=selected_filters,
+                                   method=export_method, format=export_format)
+
+        if st.button(f"Export {filtered_sims.shape[0]:,} simulations"):
+            export_prefix = f"simulations_{st.session_state.session_id}_"
+            export_path = (Path(DEFAULT_EXPORT_DIR) /
+                           f"{export_prefix}{export_key[:8]}{EXPORT_FORMATS[export_format]}")
+            with st.spinner("Exporting..."):
+                st.session_state.export_report = dict(
+                    export_rows(table, filtered_sims, export_path, export_format, export_method),
+                    key=export_key
+                )
+            # Only the latest export of a session is kept
+            prune_exports(DEFAULT_EXPORT_DIR, export_prefix, keep=export_path)
+
+        export_report = st.session_state.get('export_report')
+        if export_report is not None and export_report['key'] == export_key and \
+                Path(export_report['path']).exists():
+            st.caption(
+                f"✅ {export_report['rows']:,} rows × {export_report['columns']} columns written to "
+                f"`{export_report['path']}` ({export_report['bytes'] / 1e6:.1f} MB in "
+                f"{export_report['seconds']:.2f}s)"
+            )
+            # The file is read only when the button is clicked, not on every rerun
+            st.download_button("⬇️ Download", Path(export_report['path']).read_bytes,
+                               file_name=Path(export_report['path']).name,
+                               mime=EXPORT_MIME_TYPES[export_format])
+
+cache_stats = result_cache.stats()
+st.sidebar.caption(
+    f"🧠 Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['hit_rate']:.0%}), {cache_stats['entries']} entries, "
+    f"{cache_stats['bytes'] / 1e6:.1f} MB"
+)
+prefetch_progress = prefetcher.progress()
+st.sidebar.caption(
+    f"⏩ Prefetch: {prefetch_progress['done']}/{prefetch_progress['total']} jobs ready"
+)
 
-# Show first few rows of filtered data
-with st.expander("📋 View filtered data (first 10 rows)"):
-    st.dataframe(filtered_data.head(10), use_container_width=True)
+finish_run()